@@ -0,0 +1,220 @@
+"""
+Plain text / Markdown to Atlassian Document Format (ADF) conversion.
+
+Supported syntax: paragraphs (single newlines become hard breaks), '#' headings,
+bullet and ordered lists (nested by indentation), fenced code blocks, '>' quotes,
+'---' rules, and inline `code`, **bold**, *italic*, [links](url) and bare URLs.
+"""
+import re
+from functools import lru_cache
+
+# --- CONVERTER SETTINGS ---
+CACHE_SIZE = 4096   # Distinct descriptions kept by markdown_to_adf()
+# ----------------------------------------
+
+FENCE = re.compile(r"^\s*(```|~~~)\s*([\w+-]*)\s*$")
+HEADING = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+RULE = re.compile(r"^\s*([-*_])(\s*\1){2,}\s*$")
+QUOTE = re.compile(r"^\s*>\s?(.*)$")
+LIST_ITEM = re.compile(r"^(\s*)([-*+]|\d{1,9}[.)])\s+(.*)$")
+
+INLINE = re.compile(r"""
+    (?P<code_fence>`+)(?P<code>.+?)(?P=code_fence)
+  | \[(?P<link_text>[^\]]+)\]\((?P<link_url>[^)\s]+)\)
+  | (?P<strong_fence>\*\*|__)(?P<strong>.+?)(?P=strong_fence)
+  | (?<![\w*])\*(?P<em>[^*\s](?:[^*]*[^*\s])?)\*(?![\w*])
+  | (?<!\w)_(?P<em_alt>[^_\s](?:[^_]*[^_\s])?)_(?!\w)
+  | (?P<url>https?://[^\s<>()\[\]]+[^\s<>()\[\].,;:!?'"])
+""", re.VERBOSE)
+
+
+# --- INLINE CONTENT ---
+
+def _text(text, marks):
+    node = { "type": "text", "text": text }
+    if marks:
+        node["marks"] = list(marks)
+    return node
+
+def parse_inline(text, marks=()):
+    """Converts one line/run of Markdown inline syntax into ADF text nodes with marks."""
+    nodes = []
+    pos = 0
+    links = tuple(mark for mark in marks if mark["type"] == "link") # ADF allows one link mark per node
+    for match in INLINE.finditer(text):
+        if match.start() > pos:
+            nodes.append(_text(text[pos:match.start()], marks))
+        pos = match.end()
+
+        if match.group("code") is not None:
+            # Code marks can only be combined with a link in ADF
+            nodes.append(_text(match.group("code"), links + ({ "type": "code" },)))
+        elif match.group("link_text") is not None:
+            link = { "type": "link", "attrs": { "href": match.group("link_url") } }
+            nodes.extend(parse_inline(match.group("link_text"), marks if links else marks + (link,)))
+        elif match.group("strong") is not None:
+            nodes.extend(parse_inline(match.group("strong"), marks + ({ "type": "strong" },)))
+        elif match.group("em") is not None or match.group("em_alt") is not None:
+            inner = match.group("em") if match.group("em") is not None else match.group("em_alt")
+            nodes.extend(parse_inline(inner, marks + ({ "type": "em" },)))
+        else:
+            url = match.group("url")
+            nodes.append(_text(url, marks if links else marks + ({ "type": "link", "attrs": { "href": url } },)))
+
+    if pos < len(text):
+        nodes.append(_text(text[pos:], marks))
+    return nodes
+
+def _paragraph(lines):
+    """Builds a paragraph; line breaks inside it become hardBreak nodes."""
+    content = []
+    for i, line in enumerate(lines):
+        if i:
+            content.append({ "type": "hardBreak" })
+        content.extend(parse_inline(line))
+    paragraph = { "type": "paragraph" }
+    if content:
+        paragraph["content"] = content
+    return paragraph
+
+
+# --- BLOCK CONTENT ---
+
+def _indent(line):
+    return len(line) - len(line.lstrip(" "))
+
+def _parse_list(lines, i, indent):
+    """Parses consecutive list items at 'indent' (and nested lists below them). Returns (node, next index)."""
+    first = LIST_ITEM.match(lines[i])
+    ordered = first.group(2)[0].isdigit()
+    node = { "type": "orderedList" if ordered else "bulletList", "content": [] }
+    if ordered and int(first.group(2)[:-1]) != 1:
+        node["attrs"] = { "order": int(first.group(2)[:-1]) }
+
+    item_lines = None # Text lines of the list item being built
+    item = None
+
+    def close_item():
+        if item is not None:
+            item["content"].insert(0, _paragraph(item_lines))
+
+    while i < len(lines):
+        line = lines[i]
+        match = LIST_ITEM.match(line)
+
+        if not line.strip():
+            # A blank line only continues the list if another item of this list follows
+            j = i + 1
+            while j < len(lines) and not lines[j].strip():
+                j += 1
+            next_match = LIST_ITEM.match(lines[j]) if j < len(lines) else None
+            if next_match and len(next_match.group(1)) >= indent:
+                i = j
+                continue
+            break
+
+        if match is None:
+            # Indented continuation of the current item's text
+            if item is not None and _indent(line) > indent:
+                item_lines.append(line.strip())
+                i += 1
+                continue
+            break
+
+        item_indent = len(match.group(1))
+        if item_indent < indent:
+            break
+        if item_indent > indent and item is not None:
+            nested, i = _parse_list(lines, i, item_indent)
+            item["content"].append(nested)
+            continue
+        if match.group(2)[0].isdigit() != ordered:
+            break
+
+        close_item()
+        item = { "type": "listItem", "content": [] }
+        item_lines = [match.group(3).strip()]
+        node["content"].append(item)
+        i += 1
+
+    close_item()
+    return node, i
+
+def parse_blocks(lines):
+    """Converts a list of Markdown lines into ADF block nodes."""
+    blocks = []
+    paragraph = []
+
+    def flush_paragraph():
+        if paragraph:
+            blocks.append(_paragraph(paragraph))
+            paragraph.clear()
+
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        stripped = line.strip()
+
+        fence = FENCE.match(line)
+        if fence:
+            flush_paragraph()
+            code_lines = []
+            i += 1
+            while i < len(lines) and not lines[i].strip().startswith(fence.group(1)):
+                code_lines.append(lines[i])
+                i += 1
+            code_block = { "type": "codeBlock" }
+            if fence.group(2):
+                code_block["attrs"] = { "language": fence.group(2) }
+            if code_lines:
+                code_block["content"] = [{ "type": "text", "text": "\n".join(code_lines) }]
+            blocks.append(code_block)
+            i += 1 # Skip the closing fence
+            continue
+
+        if not stripped:
+            flush_paragraph()
+        elif HEADING.match(stripped):
+            flush_paragraph()
+            heading = HEADING.match(stripped)
+            node = { "type": "heading", "attrs": { "level": len(heading.group(1)) } }
+            content = parse_inline(heading.group(2))
+            if content:
+                node["content"] = content
+            blocks.append(node)
+        elif RULE.match(line):
+            flush_paragraph()
+            blocks.append({ "type": "rule" })
+        elif QUOTE.match(line):
+            flush_paragraph()
+            quoted = []
+            while i < len(lines) and QUOTE.match(lines[i]):
+                quoted.append(QUOTE.match(lines[i]).group(1))
+                i += 1
+            content = parse_blocks(quoted)
+            blocks.append({ "type": "blockquote", "content": content or [{ "type": "paragraph" }] })
+            continue
+        elif LIST_ITEM.match(line):
+            flush_paragraph()
+            node, i = _parse_list(lines, i, len(LIST_ITEM.match(line).group(1)))
+            blocks.append(node)
+            continue
+        else:
+            paragraph.append(stripped)
+        i += 1
+
+    flush_paragraph()
+    return blocks
+
+def convert(text):
+    """Converts plain text/Markdown into an ADF document (uncached)."""
+    lines = (text or "").replace("\r\n", "\n").replace("\r", "\n").expandtabs(4).split("\n")
+    return { "type": "doc", "version": 1, "content": parse_blocks(lines) }
+
+@lru_cache(maxsize=CACHE_SIZE)
+def markdown_to_adf(text):
+    """
+    Memoized convert(): bulk loads that reuse a description convert it only once.
+    The returned document is shared between callers and must not be mutated.
+    """
+    return convert(text)
@@ -1,196 +1,364 @@
+import time
+_PROCESS_START = time.perf_counter() # Reference point for startup timing (before any heavy import)
+
 import tkinter as tk
 from tkinter import ttk, messagebox
-import os, json, random, requests, sys 
-from dotenv import load_dotenv
-
-# Load sensitive environment variables from .env file
-load_dotenv() 
+import os, queue, argparse, threading, traceback
 
-# --- JIRA API CONFIGURATION CONSTANTS ---
-JIRA_URL = os.getenv("JIRA_URL")           # Base URL for the Jira instance
-JIRA_EMAIL = os.getenv("JIRA_EMAIL")       # User's Atlassian email
-JIRA_API_TOKEN = os.getenv("JIRA_API_TOKEN") # User's Personal Access Token (PAT)
-TEMPLATES_FILE = "templates.json"          # File containing issue templates
+# 'requests' and 'dotenv' are not imported here: jira_api loads them lazily on a
+# background thread so the window paints before they are paid for.
+import jira_api, metrics, submission_queue
+from submission_queue import SubmissionQueue
+from outbox import Outbox
+from jira_api import TEMPLATES_FILE
+from template_store import random_template
+from template_index import TemplateIndex, template_priority
+from field_validation import validator_for
+from field_resolution import resolver_for
+from hierarchy import HierarchyScheduler, build_hierarchy, has_children, CREATED, PENDING
+from attachments import AttachmentUploader, template_attachments
+from virtual_list import VirtualTreeview, TemplateRows, SubmissionRows, OutboxRows
+# --- APPLICATION CONSTANTS ---
+SUBMISSION_WORKERS = 4                     # Concurrent background submissions
+POLL_INTERVAL_MS = 100                     # How often the UI drains worker results
+OUTBOX_REPLAY_MS = 15000                   # How often pending outbox entries are replayed
+SEARCH_DELAY_MS = 120                      # Template browser: pause in typing before searching
+HISTORY_REFRESH_MS = 2000                  # Outbox history window: how often new entries are picked up
+OUTBOX_LABEL_MS = 1000                     # How often the pending outbox count (a SQLite COUNT) is refreshed
 # ----------------------------------------
 
+
+class StartupTimer:
+    """Records startup phase durations (import, templates, metadata, first paint) for --startup-timing."""
+
+    PHASES = ("import", "config", "templates", "metadata", "first_paint")
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.durations = {} # Phase -> milliseconds
+        self._lock = threading.Lock()
+
+    def record(self, phase, started_at, ended_at=None):
+        """Stores the duration of a phase measured with time.perf_counter()."""
+        ended_at = ended_at if ended_at is not None else time.perf_counter()
+        with self._lock:
+            self.durations[phase] = (ended_at - started_at) * 1000
+            complete = all(p in self.durations for p in self.PHASES)
+        if complete and self.enabled:
+            self.report()
+
+    def report(self):
+        """Prints every phase; 'first_paint' is measured from process start."""
+        print("Startup timing (ms):")
+        for phase in self.PHASES:
+            print(f"  {phase:<12} {self.durations[phase]:8.1f}")
+
+
 class JiraApp:
-    def __init__(self, master):
+    def __init__(self, master, refresh_metadata=False, metadata_ttl=None, timer=None, templates_file=TEMPLATES_FILE):
         self.master = master
         master.title("Jira Issue Loader - Portafolio Service Desk")
-        master.geometry("900x700")
+        master.geometry("900x850")
+        self.timer = timer or StartupTimer()
 
-        # 1. Initialization: Load templates and metadata
-        self.templates = self.load_templates()
+        # 1. Initialization: templates and metadata are loaded in the background after the first paint
+        self.templates_file = templates_file # JSON array or indexed JSONL template source
+        self.templates = None # None while loading, [] if the file could not be read
+        self.template_index = None # TemplateIndex for the browser, built in the background
         self.current_template = None # Stores the actively selected template data
 
         # 2. UI Control Variables (tk.StringVar)
         self.project_key = tk.StringVar(value="AUT")
         self.issue_type = tk.StringVar(value="") 
-        self.priority_level = tk.StringVar(value="Medium")
+        self.priority_level = tk.StringVar(value="")
         self.summary_text = tk.StringVar()
         self.parent_key = tk.StringVar() # Required for Subtask creation (Parent Issue Key)
-        self.status_message = tk.StringVar(value="Ready to generate and load issue.")
+        self.status_message = tk.StringVar(value="Loading Jira metadata...")
         
         # 3. Dynamic Metadata from Jira API
         self.issue_types_map = {}      # Maps Issue Type Name to its required ID
         self.available_issue_types = [] # List of valid types for the Combobox
-        self.available_priorities = ["Highest", "High", "Medium", "Low", "Lowest"] # Static list for priority
-
-        self.load_jira_metadata() # Fetch valid Issue Types and IDs from Jira
-
-        # Selects the first loaded issue type as default
-        self.issue_type.set(self.available_issue_types[0] if self.available_issue_types else "") 
+        self.priority_names = {}       # Maps Priority ID -> name, from the project's createmeta
+        self.field_schemas = {}        # Maps Issue Type Name -> Field ID -> createmeta schema
+        self.metadata_project = None   # Project the loaded issue types belong to
+        self.refresh_metadata = refresh_metadata # Bypass the createmeta disk cache on this load
+        self.metadata_ttl = metadata_ttl # Command-line TTL override (wins over JIRA_METADATA_TTL)
+        self.ui_callbacks = queue.Queue() # Work handed back to the Tk thread by background threads
         
-        # 4. Build the User Interface
+        # 4. Background submission pipeline (HTTP never runs on the Tk thread).
+        # Every issue is saved to the outbox first; workers send outbox entry IDs.
+        self.outbox = Outbox()
+        self.submissions = SubmissionQueue(self.outbox.send, max_workers=SUBMISSION_WORKERS)
+        self.submission_rows = SubmissionRows() # Rows of the (virtualized) submission list
+        self.submission_details = {} # Maps submission ID -> error details for failed rows
+        self.submission_entries = {} # Maps submission ID -> outbox entry ID
+        self.replay_claimed = set() # Submission IDs whose cancel lost the race against a replay
+        self.submission_attachments = {} # Maps submission ID -> file paths uploaded once the issue exists
+        self.uploader = AttachmentUploader() # Bounded pool streaming attachments after creation
+        self.replay_running = False
+        master.protocol("WM_DELETE_WINDOW", self.on_close)
+
+        # 5. Build the User Interface (in its "loading metadata" state) and start polling worker results
         self.create_widgets()
+        self.poll_background_work()
+        self.refresh_outbox_label()
+        master.after_idle(lambda: self.timer.record("first_paint", _PROCESS_START))
+
+        # 6. Load .env, templates and Jira metadata without blocking the first paint
+        threading.Thread(
+            target=self.load_startup_data, args=(self.project_key.get(),),
+            name="startup-loader", daemon=True
+        ).start()
 
 
 # --- JIRA API HELPER FUNCTIONS ---
     
+    def load_startup_data(self, project_key):
+        """
+        Runs on the 'startup-loader' thread: reads the .env, the template file and the
+        Jira metadata, handing each result to the Tk thread as soon as it is ready.
+        """
+        started = time.perf_counter()
+        try:
+            jira_api.load_config() # First use of dotenv
+            if self.metadata_ttl is not None:
+                jira_api.metadata_cache.ttl = self.metadata_ttl
+        except Exception as e:
+            # E.g. a JIRA_METADATA_TTL that is not a number: keep starting with what was read
+            self.report_startup_error("Configuration Error", f"Could not read the configuration (.env): {e}")
+        self.timer.record("config", started)
+        self.run_on_ui_thread(self.apply_config)
+        self.run_on_ui_thread(self.replay_outbox) # Send what a previous session left pending
+
+        started = time.perf_counter()
+        templates = self.load_templates()
+        self.timer.record("templates", started)
+        self.run_on_ui_thread(self.apply_templates, templates)
+
+        started = time.perf_counter()
+        self.load_jira_metadata(project_key, prefetch=jira_api.PROJECT_KEYS) # First use of requests
+        self.timer.record("metadata", started)
+
+        # Not needed for the first issue: index the templates for the browser last,
+        # naming their priority IDs after the project's priority scheme
+        metadata = jira_api.cached_project_metadata(project_key) or {}
+        try:
+            index = TemplateIndex(templates, priority_names=jira_api.priority_names(metadata.get("field_schemas", {})))
+        except Exception as e:
+            self.report_startup_error("Template Error", f"Templates could not be indexed for the browser: {e}")
+            index = TemplateIndex([])
+        self.run_on_ui_thread(self.apply_template_index, index)
+
+    def report_startup_error(self, title, message):
+        """Logs a failed startup stage and shows it on the Tk thread; startup continues with the next stage."""
+        traceback.print_exc()
+        self.run_on_ui_thread(messagebox.showerror, title, message)
+
     def load_templates(self):
         """
-        Loads issue template data from the local JSON file. 
-        Shows an error if the file is not found.
+        Loads issue template data from the local JSON (or indexed JSONL) file. 
+        Shows an error (on the Tk thread) if the file is missing or cannot be read,
+        and falls back to an empty template list.
         """
         try:
-            with open(TEMPLATES_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
+            return jira_api.load_templates(self.templates_file)
         except FileNotFoundError:
             # Display UI warning if template file is missing.
-            messagebox.showerror("File Error", f"Template file not found: {TEMPLATES_FILE}")
+            self.run_on_ui_thread(messagebox.showerror, "File Error", f"Template file not found: {self.templates_file}")
+            return []
+        except Exception as e:
+            # Malformed JSON/JSONL, unreadable file or offset index
+            self.report_startup_error("File Error", f"Template file could not be read: {self.templates_file}\n\n{e}")
             return []
 
     def make_atlassian_doc(self, text):
         """
-        Converts plain text into the Atlassian Document Format (ADF) JSON structure 
+        Converts plain text/Markdown into the Atlassian Document Format (ADF) JSON structure 
         required for Jira's description field.
         """
-        return {
-            "type": "doc",
-            "version": 1,
-            "content": [
-                {
-                    "type": "paragraph",
-                    "content": [
-                        { "type": "text", "text": text }
-                    ]
-                }
-            ]
-        }
-
-    def load_jira_metadata(self):
+        return jira_api.make_atlassian_doc(text)
+
+    def load_jira_metadata(self, project_key, prefetch=()):
         """
-        Dynamically fetches available issue types and their IDs for the current project.
-        This ensures the app uses valid types recognized by Jira.
+        Dynamically fetches available issue types and their IDs for the given project.
+        This ensures the app uses valid types recognized by Jira. Results come from the
+        in-memory map or the on-disk createmeta cache when available; stale entries are
+        revalidated in the background. Projects listed in 'prefetch' are fetched concurrently
+        so that switching to them later is instant.
+        Runs on a worker thread: results and errors are handed to the Tk thread.
         """
-        
-        project_key = self.project_key.get() 
-        # API endpoint to get issue creation metadata, expanding issue types.
-        url = f"{JIRA_URL}/rest/api/3/issue/createmeta?projectKeys={project_key}&expand=projects.issuetypes"
+        import requests
 
-        # Resetting dynamic lists and map before fetching new data
-        self.available_issue_types = [] 
-        self.issue_types_map = {} 
+        if not jira_api.JIRA_URL or not jira_api.JIRA_API_TOKEN:
+            self.run_on_ui_thread(self.on_metadata_failed, "Configuration Error", "Jira credentials (URL/API_TOKEN) are not configured in the .env.")
+            return False
 
         try:
-            resp = requests.get(
-                url,
-                auth=(JIRA_EMAIL, JIRA_API_TOKEN),
-                headers={ "Accept":"application/json" }
+            results = jira_api.prefetch_project_metadata(
+                [project_key, *prefetch],
+                refresh=self.refresh_metadata,
+                # Revalidation also runs on a worker thread: hand the result back to the Tk thread
+                on_update=lambda meta: self.run_on_ui_thread(self.apply_metadata, meta)
             )
-            # Raises HTTPError for bad responses (4xx or 5xx)
-            resp.raise_for_status() 
-            metadata = resp.json()
-
-            # Check if the project was found in the metadata response
-            if not metadata.get('projects'):
-                messagebox.showerror("Metadata Error", "Project not found or check permissions.")
-                return False
+        except Exception as e:
+            # Never leave the window waiting for metadata that will not arrive
+            traceback.print_exc()
+            self.run_on_ui_thread(self.on_metadata_failed, "Metadata Error", f"Unexpected error while loading Jira metadata: {e!r}", project_key)
+            return False
+        for key, result in results.items():
+            if key != project_key and isinstance(result, Exception):
+                print(f"Metadata prefetch failed for {key}: {result}")
 
-            project_meta = metadata['projects'][0] # Target project's metadata
-            
-            # Map Issue Type Name -> ID and populate the list for the Combobox
-            for issue_type in project_meta.get('issuetypes', []):
-                name = issue_type['name']
-                id_value = issue_type['id']
-                
-                self.available_issue_types.append(name)
-                self.issue_types_map[name] = id_value
-            
-            print(f"Metadata loaded: {len(self.available_issue_types)} issue types found.")
-            return True
+        metadata = results[project_key]
+        if isinstance(metadata, jira_api.ProjectNotFound):
+            # createmeta does not know the project (or the user cannot see it)
+            self.run_on_ui_thread(self.on_metadata_failed, "Metadata Error", "Project not found or check permissions.", project_key)
+            return False
 
-        except requests.exceptions.RequestException as e:
+        if isinstance(metadata, requests.exceptions.RequestException):
             # Handle connection, authentication, and HTTP errors gracefully
-            messagebox.showerror("Connection Error", f"Failed to load Jira metadata. Check URL/Token. Details: {e}")
+            self.run_on_ui_thread(self.on_metadata_failed, "Connection Error", f"Failed to load Jira metadata. Check URL/Token. Details: {metadata}", project_key)
             return False
 
-    def create_issue(self, summary_text, description_text, tpl):
+        if isinstance(metadata, Exception):
+            # E.g. an unexpected createmeta page or a body that is not JSON
+            self.run_on_ui_thread(self.on_metadata_failed, "Metadata Error", f"Unexpected Jira metadata response. Details: {metadata!r}", project_key)
+            return False
+
+        self.run_on_ui_thread(self.apply_metadata, metadata)
+        print(f"Metadata loaded: {len(metadata['issue_types_map'])} issue types found ({len(results)} project(s) prefetched).")
+        return True
+
+    def load_field_lookups(self, project_key):
+        """Runs on a worker thread: caches the project's component, version and field lookups."""
+        import requests
+        try:
+            resolver_for(project_key).warm()
+        except requests.exceptions.RequestException as e:
+            # Not fatal: names are then sent as-is and Jira resolves them
+            print(f"Field lookups failed for {project_key}: {e}")
+
+    def apply_config(self):
+        """Shows the credentials loaded from the .env in the Configuration frame."""
+        self.config_url_label.config(text=f"URL: {jira_api.JIRA_URL}")
+        self.config_user_label.config(text=f"User: {jira_api.JIRA_EMAIL}")
+        self.project_combobox.config(values=jira_api.PROJECT_KEYS)
+
+    def apply_templates(self, templates):
+        """Installs the templates loaded in the background."""
+        self.templates = templates
+
+    def apply_template_index(self, index):
+        """Installs the template search index and refreshes an open browser."""
+        self.template_index = index
+        if hasattr(self, 'template_browser') and self.template_browser.winfo_exists():
+            self.template_browser.set_index(index)
+
+    def apply_metadata(self, metadata):
+        """Installs issue types and field schemas and fills the Issue Type Combobox."""
+        # Ignore late results (e.g. a background revalidation) for a project the user already left
+        project = metadata.get("project_key", self.project_key.get()).upper()
+        if project != self.project_key.get().strip().upper():
+            return
+        self.metadata_project = project
+
+        # Map Issue Type Name -> ID and populate the list for the Combobox
+        self.issue_types_map = dict(metadata["issue_types_map"])
+        self.available_issue_types = list(self.issue_types_map)
+        self.field_schemas = metadata.get("field_schemas", {})
+
+        # Priorities of this project's scheme; a priority the user picked is kept
+        self.priority_names = jira_api.priority_names(self.field_schemas)
+        self.priority_combobox.config(values=list(self.priority_names.values()))
+        if self.current_template and self.priority_level.get() not in self.priority_names.values():
+            self.priority_level.set(template_priority(self.current_template, self.priority_names))
+
+        # Component/version lookups for the template fields, so submitting never waits on them
+        if resolver_for(project).table("components", fetch=False) is None:
+            threading.Thread(target=self.load_field_lookups, args=(project,), name=f"field-lookups-{project}", daemon=True).start()
+
+        self.issue_type_combobox.config(values=self.available_issue_types, state="readonly")
+        if self.issue_type.get() not in self.issue_types_map:
+            # Selects the first loaded issue type as default
+            self.issue_type.set(self.available_issue_types[0] if self.available_issue_types else "")
+            self.toggle_parent_key_field()
+
+        if self.status_message.get() == "Loading Jira metadata...":
+            self.status_message.set("Ready to generate and load issue.")
+
+    def on_metadata_failed(self, title, message, project_key=None):
+        """Reports a metadata loading error; the Issue Type Combobox stays empty."""
+        if project_key and project_key != self.project_key.get().strip().upper():
+            return
+        self.status_label.config(foreground="red")
+        self.status_message.set("Jira metadata unavailable.")
+        messagebox.showerror(title, message)
+
+    def run_on_ui_thread(self, callback, *args):
+        """Schedules a callback from any thread; it runs on the Tk thread at the next poll."""
+        self.ui_callbacks.put((callback, args))
+
+    def build_issue_payload(self, summary_text, description_text, tpl):
         """
-        Submits the POST request to the Jira API to create a new issue.
-        Constructs the payload using dynamically selected and user-edited data.
+        Validates the current selection and builds the 'fields' payload for a new issue.
+        Runs on the Tk thread (reads UI variables); returns None if validation fails.
         """
-        assignee_data = tpl.get("assignee", {}) # Attempts to get assignee from template
-
+        # The selected priority is sent by the ID createmeta lists for it; an unlisted one (the
+        # template's own priority) falls back to the template's reference
         current_priority = self.priority_level.get()
+        priority_id = { name: key for key, name in self.priority_names.items() }.get(current_priority)
         current_issue_type_name = self.issue_type.get() 
         issue_type_id = self.issue_types_map.get(current_issue_type_name) # Get required ID from cached map
 
         # Validate that the selected Issue Type has a valid ID
         if not issue_type_id:
              messagebox.showerror("Error", f"Issue Type '{current_issue_type_name}' is not valid.")
-             return {"success": False, "error": "Invalid Issue Type ID", "details": ""}
-        
+             return None
         
-        payload = {
-            "fields": {
-                "project":{ "key": self.project_key.get() or "AUT" }, # Project Key
-                "issuetype":{ "id": issue_type_id }, # Required Issue Type ID
-                "summary": summary_text, # User-edited summary
-                "description": self.make_atlassian_doc(description_text), # User-edited description in ADF format
-                "priority": { "name": current_priority }, # Selected priority name
-                "labels": tpl.get("labels", []), # Labels from template
-            }
-        }
         
         # --- CONDITIONAL LOGIC: SUBTASK REQUIRES PARENT KEY ---
-        if "Subtarea" in current_issue_type_name or "Sub-task" in current_issue_type_name:
+        parent_key = None
+        if jira_api.is_subtask_type(current_issue_type_name):
             parent_key = self.parent_key.get().strip()
             
             # Subtask validation: Parent Key cannot be empty
             if not parent_key:
                 messagebox.showerror("Subtask Error", "Subtask type requires the Parent Issue Key (e.g., AUT-123).")
-                return {"success": False, "error": "Missing Parent Key", "details": ""}
-            
-            # Add the 'parent' field to the payload
-            payload['fields']['parent'] = { 'key': parent_key } 
-        
+                return None
         
-        # Add assignee only if data exists in the template
-        if assignee_data:
-             payload["fields"]["assignee"] = assignee_data
+        # Components, versions, due date, environment... from the cached lookups (no request here)
+        extra_fields, dropped = resolver_for(self.metadata_project).resolve(tpl, issue_type_id, fetch=False)
+        fields = jira_api.build_issue_fields(
+            tpl,
+            self.project_key.get(), # Project Key
+            issue_type_id, # Required Issue Type ID
+            summary=summary_text, # User-edited summary
+            description=description_text, # User-edited description (converted to ADF)
+            priority_id=priority_id, # Selected priority ID
+            parent_key=parent_key, # Only set for Subtasks
+            extra_fields=extra_fields,
+        )
 
-        try:
-            resp = requests.post(
-                f"{JIRA_URL}/rest/api/3/issue",
-                auth=(JIRA_EMAIL, JIRA_API_TOKEN),
-                # Set headers for JSON data exchange
-                headers={ "Accept":"application/json", "Content-Type":"application/json" },
-                json=payload
+        # Check the payload against the cached field schemas; show every problem at once
+        validator = validator_for(self.metadata_project, current_issue_type_name)
+        errors = validator.validate(fields) if validator else {}
+        if errors:
+            self.show_validation_errors([ f"{field}: {message}" for field, message in errors.items() ])
+            return None
+        if dropped:
+            # The issue is still created, without the template fields Jira would reject
+            messagebox.showwarning(
+                "Fields Not Sent",
+                "\n".join(f"{key}: {reason}" for key, reason in dropped.items())
             )
-            # Check for 4xx or 5xx errors
-            resp.raise_for_status() 
-            # Return success and the key of the created issue
-            return {"success": True, "key": resp.json()["key"]}
-        
-        except requests.exceptions.RequestException as e:
-            # Handle all request/connection errors (e.g., 400 Bad Request, 401 Unauthorized)
-            error_details = e.response.text if e.response is not None else str(e)
-            error_status = e.response.status_code if e.response is not None else 'N/A'
-            return {"success": False, "error": f"API Error: {error_status}", "details": error_details}
-        except Exception as e:
-            # Handle unexpected Python exceptions
-            return {"success": False, "error": f"Unknown Error: {str(e)}", "details": str(e)}
+        return fields
+
+    def show_validation_errors(self, lines, limit=20):
+        """Shows all local validation errors of a submission in a single dialog."""
+        shown = lines[:limit] + ([f"... and {len(lines) - limit} more."] if len(lines) > limit else [])
+        self.status_label.config(foreground="red")
+        self.status_message.set(f"Validation failed: {len(lines)} error(s). Nothing was sent.")
+        messagebox.showerror("Validation Error", "\n".join(shown))
 
    
     # --- EVENT HANDLERS ---
@@ -200,13 +368,20 @@ class JiraApp:
         Selects a random issue template and updates all editable UI fields.
         Also triggers dynamic field checks (e.g., Parent Key visibility).
         """
+        if self.templates is None:
+            self.status_message.set("Templates are still loading...")
+            return
         if not self.templates:
-            self.status_message.set("Error: Templates could not be loaded. Check templates.json.")
+            self.status_message.set(f"Error: Templates could not be loaded. Check {self.templates_file}.")
             return
 
+        # Only the chosen record is decoded when templates come from an indexed JSONL store
+        self.apply_template(random_template(self.templates))
+
+    def apply_template(self, tpl):
+        """Makes 'tpl' the current template and copies its values into the editable fields."""
         # Store the selected template data for submission
-        self.current_template = random.choice(self.templates)
-        tpl = self.current_template
+        self.current_template = tpl
         
         # 1. Update core fields (Summary, Type, Priority)
         self.summary_text.set(tpl["summary"])
@@ -215,8 +390,8 @@ class JiraApp:
         if tpl.get("issuetype", "") in self.available_issue_types:
             self.issue_type.set(tpl.get("issuetype", ""))
             
-        priority_name = tpl.get("priority_name", "Medium")
-        self.priority_level.set(priority_name) 
+        # 'priority_name', or the template's priority ID shown by its name in this project
+        self.priority_level.set(template_priority(tpl, self.priority_names))
         
         # 2. Update auxiliary display fields
         self.labels_label.config(text=f"{', '.join(tpl.get('labels', []))}")
@@ -232,6 +407,35 @@ class JiraApp:
         
         self.status_message.set("Template loaded. Ready for submission.")
 
+    def switch_project(self, event=None):
+        """
+        Activates the project typed or selected in the Project Combobox. Prefetched or cached
+        projects switch instantly; others are loaded on a background thread.
+        """
+        project_key = self.project_key.get().strip().upper()
+        self.project_key.set(project_key)
+        if not project_key or project_key == self.metadata_project:
+            return
+
+        # No issue type may be submitted against the wrong project while this one loads
+        self.metadata_project = None
+        self.issue_types_map = {}
+        self.issue_type_combobox.config(values=[], state="disabled")
+        self.status_label.config(foreground="blue")
+
+        if jira_api.JIRA_URL and jira_api.cached_project_metadata(project_key) is not None:
+            self.apply_metadata(jira_api.get_project_metadata(
+                project_key, on_update=lambda meta: self.run_on_ui_thread(self.apply_metadata, meta)
+            ))
+            self.status_message.set(f"Switched to project {project_key}.")
+            return
+
+        self.status_message.set("Loading Jira metadata...")
+        threading.Thread(
+            target=self.load_jira_metadata, args=(project_key,),
+            name=f"metadata-loader-{project_key}", daemon=True
+        ).start()
+
     def handle_create_issue(self):
         """
         Processes the 'Cargar Issue' button click event. 
@@ -252,32 +456,248 @@ class JiraApp:
             return
         
         # 2. Configuration Validation: Check if .env constants are available
-        if not JIRA_URL or not JIRA_API_TOKEN:
+        if not jira_api.JIRA_URL or not jira_api.JIRA_API_TOKEN:
             messagebox.showerror("Configuration Error", "Jira credentials (URL/API_TOKEN) are not configured in the .env.")
             self.status_message.set("Configuration error (.env).")
             return
             
-        # Update UI state to show processing
-        self.status_label.config(foreground="orange")
-        self.status_message.set("Sending issue to Jira...")
-        self.master.update_idletasks() 
+        if self.metadata_project != self.project_key.get().strip().upper():
+            self.status_message.set(f"Metadata for project {self.project_key.get()} is not loaded yet.")
+            return
+
+        # Templates declaring children are created as a whole hierarchy in the background
+        if has_children(self.current_template):
+            self.create_hierarchy(current_summary, edited_description)
+            return
+
+        # 3. Build the payload on the UI thread (may show validation dialogs)
+        fields = self.build_issue_payload(current_summary, edited_description, self.current_template)
+        if fields is None:
+            return
+
+        # 4. Save it to the outbox, then queue the submission; the HTTP call runs on a background worker
+        entry_id = self.outbox.enqueue(fields, reserve=True) # Sent by the queue, never by a concurrent replay
+        submission_id = self.submissions.submit(entry_id)
+        self.submission_entries[submission_id] = entry_id
+        self.submission_details[submission_id] = ""
+        self.submission_attachments[submission_id] = template_attachments(self.current_template, os.path.dirname(os.path.abspath(self.templates_file)))
+        self.submission_rows.add(submission_id, current_summary)
+        self.submission_list.invalidate()
         
-        # 3. Call the API logic with user-edited and template data
-        response = self.create_issue(current_summary, edited_description, self.current_template)
+        self.status_label.config(foreground="orange")
+        self.status_message.set(f"Issue #{submission_id} queued for submission...")
+        self.update_in_flight_counter()
+
+    def create_hierarchy(self, summary, description):
+        """Creates the current template and all of its children (see hierarchy.py) on a background thread."""
+        root = dict(self.current_template, summary=summary, description=description, issuetype=self.issue_type.get())
+        nodes = build_hierarchy([(None, root)])
+        scheduler = HierarchyScheduler(
+            self.metadata_project, dict(self.issue_types_map), self.issue_type.get(),
+            resolver=resolver_for(self.metadata_project)
+        )
+        # The whole hierarchy is validated locally first: nothing is sent if any issue would be rejected
+        invalid = scheduler.validate(nodes)
+        if invalid:
+            self.show_validation_errors([
+                f"{node.template.get('summary') or f'Issue #{node.number + 1}'} - {field}: {message}"
+                for node, errors in invalid.items() for field, message in errors.items()
+            ])
+            return
+        if not messagebox.askyesno("Create Hierarchy", f"This template declares sub-issues.\nCreate {len(nodes)} issues in {self.metadata_project}?"):
+            return
+
+        self.status_label.config(foreground="orange")
+        self.status_message.set(f"Creating hierarchy of {len(nodes)} issues...")
+
+        def progress(node):
+            done = sum(1 for n in nodes if n.status != PENDING)
+            self.run_on_ui_thread(self.status_message.set, f"Hierarchy: {done}/{len(nodes)} processed (last: {node.key or node.status}).")
+
+        def worker():
+            scheduler.run(nodes, progress=progress)
+            if scheduler.lookup_error:
+                print(f"Field lookups failed for {self.metadata_project}: {scheduler.lookup_error}")
+            self.run_on_ui_thread(self.on_hierarchy_done, nodes)
+
+        threading.Thread(target=worker, name="hierarchy-loader", daemon=True).start()
+
+    def on_hierarchy_done(self, nodes):
+        created = [ node for node in nodes if node.status == CREATED ]
+        failed = [ node for node in nodes if node.status != CREATED ]
+        self.status_label.config(foreground="green" if not failed else "red")
+        self.status_message.set(f"Hierarchy: {len(created)}/{len(nodes)} created (root: {nodes[0].key or 'not created'}).")
+        base_dir = os.path.dirname(os.path.abspath(self.templates_file))
+        for node in created:
+            self.upload_attachments(node.key, template_attachments(node.template, base_dir))
+        if failed:
+            lines = [ f"{node.template.get('summary', '')}: {node.result['error']} {node.result['details']}" for node in failed[:10] ]
+            messagebox.showerror("Hierarchy Errors", f"{len(failed)} issue(s) were not created:\n\n" + "\n".join(lines))
+
+    def poll_background_work(self):
+        """
+        Drains status events from the submission workers and callbacks queued by other
+        background threads. Re-schedules itself with after(), so all widget updates
+        happen on the Tk thread.
+        """
+        # Scheduled first: an exception below must never stop the poller for good
+        self.master.after(POLL_INTERVAL_MS, self.poll_background_work)
+
+        for submission_id, status, result in self.submissions.poll():
+            self.run_safely(self.update_submission_row, submission_id, status, result)
+        self.run_safely(self.update_in_flight_counter)
+        self.run_safely(self.update_latency_label)
+
+        while True:
+            try:
+                callback, args = self.ui_callbacks.get_nowait()
+            except queue.Empty:
+                break
+            self.run_safely(callback, *args)
+
+    def run_safely(self, callback, *args):
+        """Runs one UI update; a failure is logged and does not affect the others."""
+        try:
+            callback(*args)
+        except Exception:
+            print(f"UI callback {getattr(callback, '__name__', callback)} failed:")
+            traceback.print_exc()
+
+    def update_submission_row(self, submission_id, status, result):
+        """Reflects one submission status change in its row and in the status bar."""
+        if submission_id not in self.submission_rows:
+            return
+        if self.submission_rows.get(submission_id, "status") == submission_queue.CREATED:
+            return # A replay already created it; a late worker result must not hide that
+        if status == submission_queue.CANCELLED and submission_id in self.replay_claimed:
+            status, result = submission_queue.DEFERRED, { "error": "Claimed by outbox replay", "details": "The issue was already being sent by an outbox replay and could not be cancelled." }
+        self.submission_rows.update(submission_id, status=status)
+        self.submission_list.invalidate() # Redrawn once per frame, however many rows changed
 
-        # 4. Process and display the API result
-        if response["success"]:
-            msg = f"✅ Success: Issue {response['key']} created."
+        if status == submission_queue.CREATED:
+            self.submission_rows.update(submission_id, result=result["key"])
             self.status_label.config(foreground="green")
-            self.status_message.set(msg)
+            self.status_message.set(f"✅ Success: Issue {result['key']} created.")
+            self.upload_attachments(result["key"], self.submission_attachments.pop(submission_id, []))
+
+        elif status == submission_queue.FAILED:
+            # Extract error code; full details are shown on double-click of the row
+            error_code = result['error'].split(':')[-1].strip()
+            self.submission_rows.update(submission_id, result=result['error'])
+            self.submission_details[submission_id] = result['details']
+            self.status_label.config(foreground="red")
+            self.status_message.set(f"❌ Error {error_code} while creating issue #{submission_id}. Double-click the row for details.")
+
+        elif status == submission_queue.DEFERRED:
+            self.submission_rows.update(submission_id, result=result['error'])
+            self.submission_details[submission_id] = result['details']
+            self.status_label.config(foreground="orange")
+            self.status_message.set(f"Issue #{submission_id} saved to the outbox; it will be sent when Jira is reachable.")
+
+    def upload_attachments(self, issue_key, paths):
+        """Streams the template's files to a created issue on the shared uploader, reporting progress in the status bar."""
+        def progress(issue_key, path, sent, total):
+            percent = sent * 100 // total if total else 100
+            self.run_on_ui_thread(self.status_message.set, f"Uploading {os.path.basename(path)} to {issue_key}: {percent}%")
+
+        def done(issue_key, path, result):
+            self.run_on_ui_thread(self.on_attachment_done, issue_key, path, result)
 
+        for path in paths:
+            self.uploader.submit(issue_key, path, progress=progress, done=done)
+
+    def on_attachment_done(self, issue_key, path, result):
+        if result["success"]:
+            self.status_label.config(foreground="green")
+            self.status_message.set(f"✅ {os.path.basename(path)} attached to {issue_key}.")
         else:
-            # Extract error code and display detailed error to the user
-            error_code = response['error'].split(':')[-1].strip()
-            msg = f"❌ Error {error_code} while creating issue."
             self.status_label.config(foreground="red")
-            self.status_message.set(msg)
-            messagebox.showerror(msg, response['details'])
+            self.status_message.set(f"❌ Could not attach {os.path.basename(path)} to {issue_key}: {result['error']}")
+            messagebox.showerror("Attachment Error", f"{path}\n\n{result['details']}")
+
+    def update_in_flight_counter(self):
+        """Refreshes the label showing how many submissions are queued or being sent."""
+        self.in_flight_label.config(text=f"In flight: {self.submissions.in_flight}")
+
+    def update_outbox_label(self):
+        """Shows how many issues are waiting in the outbox."""
+        self.outbox_label.config(text=f"Outbox: {self.outbox.pending_count()} pending")
+
+    def refresh_outbox_label(self):
+        """
+        Updates the outbox label every OUTBOX_LABEL_MS rather than on every poll: the count
+        is a SQLite query on the Tk thread, and other processes may change the outbox too.
+        """
+        self.master.after(OUTBOX_LABEL_MS, self.refresh_outbox_label)
+        self.run_safely(self.update_outbox_label)
+
+    def replay_outbox(self):
+        """
+        Starts a background replay of pending outbox entries (at most one at a time)
+        and re-schedules itself every OUTBOX_REPLAY_MS.
+        """
+        self.start_outbox_replay()
+        self.master.after(OUTBOX_REPLAY_MS, self.replay_outbox)
+
+    def start_outbox_replay(self):
+        """Replays pending outbox entries now, unless a replay is already running."""
+        if not self.replay_running and jira_api.JIRA_URL and jira_api.JIRA_API_TOKEN and self.outbox.pending_count():
+            self.replay_running = True
+            threading.Thread(target=self.run_outbox_replay, name="outbox-replay", daemon=True).start()
+
+    def run_outbox_replay(self):
+        """Runs on the 'outbox-replay' thread; results are applied on the Tk thread."""
+        try:
+            results = self.outbox.replay()
+        except Exception as e:
+            # Keep the scheduler alive; the entries stay in the outbox
+            results = []
+            print(f"Outbox replay failed: {e}")
+        self.run_on_ui_thread(self.apply_replay_results, results)
+
+    def apply_replay_results(self, results):
+        """Updates the rows of replayed submissions and summarizes the replay in the status bar."""
+        self.replay_running = False
+        rows = { entry_id: submission_id for submission_id, entry_id in self.submission_entries.items() }
+        for entry_id, result in results:
+            if entry_id in rows:
+                if result["success"]:
+                    status = submission_queue.CREATED
+                else:
+                    status = submission_queue.DEFERRED if result.get("deferred") else submission_queue.FAILED
+                self.update_submission_row(rows[entry_id], status, result)
+
+        created = sum(1 for _, result in results if result["success"])
+        if created:
+            self.status_label.config(foreground="green")
+            self.status_message.set(f"✅ Outbox replay: {created} issue(s) created.")
+
+    def update_latency_label(self):
+        """Shows the latency of the last Jira request recorded by the transport."""
+        latency = metrics.registry.last_latency
+        if latency is not None:
+            self.latency_label.config(text=f"Last request: {latency * 1000:.0f} ms ({metrics.registry.last_endpoint})")
+
+    def cancel_selected_submissions(self):
+        """Cancels the selected submissions that have not started sending yet."""
+        not_cancelled = []
+        for submission_id in self.submission_list.selection():
+            if not self.submissions.cancel(submission_id):
+                not_cancelled.append(submission_id)
+            elif not self.outbox.discard(self.submission_entries[submission_id]): # Never replay a cancelled issue
+                # Another process (e.g. 'outbox.py replay') already claimed the entry: it will still be sent
+                self.replay_claimed.add(submission_id)
+                not_cancelled.append(submission_id)
+        if not_cancelled:
+            self.status_label.config(foreground="orange")
+            self.status_message.set(f"{len(not_cancelled)} submission(s) already sent or in progress; cannot cancel.")
+
+    def show_submission_details(self, submission_id=None):
+        """Shows the Jira error details of the double-clicked submission row."""
+        if submission_id is None:
+            submission_id = self.submission_list.focus_id()
+        if submission_id is not None and self.submission_details.get(submission_id):
+            messagebox.showerror(f"Submission #{submission_id}", self.submission_details[submission_id])
 
     def toggle_parent_key_field(self, event=None):
         """
@@ -287,7 +707,7 @@ class JiraApp:
         selected_type = self.issue_type.get()
         
         # Check if the selected type is a Subtask (handles variations like "Sub-task" or "Subtarea").
-        if "Subtarea" in selected_type or "Sub-task" in selected_type: 
+        if jira_api.is_subtask_type(selected_type): 
             row_num = 5 # Target row for grid layout
             self.parent_key_label.grid(row=row_num, column=0, padx=5, pady=5, sticky="w")
             self.parent_key_entry.grid(row=row_num, column=1, padx=5, pady=5, sticky="w")
@@ -309,8 +729,11 @@ class JiraApp:
         # 1. Fixed Configuration Display (Read-only data from .env)
         config_frame = ttk.LabelFrame(main_frame, text="Configuration (From .env)", padding="10")
         config_frame.pack(fill="x", pady=5)
-        ttk.Label(config_frame, text=f"URL: {JIRA_URL}", anchor="w").pack(fill="x")
-        ttk.Label(config_frame, text=f"User: {JIRA_EMAIL}", anchor="w").pack(fill="x")
+        # Filled in by apply_config() once the .env has been read in the background
+        self.config_url_label = ttk.Label(config_frame, text="URL: (loading...)", anchor="w")
+        self.config_url_label.pack(fill="x")
+        self.config_user_label = ttk.Label(config_frame, text="User: (loading...)", anchor="w")
+        self.config_user_label.pack(fill="x")
         
         # 2. Dynamic Controls (Project Key, Issue Type Selector, Generator Button)
         control_frame = ttk.LabelFrame(main_frame, text="Issue Controls", padding="10")
@@ -318,7 +741,11 @@ class JiraApp:
         
         # PROJECT KEY
         ttk.Label(control_frame, text="Project (Key):").grid(row=0, column=0, padx=5, pady=5, sticky="w")
-        ttk.Entry(control_frame, textvariable=self.project_key, width=10).grid(row=0, column=1, padx=5, pady=5, sticky="w")
+        # Editable: lists the prefetched JIRA_PROJECT_KEYS, but any key can be typed
+        self.project_combobox = ttk.Combobox(control_frame, textvariable=self.project_key, values=[], width=10)
+        self.project_combobox.grid(row=0, column=1, padx=5, pady=5, sticky="w")
+        for sequence in ("<<ComboboxSelected>>", "<Return>", "<FocusOut>"):
+            self.project_combobox.bind(sequence, self.switch_project)
         
         # ISSUE TYPE (Combobox, dynamically populated)
         ttk.Label(control_frame, text="Issue Type:").grid(row=0, column=2, padx=5, pady=5, sticky="w")
@@ -326,7 +753,7 @@ class JiraApp:
              control_frame, 
              textvariable=self.issue_type,
              values=self.available_issue_types, # Dynamic list from API
-             state="readonly",
+             state="disabled", # Enabled by apply_metadata() once the types arrive
              width=20
         )
         self.issue_type_combobox.grid(row=0, column=3, padx=5, pady=5, sticky="w")
@@ -336,6 +763,7 @@ class JiraApp:
         
         # Button to load random issue template
         ttk.Button(control_frame, text="Generate Random Task", command=self.load_random_template).grid(row=0, column=4, padx=15, pady=5, sticky="w")
+        ttk.Button(control_frame, text="Browse Templates...", command=self.open_template_browser).grid(row=0, column=5, padx=5, pady=5, sticky="w")
         
         # 3. Issue Detail Frame (Editable Fields)
         fields_frame = ttk.LabelFrame(main_frame, text="Generated Task Details", padding="10")
@@ -356,7 +784,7 @@ class JiraApp:
         self.priority_combobox = ttk.Combobox(
             fields_frame,
             textvariable=self.priority_level, 
-            values=self.available_priorities,
+            values=list(self.priority_names.values()),
             state="readonly",
             width=20
         )
@@ -380,6 +808,30 @@ class JiraApp:
         
         self.status_label = ttk.Label(action_frame, textvariable=self.status_message, font=('Arial', 10, 'italic'), foreground="blue")
         self.status_label.pack(side=tk.LEFT, padx=10)
+
+        # Latency of the most recent Jira request (from the metrics registry)
+        self.latency_label = ttk.Label(action_frame, text="Last request: -", foreground="gray")
+        self.latency_label.pack(side=tk.RIGHT, padx=10)
+
+        # 5. Submission Queue (one status row per queued issue)
+        queue_frame = ttk.LabelFrame(main_frame, text="Submissions", padding="10")
+        queue_frame.pack(fill="both", expand=True, pady=5)
+
+        queue_toolbar = ttk.Frame(queue_frame)
+        queue_toolbar.pack(fill="x")
+        self.in_flight_label = ttk.Label(queue_toolbar, text="In flight: 0")
+        self.in_flight_label.pack(side=tk.LEFT)
+        self.outbox_label = ttk.Label(queue_toolbar, text="Outbox: 0 pending")
+        self.outbox_label.pack(side=tk.LEFT, padx=15)
+        ttk.Button(queue_toolbar, text="Cancel Selected", command=self.cancel_selected_submissions).pack(side=tk.RIGHT)
+        ttk.Button(queue_toolbar, text="Outbox History...", command=self.open_outbox_history).pack(side=tk.RIGHT, padx=5)
+
+        # Virtualized: only the visible rows exist as Treeview items, so long sessions stay responsive
+        self.submission_list = VirtualTreeview(
+            queue_frame, columns=(("id", "#", 40), ("summary", "Summary", 480), ("status", "Status", 90), ("result", "Key / Error", 180)),
+            source=self.submission_rows, height=6, on_activate=self.show_submission_details, follow=True
+        )
+        self.submission_list.pack(fill="both", expand=True, pady=5)
         
         # Set initial UI state based on default Issue Type selection
         self.toggle_parent_key_field()
@@ -398,7 +850,7 @@ class JiraApp:
 
         self.config_menu.add_command(label="Jira Credentials", command=self.open_config_window)
         self.config_menu.add_command(label="Task Options", command=self.open_task_options)
-        self.config_menu.add_command(label="Restart Application", command=self.restart_application)
+        self.config_menu.add_command(label="Reload Configuration", command=self.reload_configuration)
         
         # Help Submenu
         self.help_menu = tk.Menu(self.menu_bar, tearoff=0)
@@ -421,9 +873,9 @@ class JiraApp:
     def open_config_window(self):
         """Handles the creation or focus of the secondary configuration window (Toplevel)."""
         # Retrieve current live configuration values from global constants
-        current_url = JIRA_URL
-        current_email = JIRA_EMAIL
-        current_token = JIRA_API_TOKEN 
+        current_url = jira_api.JIRA_URL
+        current_email = jira_api.JIRA_EMAIL
+        current_token = jira_api.JIRA_API_TOKEN 
 
         # Check if the window is already open; if so, bring it to the front
         if hasattr(self, 'config_window') and self.config_window.winfo_exists():
@@ -431,38 +883,231 @@ class JiraApp:
             return
             
         # Create the new Toplevel window instance
-        # Pass 'self' (the JiraApp instance) for restart functionality
+        # Pass 'self' (the JiraApp instance) so saving can reload the configuration
         self.config_window = ConfigWindow(self.master, current_url, current_email, current_token, self)
 
 
+    def open_template_browser(self):
+        """Opens (or focuses) the searchable template browser."""
+        if hasattr(self, 'template_browser') and self.template_browser.winfo_exists():
+            self.template_browser.lift()
+            return
+        self.template_browser = TemplateBrowser(self.master, self)
+
+    def open_outbox_history(self):
+        """Opens (or focuses) the outbox history window."""
+        if hasattr(self, 'outbox_history') and self.outbox_history.winfo_exists():
+            self.outbox_history.lift()
+            return
+        self.outbox_history = OutboxHistory(self.master, self)
+
     def open_task_options(self):
         """Placeholder for future advanced task configuration."""
         messagebox.showinfo("Options", "Configuring projects and issue types...")
 
 
-    def restart_application(self):
+    def on_close(self):
+        """Stops the submission workers before closing the main window."""
+        if self.submissions.in_flight and not messagebox.askyesno("Exit", "Submissions are still pending. Exit anyway? (They stay in the outbox and are sent on the next start.)"):
+            return
+        if self.uploader.pending and not messagebox.askyesno("Exit", "Attachments are still uploading. Exit anyway? (Queued uploads are cancelled.)"):
+            return
+        self.submissions.shutdown()
+        self.uploader.shutdown(wait=False)
+        self.master.destroy()
+
+    def reload_configuration(self):
         """
-        Forces the application to restart cleanly by destroying the current process
-        and launching a new one, ensuring fresh environment variables are loaded.
+        Re-reads the .env file in the running process instead of restarting it.
+        The HTTP session is swapped atomically: queued submissions carry on with the new
+        credentials, requests already in flight finish on the old connection pool, and
+        metadata is reloaded only if the Jira site or user changed.
         """
-        if not messagebox.askyesno("Restart", "Are you sure you want to restart the application? Unsaved data will be lost."):
+        previous = (jira_api.JIRA_URL, jira_api.JIRA_EMAIL)
+
+        # 1. Load fresh variables from the .env file (this swaps the pooled session)
+        changed = jira_api.load_config(override=True)
+        if self.metadata_ttl is not None:
+            jira_api.metadata_cache.ttl = self.metadata_ttl
+        self.apply_config()
+        if not changed:
+            self.status_message.set("Configuration reloaded: no changes.")
             return
 
-        # 1. Load fresh variables from the .env file into the current environment
-        load_dotenv(override=True)
+        # 2. Queued submissions simply continue on the new session. Entries deferred while
+        # the old configuration was unreachable are replayed right away.
+        if self.outbox.offline:
+            self.outbox.offline = False
+            self.start_outbox_replay()
 
-        # 2. Destroy the current UI window
-        self.master.destroy() 
-        
-        # 3. Execute the script again using the current Python interpreter path
-        os.execl(sys.executable, sys.executable, *sys.argv)
+        # 3. Issue types and field schemas depend on the site and the user's permissions
+        if (jira_api.JIRA_URL, jira_api.JIRA_EMAIL) != previous:
+            self.metadata_project = None
+            self.switch_project()
+        self.status_label.config(foreground="green")
+        self.status_message.set(f"Configuration reloaded: connected to {jira_api.JIRA_URL} as {jira_api.JIRA_EMAIL}.")
+
+
+# --- TEMPLATE BROWSER WINDOW CLASS (Toplevel) ---
+class TemplateBrowser(tk.Toplevel):
+    """Searchable template list: incremental text search, label/priority filters and weighted random picks."""
+
+    ANY = "(any)"
+
+    def __init__(self, master, app_instance):
+        super().__init__(master)
+        self.app_instance = app_instance
+        self.title("Template Browser")
+        self.geometry("820x460")
+        self.transient(master)
+
+        self.query = tk.StringVar()
+        self.label_filter = tk.StringVar(value=self.ANY)
+        self.priority_filter = tk.StringVar(value=self.ANY)
+        self.result_count = tk.StringVar(value="Indexing templates...")
+        self.index = None
+        self.pending_search = None # after() ID of the debounced search
+
+        self.create_widgets()
+        if app_instance.template_index is not None:
+            self.set_index(app_instance.template_index)
+
+    def create_widgets(self):
+        filter_frame = ttk.Frame(self, padding="10")
+        filter_frame.pack(fill="x")
+
+        ttk.Label(filter_frame, text="Search:").pack(side=tk.LEFT)
+        search_entry = ttk.Entry(filter_frame, textvariable=self.query, width=40)
+        search_entry.pack(side=tk.LEFT, padx=5)
+        search_entry.bind("<KeyRelease>", self.schedule_search)
+        search_entry.focus_set()
+
+        ttk.Label(filter_frame, text="Label:").pack(side=tk.LEFT, padx=(10, 0))
+        self.label_combobox = ttk.Combobox(filter_frame, textvariable=self.label_filter, values=[self.ANY], state="readonly", width=15)
+        self.label_combobox.pack(side=tk.LEFT, padx=5)
+        ttk.Label(filter_frame, text="Priority:").pack(side=tk.LEFT, padx=(10, 0))
+        self.priority_combobox = ttk.Combobox(filter_frame, textvariable=self.priority_filter, values=[self.ANY], state="readonly", width=10)
+        self.priority_combobox.pack(side=tk.LEFT, padx=5)
+        for combobox in (self.label_combobox, self.priority_combobox):
+            combobox.bind("<<ComboboxSelected>>", lambda event: self.run_search())
+
+        # Every match is listed: the virtualized list only decodes the templates on screen
+        self.result_list = VirtualTreeview(
+            self, columns=(("summary", "Summary", 480), ("priority", "Priority", 80), ("labels", "Labels", 220)),
+            height=14, on_activate=self.use_template, selectmode="browse"
+        )
+        self.result_list.pack(fill="both", expand=True, padx=10)
+
+        action_frame = ttk.Frame(self, padding="10")
+        action_frame.pack(fill="x")
+        ttk.Label(action_frame, textvariable=self.result_count).pack(side=tk.LEFT)
+        ttk.Button(action_frame, text="Use Template", command=self.use_selected).pack(side=tk.RIGHT)
+        ttk.Button(action_frame, text="Weighted Random", command=self.use_weighted_random).pack(side=tk.RIGHT, padx=5)
+
+    def set_index(self, index):
+        """Connects the browser to a (re)built index and shows the first results."""
+        self.index = index
+        self.label_combobox.config(values=[self.ANY] + index.labels)
+        self.priority_combobox.config(values=[self.ANY] + index.priorities)
+        self.run_search()
+
+    def current_filters(self):
+        label = self.label_filter.get()
+        priority = self.priority_filter.get()
+        return ([label] if label != self.ANY else None), (priority if priority != self.ANY else None)
+
+    def schedule_search(self, event=None):
+        """Debounces keystrokes: searches once typing pauses for SEARCH_DELAY_MS."""
+        if self.pending_search is not None:
+            self.after_cancel(self.pending_search)
+        self.pending_search = self.after(SEARCH_DELAY_MS, self.run_search)
+
+    def run_search(self):
+        """Refreshes the result list for the current query and filters."""
+        self.pending_search = None
+        if self.index is None:
+            return
+        labels, priority = self.current_filters()
+        matches = self.index.match_set(self.query.get(), labels=labels, priority=priority)
+        self.result_list.set_source(TemplateRows(
+            self.index.templates, None if matches is None else sorted(matches), self.index.priority_names
+        ))
+        self.result_count.set(f"{len(self.result_list.source)} matching template(s)")
+
+    def use_selected(self):
+        """Loads the selected template into the main window."""
+        number = self.result_list.focus_id()
+        if number is not None:
+            self.use_template(number)
+
+    def use_weighted_random(self):
+        """Loads a random template from the current matches, weighted by priority."""
+        if self.index is None:
+            return
+        labels, priority = self.current_filters()
+        matches = self.index.match_set(self.query.get(), labels=labels, priority=priority)
+        number = self.index.sample(matches)
+        if number is not None:
+            self.use_template(number)
+
+    def use_template(self, number):
+        self.app_instance.apply_template(self.index.templates[number])
+        self.app_instance.status_message.set(f"Template #{number} loaded from the browser. Ready for submission.")
+
+
+# --- OUTBOX HISTORY WINDOW CLASS (Toplevel) ---
+class OutboxHistory(tk.Toplevel):
+    """Every outbox entry, newest first, paged lazily from SQLite; refreshed while the window is open."""
+
+    def __init__(self, master, app_instance):
+        super().__init__(master)
+        self.app_instance = app_instance
+        self.title("Outbox History")
+        self.geometry("820x460")
+        self.transient(master)
+
+        self.rows = OutboxRows(app_instance.outbox)
+        self.entry_count = tk.StringVar()
+        self.create_widgets()
+        self.refresh()
+
+    def create_widgets(self):
+        self.history_list = VirtualTreeview(
+            self, columns=(("id", "#", 60), ("summary", "Summary", 400), ("status", "Status", 80), ("key", "Key", 90), ("error", "Last Error", 180)),
+            source=self.rows, height=16, on_activate=self.show_error
+        )
+        self.history_list.pack(fill="both", expand=True, padx=10, pady=(10, 0))
+
+        action_frame = ttk.Frame(self, padding="10")
+        action_frame.pack(fill="x")
+        ttk.Label(action_frame, textvariable=self.entry_count).pack(side=tk.LEFT)
+
+    def refresh(self):
+        """Picks up new entries and status changes; rows stay at their position (newest are added on top)."""
+        if not self.winfo_exists():
+            return
+        previous = len(self.rows)
+        self.rows.reload()
+        added = len(self.rows) - previous
+        if self.history_list.top:
+            self.history_list.top += added # Keep the same entries on screen
+        if self.history_list.cursor is not None:
+            self.history_list.cursor += added
+        self.history_list.render()
+        self.entry_count.set(f"{len(self.rows)} outbox entries")
+        self.after(HISTORY_REFRESH_MS, self.refresh)
+
+    def show_error(self, entry_id):
+        error = dict(self.history_list.slots).get(entry_id, ("",) * 5)[4]
+        if error:
+            messagebox.showerror(f"Outbox entry #{entry_id}", error)
 
 
 # --- CONFIGURATION WINDOW CLASS (Toplevel) ---
 class ConfigWindow(tk.Toplevel):
     """Secondary window for editing and saving Jira API credentials to the .env file."""
     
-    # Receive the JiraApp instance to call the restart method later
+    # Receive the JiraApp instance to reload the configuration after saving
     def __init__(self, master, current_url, current_email, current_token, app_instance):
         super().__init__(master)
         self.app_instance = app_instance # Store reference to the main app instance
@@ -477,10 +1122,27 @@ class ConfigWindow(tk.Toplevel):
 
         self.create_widgets()
 
-    # (create_widgets method in ConfigWindow is omitted for brevity, assumed correct)
+    def create_widgets(self):
+        """Builds the credential form (URL, email, API token) and its buttons."""
+        form = ttk.Frame(self, padding="10")
+        form.pack(fill=tk.BOTH, expand=True)
+
+        ttk.Label(form, text="Jira URL:").grid(row=0, column=0, sticky="w", pady=5)
+        ttk.Entry(form, textvariable=self.url_var, width=50).grid(row=0, column=1, sticky="ew", pady=5)
+        ttk.Label(form, text="Email:").grid(row=1, column=0, sticky="w", pady=5)
+        ttk.Entry(form, textvariable=self.email_var, width=50).grid(row=1, column=1, sticky="ew", pady=5)
+        ttk.Label(form, text="API Token:").grid(row=2, column=0, sticky="w", pady=5)
+        ttk.Entry(form, textvariable=self.token_var, width=50, show="*").grid(row=2, column=1, sticky="ew", pady=5)
+
+        buttons = ttk.Frame(form)
+        buttons.grid(row=3, column=0, columnspan=2, sticky="e", pady=(10, 0))
+        ttk.Button(buttons, text="Save", command=self.save_and_close).pack(side=tk.RIGHT, padx=5)
+        ttk.Button(buttons, text="Cancel", command=self.destroy).pack(side=tk.RIGHT)
+        form.columnconfigure(1, weight=1)
 
     def save_and_close(self):
-        """Validates input, saves new credentials to .env, and prompts for restart."""
+        """Validates input, saves new credentials to .env and applies them without a restart."""
+        from dotenv import set_key
         new_url = self.url_var.get().strip()
         new_email = self.email_var.get().strip()
         new_token = self.token_var.get().strip()
@@ -491,24 +1153,34 @@ class ConfigWindow(tk.Toplevel):
             return
 
         try:
-            # Prepare and write new content to the .env file
-            env_content = f"JIRA_URL=\"{new_url}\"\nJIRA_EMAIL=\"{new_email}\"\nJIRA_API_TOKEN=\"{new_token}\"\n"
-            
-            with open(".env", "w") as f:
-                f.write(env_content)
-            
-            self.destroy() 
-
-            # Prompt user to restart and apply changes
-            if messagebox.askyesno("Success", "Credentials saved. Restart application now to take effect?"):
-                self.app_instance.restart_application()
-            
+            # Update only the credential keys: other settings in the .env (TTL, project keys) are kept
+            if not os.path.exists(".env"):
+                open(".env", "a").close()
+            for key, value in (("JIRA_URL", new_url), ("JIRA_EMAIL", new_email), ("JIRA_API_TOKEN", new_token)):
+                set_key(".env", key, value)
         except Exception as e:
             messagebox.showerror("Saving Error", f"Could not write to the .env file: {e}")
+            return
+
+        self.destroy()
+        # Apply the new credentials in the running process (queued submissions keep going)
+        self.app_instance.reload_configuration()
 
 
 # --- EXECUTION BLOCK ---
 if __name__ == "__main__":
+    imports_done = time.perf_counter()
+
+    parser = argparse.ArgumentParser(description="Jira Issue Loader (GUI).")
+    parser.add_argument("--refresh-metadata", action="store_true", help="Ignore the createmeta disk cache and fetch it live.")
+    parser.add_argument("--metadata-ttl", type=int, default=None, help="Seconds a cached createmeta entry is used without revalidation.")
+    parser.add_argument("--templates", default=TEMPLATES_FILE, help="Template file (JSON array or indexed .jsonl).")
+    parser.add_argument("--startup-timing", action="store_true", help="Print how long each startup phase took.")
+    args = parser.parse_args()
+
+    timer = StartupTimer(enabled=args.startup_timing)
+    timer.record("import", _PROCESS_START, imports_done)
+
     root = tk.Tk()
     
     # Theme configuration
@@ -518,5 +1190,5 @@ if __name__ == "__main__":
     except tk.TclError:
         pass 
 
-    app = JiraApp(root)
-    root.mainloop()
\ No newline at end of file
+    app = JiraApp(root, refresh_metadata=args.refresh_metadata, metadata_ttl=args.metadata_ttl, timer=timer, templates_file=args.templates)
+    root.mainloop()
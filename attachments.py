@@ -0,0 +1,197 @@
+"""
+Streaming attachment uploads for templates that reference files.
+
+A template lists its files under "attachments" (paths relative to the template file):
+
+    { "summary": "Caída del servicio de colas", "attachments": ["logs/mq-bundle.zip"] }
+
+Once the issue exists, each file is sent to POST /issue/{key}/attachments as a
+multipart/form-data body that is streamed from disk (MultipartFileStream): only a
+small buffer is held in memory however large the file is, and the body has a known
+Content-Length. Uploads run on a bounded worker pool (AttachmentUploader) and report
+progress as bytes are sent.
+"""
+import io, mimetypes, os, threading, uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import jira_api
+
+# --- UPLOAD SETTINGS ---
+ATTACHMENT_WORKERS = 3         # Concurrent uploads (each keeps one pooled connection busy)
+PROGRESS_STEP = 1024 * 1024    # Report progress every N bytes sent (and at the end)
+# ----------------------------------------
+
+
+def template_attachments(tpl, base_dir=None):
+    """Absolute paths of the files a template references (relative paths resolve against base_dir)."""
+    paths = tpl.get("attachments") or []
+    if isinstance(paths, str):
+        paths = [paths]
+    return [ os.path.abspath(os.path.join(base_dir or "", os.path.expanduser(path))) for path in paths ]
+
+
+class MultipartFileStream(io.RawIOBase):
+    """
+    multipart/form-data body carrying one file, read from disk as the HTTP client sends it.
+    len() is the exact body size (so requests sends a Content-Length instead of chunking);
+    seek(0) rewinds it, so a throttled request can be retried.
+    """
+
+    def __init__(self, path, field_name="file", progress=None):
+        super().__init__()
+        self.path = path
+        self.boundary = uuid.uuid4().hex
+        filename = os.path.basename(path).replace('"', "%22")
+        mime_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        self.head = (
+            f"--{self.boundary}\r\n"
+            f'Content-Disposition: form-data; name="{field_name}"; filename="{filename}"\r\n'
+            f"Content-Type: {mime_type}\r\n\r\n"
+        ).encode("utf-8")
+        self.tail = f"\r\n--{self.boundary}--\r\n".encode("utf-8")
+        self.file_size = os.path.getsize(path)
+        self.length = len(self.head) + self.file_size + len(self.tail)
+        self.progress = progress # progress(bytes of the file sent, file size)
+        self._file = None
+        self.seek(0)
+
+    @property
+    def content_type(self):
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    def __len__(self):
+        return self.length
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if offset != 0 or whence != io.SEEK_SET:
+            raise io.UnsupportedOperation("MultipartFileStream can only be rewound to the start.")
+        if self._file is not None:
+            self._file.close()
+        self._file = open(self.path, "rb")
+        self._position = 0
+        self._reported = 0
+        return 0
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = self.length - self._position
+        chunks = []
+        while size > 0 and self._position < self.length:
+            head_end = len(self.head)
+            file_end = head_end + self.file_size
+            if self._position < head_end:
+                chunk = self.head[self._position:self._position + size]
+            elif self._position < file_end:
+                chunk = self._file.read(min(size, file_end - self._position))
+                if not chunk:
+                    raise OSError(f"{self.path} shrank while it was being uploaded.")
+            else:
+                start = self._position - file_end
+                chunk = self.tail[start:start + size]
+            chunks.append(chunk)
+            self._position += len(chunk)
+            size -= len(chunk)
+        self._report()
+        return b"".join(chunks)
+
+    def readinto(self, buffer):
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        super().close()
+
+    def _report(self):
+        if self.progress is None:
+            return
+        sent = min(max(0, self._position - len(self.head)), self.file_size)
+        if sent - self._reported >= PROGRESS_STEP or (sent == self.file_size and self._reported != sent):
+            self._reported = sent
+            self.progress(sent, self.file_size)
+
+
+def upload_attachment(issue_key, path, progress=None):
+    """
+    Streams one file to POST /rest/api/3/issue/{key}/attachments.
+    Returns {"success": True, "id": ..., "filename": ..., "size": ...} or {"success": False, "error": ..., "details": ...}.
+    """
+    import requests
+    try:
+        stream = MultipartFileStream(path, progress=progress)
+    except OSError as e:
+        return {"success": False, "error": "File Error", "details": str(e)}
+
+    try:
+        resp = jira_api.get_session().post(
+            f"/rest/api/3/issue/{issue_key}/attachments",
+            # Jira rejects attachment uploads without this header (XSRF protection)
+            headers={ "X-Atlassian-Token": "no-check", "Content-Type": stream.content_type },
+            data=stream
+        )
+        resp.raise_for_status()
+        attachment = resp.json()[0]
+        return {"success": True, "id": attachment.get("id"), "filename": attachment.get("filename"), "size": attachment.get("size")}
+    except requests.exceptions.RequestException as e:
+        error_details = e.response.text if e.response is not None else str(e)
+        error_status = e.response.status_code if e.response is not None else 'N/A'
+        return {"success": False, "error": f"API Error: {error_status}", "details": error_details}
+    except OSError as e:
+        return {"success": False, "error": "File Error", "details": str(e)}
+    finally:
+        stream.close()
+
+
+class AttachmentUploader:
+    """
+    Bounded pool of upload workers shared by every issue, so many large files never
+    open more than max_workers connections at once.
+    """
+
+    def __init__(self, max_workers=ATTACHMENT_WORKERS):
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="attachment")
+        self._lock = threading.Lock()
+        self.pending = 0 # Uploads queued or running
+
+    def submit(self, issue_key, path, progress=None, done=None):
+        """
+        Queues one upload. progress(issue_key, path, sent, total) and done(issue_key, path, result)
+        are called from the worker thread. Returns a Future of the result.
+        """
+        with self._lock:
+            self.pending += 1
+
+        def run():
+            try:
+                result = upload_attachment(
+                    issue_key, path,
+                    progress=(lambda sent, total: progress(issue_key, path, sent, total)) if progress else None
+                )
+            finally:
+                with self._lock:
+                    self.pending -= 1
+            if done:
+                done(issue_key, path, result)
+            return result
+        return self._pool.submit(run)
+
+    def upload_all(self, jobs, progress=None, done=None):
+        """Uploads every (issue key, path) job and returns their results in order."""
+        futures = [ self.submit(issue_key, path, progress, done) for issue_key, path in jobs ]
+        return [ future.result() for future in futures ]
+
+    def shutdown(self, wait=True):
+        self._pool.shutdown(wait=wait, cancel_futures=not wait)
@@ -0,0 +1,44 @@
+"""
+Micro-benchmark of Markdown -> ADF conversion throughput.
+
+Compares the uncached converter (adf.convert) with the memoized path used by
+payload building (adf.markdown_to_adf) on the descriptions of a template file,
+simulating a bulk load that reuses each description many times.
+
+Usage:
+    python bench_adf.py [--templates templates.json] [--iterations 20000]
+"""
+import argparse, itertools, time
+
+import adf
+from template_store import open_template_store
+
+
+def run(label, func, descriptions, iterations):
+    """Converts 'iterations' descriptions (cycling through the corpus) and prints the rate."""
+    started = time.perf_counter()
+    for text in itertools.islice(itertools.cycle(descriptions), iterations):
+        func(text)
+    elapsed = time.perf_counter() - started
+    print(f"{label:<28} {iterations / elapsed:12,.0f} docs/s   ({elapsed * 1000:8.1f} ms total)")
+    return elapsed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Markdown -> ADF conversion.")
+    parser.add_argument("--templates", default="templates.json", help="Template file providing the descriptions.")
+    parser.add_argument("--iterations", type=int, default=20000, help="Conversions per measurement.")
+    args = parser.parse_args(argv)
+
+    descriptions = [ tpl.get("description", "") for tpl in open_template_store(args.templates) ]
+    print(f"{len(descriptions)} distinct descriptions, {args.iterations} conversions per run\n")
+
+    uncached = run("convert (uncached)", adf.convert, descriptions, args.iterations)
+    adf.markdown_to_adf.cache_clear()
+    cached = run("markdown_to_adf (memoized)", adf.markdown_to_adf, descriptions, args.iterations)
+
+    info = adf.markdown_to_adf.cache_info()
+    print(f"\nSpeed-up: {uncached / cached:.1f}x   cache hits={info.hits} misses={info.misses}")
+
+
+if __name__ == "__main__":
+    main()
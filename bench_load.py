@@ -0,0 +1,131 @@
+"""
+Load-test benchmark: drives the loader against a local mock Jira (mock_jira.py) and
+reports throughput and p50/p95/p99 request latency, without touching a real instance.
+
+Scenarios:
+    metadata  repeated live createmeta fetches (cache bypassed)
+    single    one POST /issue per template, sent by a pool of workers (GUI path)
+    bulk      POST /issue/bulk in chunks of up to 50 (bulk_loader path)
+
+Usage:
+    python bench_load.py --issues 2000 --workers 8 --latency-ms 30 --jitter-ms 20
+    python bench_load.py --scenario bulk --rate-limit 20 --throttle-rate 0.05
+    python bench_load.py --url http://127.0.0.1:8765   # use an already running mock
+"""
+import argparse, itertools, tempfile, time
+from concurrent.futures import ThreadPoolExecutor
+
+import jira_api, metrics
+from bulk_loader import chunked
+from mock_jira import MockJiraServer, add_fault_arguments, fault_options
+from template_store import open_template_store
+
+SCENARIOS = ("metadata", "single", "bulk")
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+def report(name, latencies, elapsed, issues=None, failed=0):
+    """Prints one result row: requests, throughput and latency percentiles in ms."""
+    ordered = sorted(latencies)
+    ms = lambda seconds: seconds * 1000
+    rate = f"{issues / elapsed:10,.1f} issues/s" if issues is not None else f"{len(ordered) / elapsed:10,.1f} req/s   "
+    print(
+        f"{name:<9} {len(ordered):6d} req  {failed:5d} failed  {rate}  "
+        f"p50={ms(percentile(ordered, 50)):7.1f}ms  p95={ms(percentile(ordered, 95)):7.1f}ms  "
+        f"p99={ms(percentile(ordered, 99)):7.1f}ms  wall={elapsed:6.2f}s"
+    )
+
+def timed(func, latencies):
+    """Wraps func so that every call's duration is appended to 'latencies'."""
+    def wrapper(*args):
+        started = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            latencies.append(time.perf_counter() - started)
+    return wrapper
+
+
+def bench_metadata(project_key, requests_count, workers):
+    latencies = []
+    fetch = timed(lambda _: jira_api.fetch_project_metadata(project_key), latencies)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(fetch, range(requests_count)))
+    report("metadata", latencies, time.perf_counter() - started)
+
+def bench_single(payloads, workers):
+    latencies = []
+    create = timed(jira_api.create_issue, latencies)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(create, payloads))
+    failed = sum(1 for r in results if not r["success"])
+    report("single", latencies, time.perf_counter() - started, issues=len(payloads) - failed, failed=failed)
+
+def bench_bulk(payloads, workers, chunk_size):
+    latencies = []
+    create = timed(jira_api.bulk_create_issues, latencies)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = [ r for chunk in pool.map(create, chunked(payloads, chunk_size)) for r in chunk ]
+    failed = sum(1 for r in results if not r["success"])
+    report("bulk", latencies, time.perf_counter() - started, issues=len(payloads) - failed, failed=failed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Jira loader against a local mock server.")
+    parser.add_argument("--url", default=None, help="Use a mock server that is already running instead of an in-process one.")
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS, help="Scenario to run (repeatable; default: all).")
+    parser.add_argument("--templates", default=jira_api.TEMPLATES_FILE, help="Template file used to build payloads.")
+    parser.add_argument("--project", default="AUT", help="Project key the payloads target.")
+    parser.add_argument("--issues", type=int, default=1000, help="Issues created per create scenario.")
+    parser.add_argument("--metadata-requests", type=int, default=50, help="createmeta calls in the metadata scenario.")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent client threads.")
+    parser.add_argument("--chunk-size", type=int, default=jira_api.BULK_CHUNK_SIZE, help="Issues per bulk request.")
+    add_fault_arguments(parser)
+    metrics.add_metrics_arguments(parser)
+    args = parser.parse_args(argv)
+    scenarios = args.scenario or list(SCENARIOS)
+
+    server = None
+    if args.url is None:
+        server = MockJiraServer(**fault_options(args)).start()
+    url = args.url or server.url
+
+    # Never reuse or pollute the real createmeta cache
+    jira_api.configure(url, "bench@example.com", "bench-token")
+    jira_api.metadata_cache.cache_dir = tempfile.mkdtemp(prefix="jira-bench-cache-")
+
+    try:
+        issue_types_map = jira_api.get_project_metadata(args.project, refresh=True)["issue_types_map"]
+        type_id = next(iter(issue_types_map.values()))
+        templates = open_template_store(args.templates)
+        payloads = [
+            jira_api.build_issue_fields(tpl, args.project, type_id)
+            for tpl in itertools.islice(itertools.cycle(templates), args.issues)
+        ]
+
+        print(f"Target: {url}  workers={args.workers}  issues={args.issues}  chunk={args.chunk_size}\n")
+        if "metadata" in scenarios:
+            bench_metadata(args.project, args.metadata_requests, args.workers)
+        if "single" in scenarios:
+            bench_single(payloads, args.workers)
+        if "bulk" in scenarios:
+            bench_bulk(payloads, args.workers, args.chunk_size)
+        if server:
+            print(f"\nMock server handled {server.state.request_count} requests (including retries).")
+        metrics.export_metrics(args)
+    finally:
+        if server:
+            server.stop()
+
+
+if __name__ == "__main__":
+    main()
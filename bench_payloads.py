@@ -0,0 +1,61 @@
+"""
+Micro-benchmark of create-issue payload building.
+
+Compares the dict path (jira_api.build_issue_fields + JSON serialization of the
+whole body, as create_issue/bulk_create_issues do) with precompiled
+PayloadSkeletons that splice only the per-issue summary into pre-encoded bytes.
+
+Usage:
+    python bench_payloads.py [--templates templates.json] [--iterations 50000]
+"""
+import argparse, itertools, time
+
+import adf, jira_api
+from payload_skeleton import PayloadSkeleton
+from template_store import open_template_store
+
+
+def run(label, build, templates, iterations):
+    """Builds 'iterations' payloads (cycling through the templates) and prints the rate."""
+    started = time.perf_counter()
+    size = 0
+    for number, tpl in itertools.islice(itertools.cycle(enumerate(templates)), iterations):
+        size += len(build(number, tpl))
+    elapsed = time.perf_counter() - started
+    print(f"{label:<34} {iterations / elapsed:12,.0f} payloads/s   ({elapsed * 1000:8.1f} ms, {size / iterations:6.0f} B avg)")
+    return elapsed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark create-issue payload building.")
+    parser.add_argument("--templates", default=jira_api.TEMPLATES_FILE, help="Template file providing the payloads.")
+    parser.add_argument("--iterations", type=int, default=50000, help="Payloads built per measurement.")
+    args = parser.parse_args(argv)
+
+    templates = list(open_template_store(args.templates))
+    print(f"{len(templates)} templates, {args.iterations} payloads per run\n")
+
+    def dict_path(number, tpl):
+        fields = jira_api.build_issue_fields(tpl, "AUT", "10001", summary=f"{tpl['summary']} #{number}")
+        return jira_api.issue_update_json(fields)
+
+    skeletons = {}
+    def skeleton_path(number, tpl):
+        skeleton = skeletons.get(number)
+        if skeleton is None:
+            skeleton = skeletons[number] = PayloadSkeleton(tpl, "AUT", "10001")
+        return skeleton.render(summary=f"{tpl['summary']} #{number}")
+
+    def uncached_path(number, tpl):
+        fields = jira_api.build_issue_fields(tpl, "AUT", "10001", summary=f"{tpl['summary']} #{number}")
+        fields["description"] = adf.convert(tpl.get("description", ""))
+        return jira_api.issue_update_json(fields)
+
+    uncached = run("dict + uncached ADF (pre-memo)", uncached_path, templates, args.iterations)
+    current = run("dict + memoized ADF (current)", dict_path, templates, args.iterations)
+    compiled = run("skeleton render (summary spliced)", skeleton_path, templates, args.iterations)
+
+    print(f"\nSpeed-up vs current: {current / compiled:.1f}x   vs uncached ADF: {uncached / compiled:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
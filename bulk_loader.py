@@ -0,0 +1,322 @@
+"""
+Headless bulk loader: submits templates.json (or a filtered subset, repeated N times)
+through Jira's POST /rest/api/3/issue/bulk endpoint in chunks of up to 50 issues,
+and writes a per-item result manifest. Metadata for every target project is prefetched
+concurrently before the first issue is sent.
+
+Usage:
+    python bulk_loader.py --project AUT --issue-type Task --repeat 10
+    python bulk_loader.py --project AUT --project OPS --project SEC   # same selection into each project
+    python bulk_loader.py --label SQL --label AD --manifest sql_ad_results.json
+    python bulk_loader.py --repeat 100 --metrics-json metrics.json --metrics-prom metrics.prom
+
+Templates that declare "children" (see hierarchy.py) are created as parent/child
+hierarchies: parent keys are filled in automatically as soon as each parent exists.
+Files listed under a template's "attachments" are streamed to each created issue
+afterwards (see attachments.py); their results are recorded in the manifest.
+"""
+import argparse, json, os, sys
+from datetime import datetime, timezone
+
+import jira_api, metrics
+from jira_api import BULK_CHUNK_SIZE
+from payload_skeleton import SkeletonCache
+from field_validation import validator_for, validation_result
+from field_resolution import resolver_for
+from hierarchy import HierarchyScheduler, build_hierarchy, has_children, CANCELLED, CREATED
+from attachments import AttachmentUploader, template_attachments, ATTACHMENT_WORKERS
+
+
+def select_templates(templates, labels=None, indices=None, repeat=1):
+    """
+    Returns the list of (template_index, template) pairs to submit.
+    Filters by template index and/or label (any match), then repeats the subset N times.
+    """
+    selected = []
+    for i, tpl in enumerate(templates):
+        if indices and i not in indices:
+            continue
+        if labels and not set(labels) & set(tpl.get("labels", [])):
+            continue
+        selected.append((i, tpl))
+    return selected * repeat
+
+def chunked(items, size):
+    """Yields consecutive slices of at most 'size' items."""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def report_dropped(dropped, progress):
+    """Warns about the template fields left out of the payloads ({"template N"/"node N": {key: reason}})."""
+    if not dropped:
+        return
+    progress(f"{len(dropped)} payload(s) leave out template fields:")
+    for source, fields in dropped.items():
+        for key, reason in fields.items():
+            progress(f"  ⚠️ {source}: '{key}' was not sent: {reason}")
+
+def run_bulk_load(selected, project_key, issue_types_map, default_issue_type,
+                  parent_key=None, chunk_size=BULK_CHUNK_SIZE, progress=print, first_index=0, resolver=None):
+    """
+    Builds one payload per selected template and submits them chunk by chunk.
+    Each distinct template is compiled into a PayloadSkeleton once; repeats reuse its bytes.
+    Payloads failing local validation against the cached field schemas are rejected up front.
+    'resolver' (a prepared FieldResolver) adds the templates' components, versions, etc.
+    Returns the manifest items (one per submitted template, in order, numbered from first_index).
+    """
+    items = []
+    skeletons = SkeletonCache(resolver)
+    skeleton_errors = {} # id(skeleton) -> local validation errors, checked once per compiled skeleton
+    dropped = {} # "template N" -> {template key: reason} of the fields left out of its payload
+    for template_index, tpl in selected:
+        # Prefer the template's own issue type when the project knows it
+        type_name = tpl.get("issuetype") if tpl.get("issuetype") in issue_types_map else default_issue_type
+        skeleton = skeletons.get(
+            template_index, tpl, project_key, issue_types_map[type_name],
+            parent_key=parent_key if jira_api.is_subtask_type(type_name) else None
+        )
+        if skeleton.dropped:
+            dropped.setdefault(f"template {template_index}", skeleton.dropped)
+        item = {
+            "index": first_index + len(items),
+            "project": project_key,
+            "template_index": template_index,
+            "summary": tpl["summary"],
+            "issuetype": type_name,
+        }
+        if tpl.get("attachments"):
+            item["attachments"] = tpl["attachments"]
+        errors = skeleton_errors.get(id(skeleton))
+        if errors is None:
+            validator = validator_for(project_key, type_name)
+            errors = skeleton_errors[id(skeleton)] = validator.validate(skeleton.fields) if validator else {}
+        if errors:
+            # Certain to be rejected: never sent
+            result = validation_result(errors)
+            item.update(status="failed", error=result["error"], details=result["details"])
+        else:
+            item["payload"] = skeleton.render()
+        items.append(item)
+
+    report_dropped(dropped, progress)
+    rejected = [ item for item in items if "payload" not in item ]
+    if rejected:
+        progress(f"{len(rejected)} item(s) rejected by local validation:")
+        for item in rejected:
+            progress(f"  ❌ item {item['index']} (template {item['template_index']}): {item['details']}")
+
+    to_send = [ item for item in items if "payload" in item ]
+    total_chunks = (len(to_send) + chunk_size - 1) // chunk_size
+    for chunk_number, chunk in enumerate(chunked(to_send, chunk_size), start=1):
+        results = jira_api.bulk_create_payloads([ item.pop("payload") for item in chunk ])
+
+        for item, result in zip(chunk, results):
+            if result["success"]:
+                item.update(status="created", key=result["key"], id=result["id"])
+            else:
+                item.update(status="failed", error=result["error"], details=result["details"])
+                progress(f"  ❌ item {item['index']} (template {item['template_index']}): {result['error']} {result['details']}")
+
+        created = sum(1 for item in chunk if item["status"] == "created")
+        progress(f"Chunk {chunk_number}/{total_chunks}: {created}/{len(chunk)} created.")
+
+    return items
+
+def run_hierarchy_load(selected, project_key, issue_types_map, default_issue_type,
+                       chunk_size=BULK_CHUNK_SIZE, progress=print, first_index=0, resolver=None):
+    """
+    Creates templates that declare children through the HierarchyScheduler.
+    Returns one manifest item per node (parents before children); 'parent' is the parent's item index.
+    """
+    nodes = build_hierarchy(selected)
+    scheduler = HierarchyScheduler(project_key, issue_types_map, default_issue_type, chunk_size=chunk_size, resolver=resolver)
+
+    def report(node):
+        if node.status != CREATED:
+            progress(f"  ❌ node {first_index + node.number} ({node.template.get('summary', '')}): {node.result['error']} {node.result['details']}")
+
+    progress(f"Creating {len(nodes)} issues from {len(selected)} hierarchical template(s) in {project_key}...")
+    scheduler.run(nodes, progress=report)
+    if scheduler.lookup_error:
+        progress(f"Field lookups failed for {project_key}: {scheduler.lookup_error} (names were sent as-is).")
+    report_dropped({ f"node {first_index + node.number}": fields for node, fields in scheduler.dropped.items() }, progress)
+
+    items = []
+    for node in nodes:
+        item = {
+            "index": first_index + node.number,
+            "project": project_key,
+            "template_index": node.template_index,
+            "summary": node.template.get("summary", ""),
+            "issuetype": scheduler.issue_type_for(node),
+            "parent": first_index + node.parent.number if node.parent else None,
+            "depth": node.depth,
+            "status": node.status,
+        }
+        if node.template.get("attachments"):
+            item["attachments"] = node.template["attachments"]
+        if node.status == CREATED:
+            item.update(key=node.result["key"], id=node.result["id"])
+        else:
+            item.update(error=node.result["error"], details=node.result["details"])
+        items.append(item)
+
+    created = sum(1 for node in nodes if node.status == CREATED)
+    progress(f"Hierarchy: {created}/{len(nodes)} created.")
+    return items
+
+def upload_item_attachments(items, base_dir=None, max_workers=ATTACHMENT_WORKERS, progress=print):
+    """
+    Streams the files of every created item to its issue on a bounded pool of uploaders.
+    Each item's "attachments" becomes a list of {"path", "status", "id"/"error", "details"}.
+    Returns the number of failed uploads.
+    """
+    jobs, slots = [], []
+    for item in items:
+        if not item.get("attachments"):
+            continue
+        paths = template_attachments(item, base_dir)
+        if item["status"] != "created":
+            item["attachments"] = [ { "path": path, "status": "skipped" } for path in paths ]
+            continue
+        item["attachments"] = []
+        for path in paths:
+            jobs.append((item["key"], path))
+            slots.append(item)
+    if not jobs:
+        return 0
+
+    progress(f"Uploading {len(jobs)} attachment(s) with {max_workers} worker(s)...")
+    uploader = AttachmentUploader(max_workers)
+    try:
+        results = uploader.upload_all(jobs)
+    finally:
+        uploader.shutdown()
+
+    failed = 0
+    for (issue_key, path), item, result in zip(jobs, slots, results):
+        if result["success"]:
+            item["attachments"].append({ "path": path, "status": "uploaded", "id": result["id"] })
+        else:
+            failed += 1
+            item["attachments"].append({ "path": path, "status": "failed", "error": result["error"], "details": result["details"] })
+            progress(f"  ❌ {issue_key} {os.path.basename(path)}: {result['error']} {result['details']}")
+    progress(f"Attachments: {len(jobs) - failed}/{len(jobs)} uploaded.")
+    return failed
+
+def write_manifest(path, items, started_at, project_keys):
+    """Writes the JSON result manifest for the whole run."""
+    manifest = {
+        "jira_url": jira_api.JIRA_URL,
+        "projects": list(project_keys),
+        "started_at": started_at,
+        "finished_at": datetime.now(timezone.utc).isoformat(),
+        "total": len(items),
+        "created": sum(1 for item in items if item["status"] == "created"),
+        "failed": sum(1 for item in items if item["status"] == "failed"),
+        "cancelled": sum(1 for item in items if item["status"] == CANCELLED),
+        "items": items,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk-create Jira issues from templates.json.")
+    parser.add_argument("--templates", default=jira_api.TEMPLATES_FILE, help="Template file (JSON array or indexed .jsonl).")
+    parser.add_argument("--project", action="append", dest="projects", help="Target project key (repeatable; default: AUT).")
+    parser.add_argument("--issue-type", default=None, help="Issue type name used when the template has none (defaults to the project's first type).")
+    parser.add_argument("--parent", default=None, help="Parent issue key, required when submitting Subtasks.")
+    parser.add_argument("--label", action="append", dest="labels", help="Only submit templates carrying this label (repeatable).")
+    parser.add_argument("--index", action="append", type=int, dest="indices", help="Only submit the template at this position (repeatable).")
+    parser.add_argument("--repeat", type=int, default=1, help="Submit the selected templates N times.")
+    parser.add_argument("--chunk-size", type=int, default=BULK_CHUNK_SIZE, help=f"Issues per bulk request (max {BULK_CHUNK_SIZE}).")
+    parser.add_argument("--manifest", default="bulk_results.json", help="Path of the result manifest.")
+    parser.add_argument("--attachment-workers", type=int, default=ATTACHMENT_WORKERS, help="Concurrent attachment uploads.")
+    parser.add_argument("--refresh-metadata", action="store_true", help="Ignore the createmeta disk cache and fetch it live.")
+    parser.add_argument("--metadata-ttl", type=int, default=None, help="Seconds a cached createmeta entry is used without revalidation.")
+    metrics.add_metrics_arguments(parser)
+    args = parser.parse_args(argv)
+
+    if not 1 <= args.chunk_size <= BULK_CHUNK_SIZE:
+        parser.error(f"--chunk-size must be between 1 and {BULK_CHUNK_SIZE}.")
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1.")
+    if args.attachment_workers < 1:
+        parser.error("--attachment-workers must be at least 1.")
+    args.projects = list(dict.fromkeys(key.upper() for key in args.projects or ["AUT"]))
+    return args
+
+def main(argv=None):
+    import requests
+    args = parse_args(argv)
+    jira_api.load_config()
+    if args.metadata_ttl is not None:
+        jira_api.metadata_cache.ttl = args.metadata_ttl
+
+    if not jira_api.JIRA_URL or not jira_api.JIRA_API_TOKEN:
+        print("Configuration error: Jira credentials (URL/API_TOKEN) are not configured in the .env.", file=sys.stderr)
+        return 2
+
+    try:
+        templates = jira_api.load_templates(args.templates)
+    except FileNotFoundError:
+        print(f"Template file not found: {args.templates}", file=sys.stderr)
+        return 2
+
+    selected = select_templates(templates, args.labels, args.indices, args.repeat)
+    if not selected:
+        print("No templates match the given filters.", file=sys.stderr)
+        return 2
+
+    # Every project's metadata is fetched up front (concurrently); switching below is a lookup
+    metadata = jira_api.prefetch_project_metadata(args.projects, refresh=args.refresh_metadata)
+    targets = []
+    for project_key in args.projects:
+        if isinstance(metadata[project_key], Exception):
+            print(f"Failed to load Jira metadata for {project_key}: {metadata[project_key]}", file=sys.stderr)
+            return 2
+        issue_types_map = metadata[project_key]["issue_types_map"]
+
+        default_issue_type = args.issue_type or next(iter(issue_types_map), None)
+        if default_issue_type not in issue_types_map:
+            print(f"Issue Type '{default_issue_type}' is not valid for project {project_key}.", file=sys.stderr)
+            return 2
+        if jira_api.is_subtask_type(default_issue_type) and not args.parent:
+            print("Subtask type requires --parent (e.g., AUT-123).", file=sys.stderr)
+            return 2
+
+        # Component/version/field lookups for the whole selection: one request per resource type
+        try:
+            resolver = resolver_for(project_key).prepare(dict(selected).values())
+        except requests.exceptions.RequestException as e:
+            print(f"Failed to resolve template fields for {project_key}: {e}", file=sys.stderr)
+            return 2
+        targets.append((project_key, issue_types_map, default_issue_type, resolver))
+
+    flat = [ (i, tpl) for i, tpl in selected if not has_children(tpl) ]
+    hierarchical = [ (i, tpl) for i, tpl in selected if has_children(tpl) ]
+
+    started_at = datetime.now(timezone.utc).isoformat()
+    items = []
+    for project_key, issue_types_map, default_issue_type, resolver in targets:
+        if flat:
+            print(f"Submitting {len(flat)} issues to {project_key} in chunks of {args.chunk_size}...")
+            items += run_bulk_load(flat, project_key, issue_types_map, default_issue_type,
+                                   parent_key=args.parent, chunk_size=args.chunk_size, first_index=len(items),
+                                   resolver=resolver)
+        if hierarchical:
+            items += run_hierarchy_load(hierarchical, project_key, issue_types_map, default_issue_type,
+                                        chunk_size=args.chunk_size, first_index=len(items), resolver=resolver)
+    # Attachment paths are relative to the template file
+    failed_uploads = upload_item_attachments(items, os.path.dirname(os.path.abspath(args.templates)), args.attachment_workers)
+    manifest = write_manifest(args.manifest, items, started_at, args.projects)
+
+    print(f"Done: {manifest['created']} created, {manifest['failed']} failed, {manifest['cancelled']} cancelled. Manifest: {args.manifest}")
+    metrics.export_metrics(args)
+    return 0 if manifest["failed"] == manifest["cancelled"] == failed_uploads == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
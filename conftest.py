@@ -0,0 +1,2 @@
+# test_auth.py is a manual check of the .env credentials against the real Jira site, not a test
+collect_ignore = ["test_auth.py"]
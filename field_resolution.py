@@ -0,0 +1,237 @@
+"""
+Maps template keys to Jira fields.
+
+Templates carry more than summary/description/labels: 'priority' IDs, 'components'
+and 'fixVersions' by name, 'duedate', 'environment' and, optionally, custom fields
+by name. A FieldResolver turns them into create-issue fields for one project:
+
+- component and version names become {"id": ...} references;
+- other template keys are matched against GET /field (ID or name, case-insensitive)
+  and sent only when the cached createmeta schema says their value has the right type;
+- when the issue type's createmeta schemas are cached, fields that are not on its
+  create screen are left out instead of making Jira reject the whole issue.
+
+resolve() returns the fields left out, with the reason, so callers can warn about them.
+
+Lookups are cached in memory per Jira site and project (dropped by clear_caches()
+when the site or user changes, since another user may see other fields). prepare()
+loads everything a batch of templates needs with one request per resource type, so
+bulk loads never make a lookup call per issue.
+"""
+import threading
+
+import jira_api
+from field_validation import check_value
+
+# Template keys handled by build_issue_fields itself or by the loader, never sent as extra fields
+CORE_KEYS = {
+    "summary", "description", "labels", "assignee", "priority", "priority_name",
+    "issuetype", "children", "project", "parent", "attachments",
+}
+
+# Template key -> (Jira field ID, project resource used to resolve names, or None)
+TEMPLATE_FIELDS = {
+    "components": ("components", "components"),
+    "fixVersions": ("fixVersions", "versions"),
+    "versions": ("versions", "versions"),
+    "duedate": ("duedate", None),
+    "environment": ("environment", None),
+}
+
+# createmeta schema types whose template values are sent as written (once type-checked);
+# options, users, cascading selects... need a conversion a template cannot express
+PASS_THROUGH_TYPES = ("string", "number", "date", "datetime")
+TEXTAREA_SUFFIX = ":textarea" # Custom multi-line text fields take ADF in API v3
+
+_resolvers = {} # (Jira URL, project key) -> FieldResolver
+_resolvers_lock = threading.Lock()
+_site_fields = {} # Jira URL -> {lower-case field ID or name: field ID}
+_site_fields_lock = threading.Lock()
+
+
+def fetch_components(project_key):
+    """{Component name: ID} from GET /project/{key}/components."""
+    resp = jira_api.get_session().get(f"/rest/api/3/project/{project_key}/components")
+    resp.raise_for_status()
+    return { c["name"]: c["id"] for c in resp.json() }
+
+def fetch_versions(project_key):
+    """{Version name: ID} from GET /project/{key}/versions."""
+    resp = jira_api.get_session().get(f"/rest/api/3/project/{project_key}/versions")
+    resp.raise_for_status()
+    return { v["name"]: v["id"] for v in resp.json() }
+
+def fetch_fields():
+    """{Lower-case field ID or name: field ID} for every field of the site (GET /field)."""
+    resp = jira_api.get_session().get("/rest/api/3/field")
+    resp.raise_for_status()
+    lookup = {}
+    for field in resp.json():
+        lookup.setdefault(field["name"].lower(), field["id"])
+        lookup[field["id"].lower()] = field["id"]
+    return lookup
+
+def site_fields(fetch=True):
+    """Cached field lookup of the configured site; None if not loaded and 'fetch' is False."""
+    url = jira_api.JIRA_URL
+    with _site_fields_lock:
+        lookup = _site_fields.get(url)
+    if lookup is None and fetch:
+        lookup = fetch_fields()
+        with _site_fields_lock:
+            _site_fields[url] = lookup
+    return lookup
+
+def resolver_for(project_key):
+    """The shared FieldResolver of a project on the configured Jira site."""
+    key = (jira_api.JIRA_URL, project_key.upper())
+    with _resolvers_lock:
+        resolver = _resolvers.get(key)
+        if resolver is None:
+            resolver = _resolvers[key] = FieldResolver(project_key.upper())
+        return resolver
+
+def site_field_value(field_id, schema, value):
+    """
+    Checks a template value for a site (custom) field against its createmeta schema.
+    Returns (value to send, None), or (None, why it is not sent).
+    """
+    if schema is None:
+        return None, "Its type is unknown (no createmeta is cached for this issue type)."
+    field_type = schema.get("schema", {}).get("type")
+    if field_type == "array" and schema["schema"].get("items") == "string" and "allowedValues" not in schema:
+        if isinstance(value, list) and all(isinstance(item, str) for item in value):
+            return value, None
+        return None, "Must be a list of strings."
+    if field_type not in PASS_THROUGH_TYPES or "allowedValues" in schema:
+        return None, f"Fields of type '{field_type}' cannot be set from a template."
+    if field_type == "string" and not isinstance(value, str):
+        return None, "Must be a string."
+    error = check_value(field_id, schema, value)
+    if error:
+        return None, error
+    if field_type == "string" and schema["schema"].get("custom", "").endswith(TEXTAREA_SUFFIX):
+        return jira_api.make_atlassian_doc(value), None
+    return value, None
+
+def clear_caches():
+    """Forgets every cached resolver and site field lookup (the site or user changed; see jira_api.configure)."""
+    with _resolvers_lock:
+        for resolver in _resolvers.values():
+            resolver.invalidate() # Resolvers still held by a running load must not serve stale tables
+        _resolvers.clear()
+    with _site_fields_lock:
+        _site_fields.clear()
+
+
+class FieldResolver:
+    """Resolves template values to Jira field values for one project, caching each lookup table."""
+
+    FETCHERS = { "components": fetch_components, "versions": fetch_versions }
+
+    def __init__(self, project_key):
+        self.project_key = project_key
+        self.tables = {} # Resource type -> {name: ID}
+        self._lock = threading.Lock()
+
+    def needed_resources(self, templates):
+        """Resource types (plus 'fields' for custom keys) referenced by a batch of templates."""
+        needed = set()
+        stack = list(templates)
+        while stack:
+            tpl = stack.pop()
+            stack.extend(tpl.get("children", [])) # Hierarchy templates (see hierarchy.py)
+            for key, value in tpl.items():
+                if key in TEMPLATE_FIELDS:
+                    resource = TEMPLATE_FIELDS[key][1]
+                    if resource and value:
+                        needed.add(resource)
+                elif key not in CORE_KEYS:
+                    needed.add("fields")
+        return needed
+
+    def prepare(self, templates):
+        """
+        Loads every lookup table the templates need: at most one request per resource type,
+        and none for tables already cached. Raises requests exceptions on HTTP errors.
+        """
+        for resource in sorted(self.needed_resources(templates)):
+            if resource == "fields":
+                site_fields()
+            else:
+                self.table(resource)
+        return self
+
+    def warm(self):
+        """Loads every lookup table (components, versions, site fields), e.g. before interactive use."""
+        for resource in self.FETCHERS:
+            self.table(resource)
+        site_fields()
+
+    def table(self, resource, fetch=True):
+        """{name: ID} for 'components' or 'versions'; None if not loaded and 'fetch' is False."""
+        with self._lock:
+            table = self.tables.get(resource)
+        if table is None and fetch:
+            table = self.FETCHERS[resource](self.project_key)
+            with self._lock:
+                self.tables[resource] = table
+        return table
+
+    def invalidate(self):
+        """Drops the cached tables (e.g. after components or versions were edited in Jira)."""
+        with self._lock:
+            self.tables.clear()
+
+    def resolve(self, tpl, issue_type_id=None, fetch=True):
+        """
+        Extra create-issue fields for a template (everything beyond build_issue_fields' core).
+        With fetch=False nothing is requested: unknown names are sent as {"name": ...}.
+        Returns (fields, dropped): 'dropped' maps each Jira field of the template that is
+        left out to the reason, for the caller to report.
+        """
+        screen = self.screen_schemas(issue_type_id)
+        fields, dropped = {}, {}
+        for key, value in tpl.items():
+            if key in CORE_KEYS or value in (None, "", []):
+                continue
+            if key in TEMPLATE_FIELDS:
+                field_id, resource = TEMPLATE_FIELDS[key]
+            else:
+                lookup = site_fields(fetch)
+                field_id, resource = (lookup or {}).get(key.lower()), None
+                if field_id is None:
+                    continue # Not a Jira field: template metadata only
+            if screen is not None and field_id not in screen:
+                # Jira would reject the issue: the field is not on its create screen
+                dropped[key] = "Not on the create screen of this issue type."
+                continue
+
+            if key not in TEMPLATE_FIELDS:
+                value, error = site_field_value(field_id, (screen or {}).get(field_id), value)
+                if error:
+                    dropped[key] = error
+                else:
+                    fields[field_id] = value
+            elif resource:
+                table = self.table(resource, fetch) or {}
+                names = value if isinstance(value, list) else [value]
+                fields[field_id] = [ { "id": table[name] } if name in table else { "name": name } for name in names ]
+            elif field_id == "environment":
+                fields[field_id] = jira_api.make_atlassian_doc(value) # Rich text in API v3
+            else:
+                fields[field_id] = value
+        return fields, dropped
+
+    def screen_schemas(self, issue_type_id):
+        """{Field ID: schema} of the create screen of an issue type, from the cached createmeta (None if unknown)."""
+        if issue_type_id is None:
+            return None
+        entry = jira_api.cached_project_metadata(self.project_key)
+        if not entry:
+            return None
+        for name, type_id in entry.get("issue_types_map", {}).items():
+            if type_id == issue_type_id:
+                schemas = entry.get("field_schemas", {}).get(name)
+                return schemas or None
+        return None
@@ -0,0 +1,192 @@
+"""
+Local validation of create-issue payloads against the cached createmeta field schemas.
+
+compile_validator() turns the {Field ID: schema} map of one issue type into a
+FieldValidator: a list of small per-field checks (required fields, allowed values
+for priority/components/options, date formats, label syntax, unknown fields).
+Running it before sending catches the requests Jira would certainly reject with a
+400, without spending a round trip or rate-limit budget on them.
+
+Errors use Jira's own shape ({Field ID: message}), so they read like API errors.
+"""
+import re, threading
+from datetime import date, datetime
+
+import jira_api
+
+# --- VALIDATION SETTINGS ---
+SUMMARY_MAX_LENGTH = 255       # Jira rejects longer summaries
+ALWAYS_ALLOWED = ("project", "issuetype") # Set by the app itself, not always listed as screen fields
+# ----------------------------------------
+
+DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}$")
+
+_compiled = {} # (project key, issue type name) -> (schemas, FieldValidator)
+_compiled_lock = threading.Lock()
+
+
+def _is_empty(value):
+    return value is None or value == "" or value == [] or value == {} or (isinstance(value, str) and not value.strip())
+
+def _check_date(value):
+    if not isinstance(value, str) or not DATE_RE.match(value):
+        return "Error parsing date string. Use the format yyyy-MM-dd."
+    try:
+        date.fromisoformat(value)
+    except ValueError:
+        return f"'{value}' is not a valid date."
+    return None
+
+def _check_datetime(value):
+    try:
+        datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return "Error parsing date-time string. Use the ISO 8601 format."
+    return None
+
+def _check_text(value):
+    # Rich-text fields (description, environment) take an ADF document in API v3
+    if isinstance(value, str) or (isinstance(value, dict) and value.get("type") == "doc"):
+        return None
+    return "Must be a string or an Atlassian Document."
+
+def _check_number(value):
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return "Must be a number."
+    return None
+
+def _check_labels(value):
+    if not isinstance(value, list):
+        return "Must be a list of labels."
+    for label in value:
+        if not isinstance(label, str) or not label:
+            return "Labels must be non-empty strings."
+        if " " in label:
+            return f"The label '{label}' contains spaces which is invalid."
+    return None
+
+def _check_reference(value):
+    # Users, parents, projects, issue types...: an object identifying the target
+    if not isinstance(value, dict) or not any(value.get(k) for k in ("id", "key", "name", "accountId", "value")):
+        return "Must be an object with an 'id', 'key' or 'name'."
+    return None
+
+def _allowed_check(allowed_values):
+    """Check accepting an object whose id or name (or 'value') is one of the allowed values."""
+    ids = { str(v["id"]) for v in allowed_values if v.get("id") is not None }
+    names = { v["name"] for v in allowed_values if v.get("name") is not None }
+    shown_values = sorted(names) or sorted(ids)
+    listing = ", ".join(shown_values[:10]) + (", ..." if len(shown_values) > 10 else "")
+
+    def check_one(value):
+        if not isinstance(value, dict):
+            return "Must be an object with an 'id' or 'name'."
+        if str(value.get("id")) in ids or value.get("name") in names or value.get("value") in names:
+            return None
+        shown = value.get("name") or value.get("value") or value.get("id")
+        return f"'{shown}' is not an allowed value (allowed: {listing})."
+    return check_one
+
+def _compile_field(field_id, schema):
+    """Returns the check function for one field, or None if only presence matters."""
+    field_type = schema.get("schema", {}).get("type")
+    allowed_values = schema.get("allowedValues")
+    if field_id == "summary":
+        def check_summary(value):
+            if not isinstance(value, str):
+                return "Must be a string."
+            if len(value) > SUMMARY_MAX_LENGTH:
+                return f"Summary must be less than {SUMMARY_MAX_LENGTH} characters."
+            return None
+        return check_summary
+    if field_id == "labels":
+        return _check_labels
+
+    if allowed_values is not None:
+        check_one = _allowed_check(allowed_values)
+        if field_type == "array":
+            def check_many(value):
+                if not isinstance(value, list):
+                    return "Must be a list."
+                return next((error for error in map(check_one, value) if error), None)
+            return check_many
+        return check_one
+
+    return {
+        "date": _check_date,
+        "datetime": _check_datetime,
+        "string": _check_text,
+        "number": _check_number,
+        "user": _check_reference,
+        "issuelink": _check_reference,
+    }.get(field_type)
+
+
+class FieldValidator:
+    """Compiled checks for one issue type; validate() returns {Field ID: message} ({} if valid)."""
+
+    def __init__(self, field_schemas):
+        self.required = [
+            (field_id, schema.get("name") or field_id) for field_id, schema in field_schemas.items()
+            if schema.get("required") and field_id not in ALWAYS_ALLOWED
+        ]
+        self.known = set(field_schemas) | set(ALWAYS_ALLOWED)
+        self.checks = {}
+        for field_id, schema in field_schemas.items():
+            check = _compile_field(field_id, schema)
+            if check is not None:
+                self.checks[field_id] = check
+
+    def validate(self, fields):
+        errors = {}
+        for field_id, name in self.required:
+            if _is_empty(fields.get(field_id)):
+                errors[field_id] = f"{name} is required."
+        for field_id, value in fields.items():
+            if field_id in errors:
+                continue
+            if field_id not in self.known:
+                errors[field_id] = f"Field '{field_id}' cannot be set. It is not on the appropriate screen, or unknown."
+                continue
+            check = self.checks.get(field_id)
+            error = check(value) if check is not None and not _is_empty(value) else None
+            if error:
+                errors[field_id] = error
+        return errors
+
+
+def check_value(field_id, schema, value):
+    """Error message for one field value against its createmeta schema, or None if it passes."""
+    check = _compile_field(field_id, schema)
+    return check(value) if check is not None else None
+
+def compile_validator(field_schemas):
+    """Builds a FieldValidator from the {Field ID: schema} map of one issue type."""
+    return FieldValidator(field_schemas)
+
+def validator_for(project_key, issue_type_name):
+    """
+    FieldValidator for an issue type of a project, compiled from the cached metadata.
+    Recompiled when the metadata changes. None when no field schemas are known (validation is skipped).
+    """
+    entry = jira_api.cached_project_metadata(project_key) if project_key else None
+    schemas = (entry or {}).get("field_schemas", {}).get(issue_type_name)
+    if not schemas:
+        return None
+    key = (project_key.upper(), issue_type_name)
+    with _compiled_lock:
+        cached = _compiled.get(key)
+        if cached is not None and cached[0] is schemas:
+            return cached[1]
+    validator = compile_validator(schemas)
+    with _compiled_lock:
+        _compiled[key] = (schemas, validator)
+    return validator
+
+def format_errors(errors):
+    """'field: message; field: message', like the details of a Jira 400 response."""
+    return "; ".join(f"{field}: {message}" for field, message in errors.items())
+
+def validation_result(errors):
+    """Failed submission result for a payload rejected locally (same shape as jira_api results)."""
+    return { "success": False, "error": "Validation Error", "details": format_errors(errors) }
@@ -0,0 +1,270 @@
+"""
+Parent/child issue hierarchies (epic -> story -> subtasks) declared in templates.
+
+A template declares its children inline:
+
+    { "summary": "Migrar correo a Exchange Online", "issuetype": "Task",
+      "children": [
+          { "summary": "Inventario de buzones", "issuetype": "Subtarea" },
+          { "summary": "Configurar conectores", "issuetype": "Subtarea" }
+      ] }
+
+build_hierarchy() flattens such templates into a DAG of HierarchyNode objects and
+HierarchyScheduler creates it level by level without waiting for whole levels: as
+soon as a bulk call returns, the children of every created node get their parent
+key and become ready, and ready nodes are sent through POST /issue/bulk on a
+small worker pool. A node that fails cancels only its own descendants.
+
+Children without an explicit 'issuetype' take the type one level below their parent
+(a standard type under an epic, a subtask type under a standard issue). A template
+that puts an issue where Jira cannot accept it (e.g. anything under a subtask) is
+rejected as a whole before any of its issues is sent.
+
+Hierarchies are created directly, not through the outbox (outbox.py): a child's
+payload depends on its parent's key, which only exists once the parent is created.
+A crash or timeout mid-hierarchy is therefore not replayed or deduplicated.
+"""
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+import jira_api
+from jira_api import BULK_CHUNK_SIZE
+from field_validation import validator_for, validation_result
+
+# --- SCHEDULER DEFAULTS ---
+HIERARCHY_WORKERS = 4          # Concurrent bulk requests
+# ----------------------------------------
+
+# --- NODE STATUSES ---
+PENDING = "pending"
+CREATED = "created"
+FAILED = "failed"
+CANCELLED = "cancelled"
+# ----------------------------------------
+
+
+def hierarchy_level(issue_type_name):
+    """Jira hierarchy level of an issue type: 1 for epics, 0 for standard types, -1 for subtasks."""
+    if jira_api.is_subtask_type(issue_type_name):
+        return -1
+    return 1 if jira_api.is_epic_type(issue_type_name) else 0
+
+
+class HierarchyNode:
+    """One issue to create: its template, its parent node (None for roots) and its children."""
+
+    def __init__(self, number, template, parent=None, template_index=None):
+        self.number = number                  # Position in the flattened DAG (parents before children)
+        self.template = template
+        self.template_index = template_index  # Index of the root template in the template file
+        self.parent = parent
+        self.children = []
+        self.depth = parent.depth + 1 if parent else 0
+        self.status = PENDING
+        self.key = None
+        self.result = None
+
+    def descendants(self):
+        """Every node below this one (depth first)."""
+        stack = list(self.children)
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(node.children)
+
+
+def has_children(tpl):
+    return bool(tpl.get("children"))
+
+def count_nodes(tpl):
+    """Number of issues a (possibly hierarchical) template creates."""
+    return 1 + sum(count_nodes(child) for child in tpl.get("children", []))
+
+def build_hierarchy(selected):
+    """
+    Flattens (template_index, template) pairs into HierarchyNodes, parents before children.
+    Child templates are stored without their own 'children' key.
+    """
+    nodes = []
+    for template_index, tpl in selected:
+        stack = [(tpl, None)]
+        while stack:
+            template, parent = stack.pop()
+            node = HierarchyNode(
+                len(nodes), { k: v for k, v in template.items() if k != "children" },
+                parent=parent, template_index=template_index
+            )
+            nodes.append(node)
+            if parent:
+                parent.children.append(node)
+            # Reversed so that siblings keep their declaration order
+            stack.extend((child, node) for child in reversed(template.get("children", [])))
+    return nodes
+
+
+class HierarchyScheduler:
+    """
+    Creates a DAG of HierarchyNodes through bulk calls, releasing each node's children as
+    soon as it exists in Jira. run() returns when every node is created, failed or cancelled.
+    """
+
+    def __init__(self, project_key, issue_types_map, default_issue_type=None, chunk_size=BULK_CHUNK_SIZE,
+                 max_workers=HIERARCHY_WORKERS, create_fn=None, resolver=None):
+        self.project_key = project_key
+        self.issue_types_map = issue_types_map
+        self.default_issue_type = default_issue_type or next(iter(issue_types_map), None)
+        # Default types of children, one level below their parent's type
+        self.standard_issue_type = next(
+            (name for name in (self.default_issue_type, *issue_types_map) if name in issue_types_map and hierarchy_level(name) == 0), None
+        )
+        self.subtask_issue_type = next((name for name in issue_types_map if hierarchy_level(name) == -1), None)
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
+        self.create_fn = create_fn or jira_api.bulk_create_payloads # list of bodies -> list of results
+        self.resolver = resolver # FieldResolver for the templates' components, versions, etc.
+        self.lookup_error = None # Exception raised while run() loaded the field lookups, if any
+        self.dropped = {} # Node -> {template key: reason} of the template fields left out of its payload
+
+    def issue_type_for(self, node):
+        """The node's own issue type if the project knows it, else the default below its parent's type (None if there is none)."""
+        name = node.template.get("issuetype")
+        if name in self.issue_types_map:
+            return name
+        if node.parent is None:
+            return self.default_issue_type
+        parent_type = self.issue_type_for(node.parent)
+        if parent_type is None:
+            return None
+        return self.standard_issue_type if hierarchy_level(parent_type) > 0 else self.subtask_issue_type
+
+    def hierarchy_error(self, node):
+        """Why Jira cannot create the node at its place in the hierarchy, or None."""
+        issue_type = self.issue_type_for(node)
+        if issue_type is None:
+            return "The project has no issue type that can be created at this level."
+        if node.parent is None:
+            return None
+        parent_type = self.issue_type_for(node.parent)
+        if parent_type is None:
+            return None # Reported on the parent
+        if hierarchy_level(parent_type) < 0:
+            return f"'{parent_type}' is a subtask type and cannot have child issues."
+        if hierarchy_level(issue_type) != hierarchy_level(parent_type) - 1:
+            return f"A '{issue_type}' cannot be created under a '{parent_type}'."
+        return None
+
+    def fields_for(self, node, parent_key=None):
+        issue_type_id = self.issue_types_map[self.issue_type_for(node)]
+        # Lookups are loaded by run() (or already cached): resolving never makes a request per node
+        extra_fields, dropped = self.resolver.resolve(node.template, issue_type_id, fetch=False) if self.resolver else (None, {})
+        if dropped:
+            self.dropped[node] = dropped
+        return jira_api.build_issue_fields(
+            node.template, self.project_key, issue_type_id, parent_key=parent_key, extra_fields=extra_fields
+        )
+
+    def payload_for(self, node):
+        """Serialized create body; the parent key is known by the time a node is ready."""
+        return jira_api.issue_update_json(self.fields_for(node, node.parent.key if node.parent else None))
+
+    def validate(self, nodes):
+        """
+        Local validation of every node (its place in the hierarchy, then its fields against the
+        cached field schemas), before anything is sent. Children are checked with a placeholder
+        parent key. Returns {node: errors} for invalid nodes.
+        """
+        invalid = {}
+        for node in nodes:
+            error = self.hierarchy_error(node)
+            if error:
+                invalid[node] = { "issuetype": error }
+                continue
+            validator = validator_for(self.project_key, self.issue_type_for(node))
+            if validator is None:
+                continue
+            errors = validator.validate(self.fields_for(node, f"{self.project_key}-0" if node.parent else None))
+            if errors:
+                invalid[node] = errors
+        return invalid
+
+    def run(self, nodes, progress=None):
+        """
+        Creates every node. Nodes failing local validation are rejected up front (cancelling
+        their descendants, or their whole template for a hierarchy error). progress(node) is called (from the calling thread) each time a
+        node reaches a final status. Returns the nodes; a failed field lookup is not fatal and
+        is left in lookup_error for the caller to report, like the template fields left out
+        of each payload (in 'dropped').
+        """
+        self.lookup_error = None
+        self.dropped = {}
+        if self.resolver:
+            try:
+                self.resolver.prepare(node.template for node in nodes) # One request per lookup type
+            except Exception as e:
+                # Not fatal: unresolved component/version names are sent as {"name": ...}
+                self.lookup_error = e
+        invalid = self.validate(nodes)
+        for node, errors in invalid.items():
+            if node.status != PENDING:
+                continue # Already cancelled by an invalid ancestor
+            node.status, node.result = FAILED, validation_result(errors)
+            if progress:
+                progress(node)
+            self._cancel_descendants(node, progress)
+        for node in [ node for node in invalid if node.parent and self.hierarchy_error(node) ]:
+            # The template's tree cannot exist in Jira: create none of it rather than a partial tree
+            root = node
+            while root.parent:
+                root = root.parent
+            for other in (root, *root.descendants()):
+                if other.status == PENDING:
+                    other.status = CANCELLED
+                    other.result = {
+                        "success": False, "error": "Cancelled",
+                        "details": f"Issue '{node.template.get('summary', '')}' of this template cannot be placed in the hierarchy.",
+                    }
+                    if progress:
+                        progress(other)
+
+        ready = deque(node for node in nodes if node.parent is None and node.status == PENDING)
+        in_flight = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="hierarchy") as pool:
+            while ready or in_flight:
+                # Fill every idle worker with up to one bulk chunk of ready nodes
+                while ready and len(in_flight) < self.max_workers:
+                    batch = [ ready.popleft() for _ in range(min(self.chunk_size, len(ready))) ]
+                    in_flight[pool.submit(self._send, batch)] = batch
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    batch = in_flight.pop(future)
+                    for node, result in zip(batch, future.result()):
+                        node.result = result
+                        if result["success"]:
+                            node.status, node.key = CREATED, result["key"]
+                            # Their parent key is now known (children rejected up front stay out)
+                            ready.extend(child for child in node.children if child.status == PENDING)
+                        else:
+                            node.status = FAILED
+                        if progress:
+                            progress(node)
+                        if node.status == FAILED:
+                            self._cancel_descendants(node, progress)
+        return nodes
+
+    def _send(self, batch):
+        try:
+            return self.create_fn([ self.payload_for(node) for node in batch ])
+        except Exception as e:
+            # Never leave the scheduler waiting on a batch that blew up locally
+            return [ {"success": False, "error": f"Unknown Error: {str(e)}", "details": str(e)} for _ in batch ]
+
+    def _cancel_descendants(self, node, progress):
+        for child in node.descendants():
+            child.status = CANCELLED
+            child.result = {
+                "success": False, "error": "Cancelled",
+                "details": f"Parent '{node.template.get('summary', '')}' could not be created.",
+            }
+            if progress:
+                progress(child)
@@ -0,0 +1,252 @@
+import random, threading, time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import metrics
+
+# --- TRANSPORT DEFAULTS ---
+POOL_SIZE = 10                 # Keep-alive connections kept per host (>= concurrent workers)
+MAX_RETRIES = 5                # Retries after the first attempt
+BACKOFF_BASE = 0.5             # Seconds; doubled on every retry
+BACKOFF_MAX = 30.0             # Upper bound for a single backoff sleep
+DEFAULT_TIMEOUT = (5, 30)      # (connect, read) seconds
+# ----------------------------------------
+
+# 429/503 mean Jira rejected the request without processing it, so any method may be retried.
+# Gateway errors may hide a request that was processed: only retry those when idempotent.
+ALWAYS_RETRY_STATUS = {429, 503}
+IDEMPOTENT_RETRY_STATUS = {502, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+
+def parse_retry_after(value):
+    """Parses a Retry-After header (delta-seconds or HTTP date) into seconds to wait."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+def parse_reset(value):
+    """Parses X-RateLimit-Reset (ISO 8601 timestamp) into seconds until the window resets."""
+    if not value:
+        return None
+    try:
+        reset_at = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if reset_at.tzinfo is None:
+        reset_at = reset_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (reset_at - datetime.now(timezone.utc)).total_seconds())
+
+def request_size(prepared):
+    """Best-effort size in bytes of a prepared request body (streamed bodies use Content-Length)."""
+    body = prepared.body
+    if isinstance(body, (bytes, str)):
+        return len(body)
+    return int(prepared.headers.get("Content-Length", 0) or 0)
+
+def response_size(resp):
+    """Size in bytes of a response body, without consuming streamed responses."""
+    if resp.raw is not None and not resp._content_consumed:
+        return int(resp.headers.get("Content-Length", 0) or 0)
+    return len(resp.content or b"")
+
+def backoff_delay(attempt, base=BACKOFF_BASE, cap=BACKOFF_MAX):
+    """Exponential backoff with full jitter: uniform(0, min(cap, base * 2**attempt))."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class AdaptiveThrottle:
+    """
+    Paces requests from all threads using a minimum interval between request starts.
+
+    The interval is derived from Jira Cloud's rate-limit headers (X-RateLimit-FillRate /
+    X-RateLimit-Interval-Seconds, X-RateLimit-Remaining / X-RateLimit-Reset,
+    X-RateLimit-NearLimit), doubled on every 429 and relaxed again on successful responses.
+    """
+
+    MAX_INTERVAL = 5.0   # Never space requests further apart than this
+    RELAX_FACTOR = 0.9   # Interval multiplier applied after each unthrottled response
+
+    def __init__(self):
+        self.min_interval = 0.0   # Seconds between request starts (0 = unthrottled)
+        self.next_slot = 0.0      # Monotonic time at which the next request may start
+        self.blocked_until = 0.0  # Monotonic time before which no request may start (Retry-After)
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """Blocks the calling thread until it may send its next request."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot, self.blocked_until)
+            self.next_slot = slot + self.min_interval
+        if slot > now:
+            time.sleep(slot - now)
+
+    def block_for(self, seconds):
+        """Pauses every sender for the given number of seconds (e.g. from Retry-After)."""
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    def update(self, resp):
+        """Adapts the request interval from a response's status code and rate-limit headers."""
+        headers = resp.headers
+        interval = None
+
+        # Steady-state budget announced by the server: FillRate tokens every Interval seconds
+        try:
+            fill_rate = float(headers["X-RateLimit-FillRate"])
+            fill_interval = float(headers.get("X-RateLimit-Interval-Seconds", 1))
+            if fill_rate > 0:
+                interval = fill_interval / fill_rate
+        except (KeyError, ValueError):
+            pass
+
+        # Spread the remaining budget over the time left in the current window
+        try:
+            remaining = int(headers["X-RateLimit-Remaining"])
+            limit = int(headers.get("X-RateLimit-Limit", 0))
+            seconds_to_reset = parse_reset(headers.get("X-RateLimit-Reset"))
+            if seconds_to_reset is not None and (not limit or remaining < limit * 0.1):
+                interval = max(interval or 0.0, seconds_to_reset / max(remaining, 1))
+        except (KeyError, ValueError):
+            pass
+
+        with self._lock:
+            if resp.status_code == 429:
+                self.min_interval = max(self.min_interval * 2, interval or 0.0, 0.1)
+            elif headers.get("X-RateLimit-NearLimit", "").lower() == "true":
+                self.min_interval = max(self.min_interval * 2, interval or 0.0, 0.05)
+            elif interval is not None:
+                self.min_interval = interval
+            else:
+                self.min_interval *= self.RELAX_FACTOR
+                if self.min_interval < 0.001:
+                    self.min_interval = 0.0
+            self.min_interval = min(self.min_interval, self.MAX_INTERVAL)
+
+
+class JiraSession:
+    """
+    Shared HTTP transport for all Jira calls.
+
+    Reuses keep-alive connections through one pooled requests.Session (no TCP+TLS handshake
+    per issue), applies a default timeout, and retries throttled or transient failures with
+    exponential backoff and jitter, honoring Retry-After. Every request is recorded in a
+    metrics.MetricsRegistry (the process-wide one by default). Safe to share between worker threads.
+    """
+
+    def __init__(self, base_url, email, api_token, pool_size=POOL_SIZE, max_retries=MAX_RETRIES,
+                 timeout=DEFAULT_TIMEOUT, metrics_registry=None):
+        self.base_url = (base_url or "").rstrip("/")
+        self.metrics = metrics_registry or metrics.registry
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.throttle = AdaptiveThrottle()
+        self.in_flight = 0      # Requests currently using the pool
+        self.retired = False    # Replaced by a new session: close once the last request finishes
+        self._state_lock = threading.Lock()
+
+        self.session = requests.Session()
+        self.session.auth = (email, api_token)
+        self.session.headers.update({ "Accept":"application/json" })
+        # Retries are handled here (they need Retry-After and throttling), not by urllib3
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def request(self, method, path, **kwargs):
+        """
+        Sends a request to base_url + path, retrying 429/503 (and 502/504 or connection
+        errors for idempotent methods). Returns the last response; raises the last
+        requests exception if every attempt failed to get one.
+        """
+        method = method.upper()
+        url = path if path.startswith("http") else f"{self.base_url}{path}"
+        started = time.perf_counter()
+        with self._state_lock:
+            self.in_flight += 1
+        try:
+            resp, attempt = self._send_with_retries(method, url, kwargs)
+        except requests.exceptions.RequestException as e:
+            self.metrics.observe(method, url, time.perf_counter() - started, type(e).__name__, retries=getattr(e, "retries", 0))
+            raise
+        finally:
+            self._finished()
+        self.metrics.observe(
+            method, url, time.perf_counter() - started, resp.status_code, retries=attempt,
+            bytes_sent=request_size(resp.request), bytes_received=response_size(resp)
+        )
+        return resp
+
+    def _send_with_retries(self, method, url, kwargs):
+        """Retry loop behind request(); returns (response, retries performed)."""
+        kwargs.setdefault("timeout", self.timeout)
+        idempotent = method in IDEMPOTENT_METHODS
+
+        for attempt in range(self.max_retries + 1):
+            self.throttle.wait()
+            if attempt and hasattr(kwargs.get("data"), "seek"):
+                kwargs["data"].seek(0) # Streamed bodies (attachments) are re-read from the start
+            try:
+                resp = self.session.request(method, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                # A connect timeout means nothing was sent; other failures may hide a processed POST
+                retryable = idempotent or isinstance(e, requests.exceptions.ConnectTimeout)
+                if not retryable or attempt == self.max_retries:
+                    e.retries = attempt # Reported by request() to the metrics registry
+                    raise
+                time.sleep(backoff_delay(attempt))
+                continue
+
+            self.throttle.update(resp)
+            retryable = resp.status_code in ALWAYS_RETRY_STATUS or (
+                idempotent and resp.status_code in IDEMPOTENT_RETRY_STATUS
+            )
+            if not retryable or attempt == self.max_retries:
+                return resp, attempt
+
+            retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+            if retry_after is not None:
+                # Server told us exactly how long to back off: pause every sender, plus jitter
+                self.throttle.block_for(retry_after + random.uniform(0, BACKOFF_BASE))
+            else:
+                time.sleep(backoff_delay(attempt))
+            resp.close()
+
+    def get(self, path, **kwargs):
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request("POST", path, **kwargs)
+
+    def retire(self):
+        """
+        Closes the connection pool as soon as no request is using it. Called when the
+        configuration is reloaded: requests already in flight finish on this session.
+        """
+        with self._state_lock:
+            self.retired = True
+            idle = self.in_flight == 0
+        if idle:
+            self.close()
+
+    def _finished(self):
+        with self._state_lock:
+            self.in_flight -= 1
+            close = self.retired and self.in_flight == 0
+        if close:
+            self.close()
+
+    def close(self):
+        self.session.close()
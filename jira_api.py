@@ -0,0 +1,522 @@
+import json, os, threading
+
+# 'requests' (via http_transport) and 'dotenv' are imported lazily: they dominate
+# import time and the GUI must paint its window before paying for them.
+from metadata_cache import MetadataCache, DEFAULT_TTL
+from template_store import open_template_store
+from adf import markdown_to_adf
+
+# --- JIRA API CONFIGURATION CONSTANTS (set by load_config from the .env file) ---
+JIRA_URL = None                            # Base URL for the Jira instance
+JIRA_EMAIL = None                          # User's Atlassian email
+JIRA_API_TOKEN = None                      # User's Personal Access Token (PAT)
+TEMPLATES_FILE = "templates.json"          # File containing issue templates
+BULK_CHUNK_SIZE = 50                       # Max issues accepted by POST /issue/bulk
+REQUEST_TIMEOUT = (5, 30)                  # (connect, read) seconds for every Jira call
+SEARCH_PAGE_SIZE = 100                     # Issues per /search/jql page
+CREATEMETA_PAGE_SIZE = 50                  # Issue types / fields per createmeta page
+METADATA_WORKERS = 8                       # Concurrent createmeta requests during prefetch
+PROJECT_KEYS = []                          # Projects whose metadata is prefetched (JIRA_PROJECT_KEYS)
+# ----------------------------------------
+
+JSON_HEADERS = { "Accept":"application/json", "Content-Type":"application/json" }
+
+_session = None
+_session_lock = threading.Lock()
+metadata_cache = MetadataCache()
+project_metadata = {} # Project key -> cache entry, for instant project switching
+_metadata_lock = threading.Lock()
+_revalidating = set() # Project keys with a background revalidation running
+
+
+def load_config(override=False):
+    """
+    Loads sensitive environment variables from the .env file into the module constants
+    (override=True re-reads a changed .env in a running process; see configure()).
+    JIRA_METADATA_TTL (seconds) optionally sets how long cached createmeta is trusted, and
+    JIRA_PROJECT_KEYS (comma-separated) lists the projects whose metadata is prefetched.
+    """
+    global PROJECT_KEYS
+    from dotenv import load_dotenv
+    load_dotenv(override=override)
+
+    changed = configure(os.getenv("JIRA_URL"), os.getenv("JIRA_EMAIL"), os.getenv("JIRA_API_TOKEN"))
+    metadata_cache.ttl = int(os.getenv("JIRA_METADATA_TTL", DEFAULT_TTL))
+    PROJECT_KEYS = [ key.strip().upper() for key in os.getenv("JIRA_PROJECT_KEYS", "").split(",") if key.strip() ]
+    return changed
+
+def configure(url, email, api_token):
+    """
+    Points the module at a Jira instance (e.g. a local mock_jira server) with the given credentials.
+
+    Safe while requests are running: the pooled session is swapped atomically, so the next
+    call connects with the new credentials while requests already in flight finish on the old
+    session (closed once idle). In-memory metadata is dropped only when the site changes and
+    marked for revalidation when the user changes; field lookups (field_resolution) are
+    dropped in both cases. Returns False if nothing changed.
+    """
+    global JIRA_URL, JIRA_EMAIL, JIRA_API_TOKEN, _session
+    with _session_lock:
+        if (url, email, api_token) == (JIRA_URL, JIRA_EMAIL, JIRA_API_TOKEN):
+            return False
+        site_changed = (url or "").rstrip("/").lower() != (JIRA_URL or "").rstrip("/").lower()
+        user_changed = email != JIRA_EMAIL
+        JIRA_URL, JIRA_EMAIL, JIRA_API_TOKEN = url, email, api_token
+        old_session, _session = _session, None
+    with _metadata_lock:
+        if site_changed:
+            project_metadata.clear()
+        elif user_changed:
+            # Same site, other permissions: keep serving the entries but revalidate them on next use
+            for key, entry in project_metadata.items():
+                project_metadata[key] = dict(entry, fetched_at=0)
+    if site_changed or user_changed:
+        # Component/version/field lookups depend on what the user may see: fetch them again
+        import field_resolution # Lazy: field_resolution imports this module
+        field_resolution.clear_caches()
+    if old_session is not None:
+        old_session.retire()
+    return True
+
+def get_session():
+    """Returns the process-wide pooled JiraSession, creating it on first use."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            from http_transport import JiraSession
+            _session = JiraSession(JIRA_URL, JIRA_EMAIL, JIRA_API_TOKEN, timeout=REQUEST_TIMEOUT)
+        return _session
+
+
+# --- PAYLOAD HELPERS ---
+
+def make_atlassian_doc(text):
+    """
+    Converts plain text/Markdown into the Atlassian Document Format (ADF) JSON structure
+    required for Jira's description field (paragraphs, lists, code, bold/italic, links).
+    Results are memoized per description; the returned document must not be mutated.
+    """
+    return markdown_to_adf(text)
+
+def is_subtask_type(issue_type_name):
+    """Returns True for Subtask issue types (handles "Sub-task" and "Subtarea" variations)."""
+    return "Subtarea" in issue_type_name or "Sub-task" in issue_type_name
+
+def is_epic_type(issue_type_name):
+    """Returns True for Epic issue types (handles the Spanish "Épica")."""
+    return issue_type_name.strip().lower() in ("epic", "épica", "epica")
+
+def template_priority_field(tpl):
+    """Priority reference of a template: 'priority_name', else its 'priority' ID, else Medium."""
+    if tpl.get("priority_name"):
+        return { "name": tpl["priority_name"] }
+    if tpl.get("priority"):
+        return { "id": str(tpl["priority"]) }
+    return { "name": "Medium" }
+
+def priority_names(field_schemas):
+    """
+    Priority ID -> name of a project, in its createmeta order (highest first), read from the
+    'priority' allowedValues of its issue types. Empty when createmeta lists no priorities.
+    """
+    for fields in field_schemas.values():
+        values = fields.get("priority", {}).get("allowedValues")
+        if values:
+            return { value["id"]: value["name"] for value in values if "id" in value }
+    return {}
+
+def build_issue_fields(tpl, project_key, issue_type_id, summary=None, description=None,
+                       priority_id=None, parent_key=None, extra_fields=None):
+    """
+    Builds the 'fields' object of a create-issue request from a template.
+    Summary, description and priority default to the template values when not edited;
+    an edited priority is sent by its ID, so custom priority schemes are honoured.
+    'extra_fields' are the template's remaining fields (components, duedate...) as
+    resolved by field_resolution.FieldResolver.
+    """
+    fields = {
+        "project":{ "key": project_key or "AUT" }, # Project Key
+        "issuetype":{ "id": issue_type_id }, # Required Issue Type ID
+        "summary": summary if summary is not None else tpl["summary"],
+        "description": make_atlassian_doc(
+            description if description is not None else tpl.get("description", "")
+        ),
+        "priority": { "id": priority_id } if priority_id else template_priority_field(tpl),
+        "labels": tpl.get("labels", []), # Labels from template
+    }
+
+    # Subtasks must reference their parent issue
+    if parent_key:
+        fields["parent"] = { "key": parent_key }
+
+    # Add assignee only if data exists in the template
+    if tpl.get("assignee"):
+        fields["assignee"] = tpl["assignee"]
+
+    if extra_fields:
+        fields.update(extra_fields)
+
+    return fields
+
+def issue_update_json(fields):
+    """Serializes the request body of one issue ({"fields": ...}) as compact UTF-8 JSON."""
+    return json.dumps({ "fields": fields }, separators=(",", ":")).encode("utf-8")
+
+
+# --- JIRA REST CALLS ---
+
+class ProjectNotFound(LookupError):
+    """The project does not exist or is not visible to the configured user (createmeta 400/404)."""
+
+def load_templates(path=TEMPLATES_FILE):
+    """
+    Loads issue template data from a local JSON array file, or opens an indexed
+    JsonlTemplateStore for '.jsonl' files (raises FileNotFoundError if missing).
+    """
+    return open_template_store(path)
+
+def compact_field_schema(field):
+    """Keeps only the createmeta field attributes needed locally (drops links, operations, etc.)."""
+    schema = {
+        "name": field.get("name"),
+        "required": field.get("required", False),
+        "schema": field.get("schema", {}),
+    }
+    if "allowedValues" in field:
+        schema["allowedValues"] = [
+            { "id": value.get("id"), "name": value.get("name", value.get("value")) }
+            for value in field["allowedValues"]
+        ]
+    return schema
+
+def iter_pages(path, items_key, page_size=CREATEMETA_PAGE_SIZE, etags=None):
+    """
+    Yields the items of a startAt/maxResults paginated endpoint as each page arrives.
+    Stops at an empty page, a page marked 'isLast', a short page (fewer items than the
+    maxResults the server applied) or once 'total' items were read, whichever comes first;
+    pages without 'total' or 'isLast' are followed until one of the others.
+    With an 'etags' dict, the ETag of an answer that fits in one page is recorded under
+    'path' (see metadata_not_modified). Raises requests.exceptions.RequestException on
+    connection/HTTP errors.
+    """
+    start_at = 0
+    while True:
+        resp = get_session().get(path, params={ "startAt": start_at, "maxResults": page_size })
+        resp.raise_for_status()
+        page = resp.json()
+        items = page.get(items_key, page.get("values", []))
+        yield from items
+        last = (
+            not items or page.get("isLast")
+            or len(items) < page.get("maxResults", page_size)
+            or ("total" in page and start_at + len(items) >= page["total"])
+        )
+        if etags is not None and start_at == 0 and last and resp.headers.get("ETag"):
+            etags[path] = resp.headers["ETag"]
+        start_at += len(items)
+        if last:
+            return
+
+def fetch_issue_types(project_key, etags=None):
+    """
+    Lists a project's issue types through GET /issue/createmeta/{project}/issuetypes.
+    Raises ProjectNotFound if the project is not visible to the configured user.
+    """
+    import requests
+    try:
+        return list(iter_pages(f"/rest/api/3/issue/createmeta/{project_key}/issuetypes", "issueTypes", etags=etags))
+    except requests.exceptions.HTTPError as e:
+        if e.response is not None and e.response.status_code in (400, 404):
+            raise ProjectNotFound(f"Project '{project_key}' not found or check permissions.") from e
+        raise
+
+def fetch_issue_type_fields(project_key, issue_type_id, etags=None):
+    """Returns {Field ID: compact schema} from GET /issue/createmeta/{project}/issuetypes/{id}."""
+    return {
+        field.get("fieldId", field.get("key")): compact_field_schema(field)
+        for field in iter_pages(f"/rest/api/3/issue/createmeta/{project_key}/issuetypes/{issue_type_id}", "fields", etags=etags)
+    }
+
+def fetch_projects_metadata(project_keys, max_workers=METADATA_WORKERS):
+    """
+    Fetches createmeta for several projects concurrently through the paginated endpoints:
+    first every project's issue types, then the fields of every (project, issue type) pair,
+    all on one worker pool sharing the pooled session.
+
+    Returns {project_key: metadata} where metadata is {"issue_types_map": {Name: ID},
+    "field_schemas": {Name: {Field ID: schema}}, "etags": {path: ETag}}, or the exception raised for that
+    project (ProjectNotFound if it is not visible, requests exceptions on HTTP errors,
+    ValueError for a body that is not valid JSON). Any other exception is a bug and propagates.
+    """
+    import requests
+    from concurrent.futures import ThreadPoolExecutor
+    expected_errors = (requests.exceptions.RequestException, ProjectNotFound, ValueError)
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="createmeta") as pool:
+        etags = { key: {} for key in project_keys } # Filled by the worker threads (one key per page)
+        type_futures = { key: pool.submit(fetch_issue_types, key, etags[key]) for key in project_keys }
+        field_futures = {}
+        for key, future in type_futures.items():
+            try:
+                issue_types = future.result()
+            except expected_errors as e:
+                results[key] = e
+                continue
+            results[key] = { "issue_types_map": { it["name"]: it["id"] for it in issue_types }, "field_schemas": {}, "etags": etags[key] }
+            for it in issue_types:
+                field_futures[(key, it["name"])] = pool.submit(fetch_issue_type_fields, key, it["id"], etags[key])
+
+        # Merge field pages into each project's map as they complete
+        for (key, type_name), future in field_futures.items():
+            if isinstance(results[key], Exception):
+                continue
+            try:
+                results[key]["field_schemas"][type_name] = future.result()
+            except expected_errors as e:
+                results[key] = e
+    return results
+
+def fetch_project_metadata(project_key):
+    """
+    Fetches createmeta for one project (issue types with their field schemas).
+    Raises requests.exceptions.RequestException on connection/HTTP errors and
+    ProjectNotFound if the project is not visible to the configured user.
+    """
+    result = fetch_projects_metadata([project_key])[project_key]
+    if isinstance(result, Exception):
+        raise result
+    return result
+
+def remember_project_metadata(project_key, metadata):
+    """Stores metadata in the disk cache and the in-memory map; returns the cache entry."""
+    entry = metadata_cache.store(JIRA_URL, JIRA_EMAIL, project_key, metadata)
+    with _metadata_lock:
+        project_metadata[project_key.upper()] = entry
+    return entry
+
+def cached_project_metadata(project_key):
+    """Instant lookup of a project's metadata in memory, falling back to the disk cache. None if unknown."""
+    key = project_key.upper()
+    with _metadata_lock:
+        entry = project_metadata.get(key)
+    if entry is None:
+        entry = metadata_cache.load(JIRA_URL, JIRA_EMAIL, project_key)
+        if entry is not None:
+            with _metadata_lock:
+                project_metadata.setdefault(key, entry)
+    return entry
+
+def metadata_not_modified(entry):
+    """
+    Asks Jira whether every createmeta page behind a cache entry is unchanged, with one
+    conditional GET (If-None-Match) per page. True only if each one answers 304 Not Modified;
+    False as soon as one changed, or if the entry lacks an ETag for some page.
+    Raises requests.exceptions.RequestException on connection/HTTP errors.
+    """
+    etags = entry.get("etags") or {}
+    if len(etags) != len(entry["issue_types_map"]) + 1:
+        return False # Issue type list + one fields list per type: a page without ETag needs a full fetch
+    for path, etag in etags.items():
+        resp = get_session().get(path, params={ "startAt": 0, "maxResults": CREATEMETA_PAGE_SIZE }, headers={ "If-None-Match": etag })
+        if resp.status_code != 304:
+            resp.raise_for_status()
+            return False
+    return True
+
+def revalidate_project_metadata(project_key, entry, on_update=None):
+    """
+    Revalidates a stale entry: if Jira answers 304 to conditional requests the entry is only
+    marked fresh, otherwise it is re-fetched and both caches are refreshed.
+    Calls on_update(entry) with the new cache entry only when the metadata actually changed.
+    Errors are ignored: the cached copy stays in use until Jira is reachable again.
+    """
+    import requests
+    try:
+        if metadata_not_modified(entry):
+            entry = metadata_cache.touch(JIRA_URL, JIRA_EMAIL, project_key, entry)
+            with _metadata_lock:
+                project_metadata[project_key.upper()] = entry
+            return
+        metadata = fetch_project_metadata(project_key)
+    except (requests.exceptions.RequestException, ProjectNotFound, ValueError):
+        return
+    finally:
+        with _metadata_lock:
+            _revalidating.discard(project_key.upper())
+
+    changed = (metadata["issue_types_map"] != entry["issue_types_map"] or
+               metadata["field_schemas"] != entry["field_schemas"])
+    entry = remember_project_metadata(project_key, metadata)
+    if changed and on_update:
+        on_update(entry)
+
+def revalidate_in_background(project_key, entry, on_update=None):
+    """Starts one background revalidation per stale project (no-op if one is already running)."""
+    with _metadata_lock:
+        if project_key.upper() in _revalidating:
+            return
+        _revalidating.add(project_key.upper())
+    threading.Thread(
+        target=revalidate_project_metadata, args=(project_key, entry, on_update),
+        name=f"createmeta-revalidate-{project_key}", daemon=True
+    ).start()
+
+def get_project_metadata(project_key, refresh=False, on_update=None):
+    """
+    Returns {"issue_types_map", "field_schemas"} for a project, served from memory or the disk cache when possible.
+
+    - Fresh cached entry: returned without any network call.
+    - Stale entry: returned immediately and revalidated on a background thread;
+      on_update(entry) is called from that thread if Jira's answer differs.
+    - No entry, or refresh=True: fetched live and cached. If the live call fails
+      and a stale entry exists, the stale entry is used so the app can still start.
+    """
+    result = prefetch_project_metadata([project_key], refresh=refresh, on_update=on_update)[project_key]
+    if isinstance(result, Exception):
+        raise result
+    return result
+
+def prefetch_project_metadata(project_keys, refresh=False, on_update=None):
+    """
+    Loads metadata for several projects at once (see get_project_metadata), fetching every
+    missing or refreshed project concurrently. Afterwards, cached_project_metadata() answers
+    for each of them without I/O.
+
+    Returns {project_key: entry}, or the exception for a project that could not be loaded
+    at all (ProjectNotFound, or a requests exception when there is no cached copy either).
+    """
+    import requests
+    entries, to_fetch = {}, []
+    for key in dict.fromkeys(project_keys):
+        entry = cached_project_metadata(key)
+        if entry and not refresh:
+            if not metadata_cache.is_fresh(entry):
+                revalidate_in_background(key, entry, on_update)
+            entries[key] = entry
+        else:
+            entries[key] = entry
+            to_fetch.append(key)
+
+    for key, result in fetch_projects_metadata(to_fetch).items() if to_fetch else ():
+        if not isinstance(result, Exception):
+            entries[key] = remember_project_metadata(key, result)
+        elif not (entries[key] and isinstance(result, requests.exceptions.RequestException)):
+            entries[key] = result # Stale entries survive connection errors; anything else is reported
+    return entries
+
+def create_issue(fields):
+    """
+    Submits one POST /rest/api/3/issue request through the shared session. Safe to call from worker threads.
+    Returns {"success": True, "key": ...} or {"success": False, "error": ..., "details": ...}.
+    """
+    return create_issue_payload(issue_update_json(fields))
+
+def create_issue_payload(update):
+    """Same as create_issue(), for an already serialized b'{"fields": {...}}' request body."""
+    import requests
+    try:
+        resp = get_session().post(
+            "/rest/api/3/issue",
+            # Set headers for JSON data exchange
+            headers=JSON_HEADERS,
+            data=update
+        )
+        # Check for 4xx or 5xx errors
+        resp.raise_for_status()
+        # Return success and the key of the created issue
+        return {"success": True, "key": resp.json()["key"]}
+
+    except requests.exceptions.RequestException as e:
+        # Handle all request/connection errors (e.g., 400 Bad Request, 401 Unauthorized, timeouts)
+        error_details = e.response.text if e.response is not None else str(e)
+        error_status = e.response.status_code if e.response is not None else 'N/A'
+        return {"success": False, "error": f"API Error: {error_status}", "details": error_details}
+    except Exception as e:
+        # Handle unexpected Python exceptions
+        return {"success": False, "error": f"Unknown Error: {str(e)}", "details": str(e)}
+
+def bulk_create_issues(fields_list):
+    """
+    Submits up to BULK_CHUNK_SIZE issues in one POST /rest/api/3/issue/bulk call.
+
+    Returns one result dict per input item, in order:
+    {"success": True, "key": ..., "id": ...} or {"success": False, "error": ..., "details": ...}.
+    Jira reports partial failures through 'errors[].failedElementNumber'; the
+    created 'issues' are listed in the order of the items that succeeded.
+    """
+    return bulk_create_payloads([ issue_update_json(fields) for fields in fields_list ])
+
+def bulk_create_payloads(updates):
+    """
+    Same as bulk_create_issues(), for issue updates that are already serialized
+    (b'{"fields": {...}}' each, e.g. rendered by a PayloadSkeleton): they are
+    concatenated into the request body without being parsed again.
+    """
+    import requests
+    if len(updates) > BULK_CHUNK_SIZE:
+        raise ValueError(f"Bulk create accepts at most {BULK_CHUNK_SIZE} issues per call.")
+
+    payload = b'{"issueUpdates":[' + b",".join(updates) + b"]}"
+
+    try:
+        resp = get_session().post(
+            "/rest/api/3/issue/bulk",
+            headers=JSON_HEADERS,
+            data=payload
+        )
+        body = resp.json() if resp.content else {}
+    except (requests.exceptions.RequestException, ValueError) as e:
+        # Whole chunk failed before Jira could answer per item
+        return [ {"success": False, "error": "API Error: N/A", "details": str(e)} for _ in updates ]
+
+    # 400 with no per-item errors means the request itself was rejected (e.g. malformed body)
+    if resp.status_code >= 400 and not body.get("errors"):
+        return [
+            {"success": False, "error": f"API Error: {resp.status_code}", "details": resp.text}
+            for _ in updates
+        ]
+
+    results = [None] * len(updates)
+    for err in body.get("errors", []):
+        index = err.get("failedElementNumber")
+        if index is None or not 0 <= index < len(results):
+            continue
+        element_errors = err.get("elementErrors", {})
+        details = "; ".join(
+            element_errors.get("errorMessages", []) +
+            [ f"{field}: {msg}" for field, msg in element_errors.get("errors", {}).items() ]
+        )
+        results[index] = {"success": False, "error": f"API Error: {err.get('status', resp.status_code)}", "details": details}
+
+    created = iter(body.get("issues", []))
+    for i, result in enumerate(results):
+        if result is not None:
+            continue
+        issue = next(created, None)
+        if issue is None:
+            results[i] = {"success": False, "error": f"API Error: {resp.status_code}", "details": "Missing from bulk response."}
+        else:
+            results[i] = {"success": True, "key": issue["key"], "id": issue["id"]}
+
+    return results
+
+def search_issues(jql, fields=(), page_size=SEARCH_PAGE_SIZE):
+    """
+    Runs a JQL query through POST /rest/api/3/search/jql, following nextPageToken
+    until every page is read. Only the requested 'fields' are returned.
+    Raises requests.exceptions.RequestException on connection/HTTP errors.
+    """
+    issues = []
+    body = { "jql": jql, "fields": list(fields), "maxResults": page_size }
+    while True:
+        resp = get_session().post("/rest/api/3/search/jql", headers=JSON_HEADERS, json=body)
+        resp.raise_for_status()
+        page = resp.json()
+        issues.extend(page.get("issues", []))
+        if page.get("isLast") or not page.get("nextPageToken"):
+            return issues
+        body["nextPageToken"] = page["nextPageToken"]
+
+def jql_list(values):
+    """Formats values for a JQL 'in (...)' clause, quoting each one."""
+    return ", ".join('"' + str(value).replace('"', '\\"') + '"' for value in values)
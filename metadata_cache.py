@@ -0,0 +1,70 @@
+import hashlib, json, os, tempfile, time
+
+# --- CACHE DEFAULTS ---
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "jira-autoissue", "createmeta")
+DEFAULT_TTL = 24 * 60 * 60     # Seconds a cached entry is served without revalidation
+CACHE_VERSION = 2              # Bump when the entry layout changes
+# ----------------------------------------
+
+
+class MetadataCache:
+    """
+    Persistent on-disk cache of createmeta results, one JSON file per (Jira URL, account,
+    project key): createmeta only lists what the account is allowed to create.
+
+    Each entry stores the compact 'issue_types_map' (Name -> ID) and 'field_schemas'
+    (Issue Type Name -> Field ID -> schema), plus the time it was fetched and the
+    server's ETag of every createmeta page ('etags': path -> ETag) for conditional
+    revalidation.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, ttl=DEFAULT_TTL):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+
+    def path_for(self, jira_url, account, project_key):
+        """Returns the cache file path for a Jira URL + account + project key."""
+        key = f"{(jira_url or '').rstrip('/').lower()}|{(account or '').lower()}|{project_key.upper()}"
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"{project_key.upper()}-{digest}.json")
+
+    def load(self, jira_url, account, project_key):
+        """Returns the cached entry (fresh or stale), or None if missing/unreadable."""
+        try:
+            with open(self.path_for(jira_url, account, project_key), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return entry if entry.get("version") == CACHE_VERSION else None
+
+    def is_fresh(self, entry):
+        """True while the entry is younger than the configured TTL."""
+        return time.time() - entry.get("fetched_at", 0) < self.ttl
+
+    def store(self, jira_url, account, project_key, metadata):
+        """Writes an entry atomically (temp file + rename) and returns it."""
+        entry = {
+            "version": CACHE_VERSION,
+            "jira_url": jira_url,
+            "account": account,
+            "project_key": project_key,
+            "fetched_at": time.time(),
+            "etags": metadata.get("etags") or {},
+            "issue_types_map": metadata["issue_types_map"],
+            "field_schemas": metadata["field_schemas"],
+        }
+        os.makedirs(self.cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path_for(jira_url, account, project_key))
+        except OSError:
+            # A read-only or full disk must never break metadata loading
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return entry
+
+    def touch(self, jira_url, account, project_key, entry):
+        """Marks an entry as freshly revalidated (server answered 304 Not Modified) and returns it."""
+        return self.store(jira_url, account, project_key, entry)
@@ -0,0 +1,181 @@
+"""
+Request-level instrumentation for every Jira call.
+
+JiraSession records one observation per logical request (including its retries):
+latency, final status code, retry count and request/response payload sizes, grouped
+by method + endpoint template (issue keys, IDs and project keys are normalized away).
+The registry can be exported as a JSON summary or in Prometheus text format.
+"""
+import bisect, json, random, re, sys, threading
+
+# --- METRIC SETTINGS ---
+LATENCY_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0) # Seconds (+Inf implied)
+RESERVOIR_SIZE = 2048   # Latency samples kept per endpoint for percentile estimates
+# ----------------------------------------
+
+ENDPOINT_PATTERNS = [
+    (re.compile(r"/issue/createmeta/[^/]+"), "/issue/createmeta/{projectKey}"),
+    (re.compile(r"/issuetypes/\d+"), "/issuetypes/{issueTypeId}"),
+    (re.compile(r"/project/[^/]+"), "/project/{projectKey}"),
+    (re.compile(r"/issue/(?!createmeta|bulk)[^/]+"), "/issue/{issueKey}"),
+]
+
+
+def endpoint_template(path):
+    """Normalizes a request path (absolute URL or path, with or without query) to its endpoint template."""
+    path = re.sub(r"^https?://[^/]+", "", path).split("?", 1)[0]
+    for pattern, replacement in ENDPOINT_PATTERNS:
+        path = pattern.sub(replacement, path)
+    return path
+
+
+class EndpointStats:
+    """Aggregates for one (method, endpoint) pair."""
+
+    def __init__(self):
+        self.count = 0
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+        self.bucket_counts = [0] * (len(LATENCY_BUCKETS) + 1) # Last slot is +Inf
+        self.status_counts = {}
+        self.retries = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.samples = [] # Reservoir sample of latencies
+        self._rng = random.Random(0)
+
+    def observe(self, latency, status, retries, bytes_sent, bytes_received):
+        self.count += 1
+        self.latency_sum += latency
+        self.latency_max = max(self.latency_max, latency)
+        self.bucket_counts[bisect.bisect_left(LATENCY_BUCKETS, latency)] += 1
+        self.status_counts[status] = self.status_counts.get(status, 0) + 1
+        self.retries += retries
+        self.bytes_sent += bytes_sent
+        self.bytes_received += bytes_received
+
+        # Reservoir sampling keeps memory bounded on very long runs
+        if len(self.samples) < RESERVOIR_SIZE:
+            self.samples.append(latency)
+        else:
+            slot = self._rng.randrange(self.count)
+            if slot < RESERVOIR_SIZE:
+                self.samples[slot] = latency
+
+    def percentile(self, pct):
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+
+class MetricsRegistry:
+    """Thread-safe store of per-endpoint request metrics."""
+
+    def __init__(self):
+        self.endpoints = {} # (method, endpoint template) -> EndpointStats
+        self.last_latency = None  # Seconds of the most recent request (shown in the GUI status bar)
+        self.last_endpoint = None
+        self._lock = threading.Lock()
+
+    def observe(self, method, url, latency, status, retries=0, bytes_sent=0, bytes_received=0):
+        """Records one logical request. 'status' is the HTTP status code or an exception name."""
+        endpoint = endpoint_template(url)
+        with self._lock:
+            stats = self.endpoints.setdefault((method, endpoint), EndpointStats())
+            stats.observe(latency, str(status), retries, bytes_sent, bytes_received)
+            self.last_latency = latency
+            self.last_endpoint = f"{method} {endpoint}"
+
+    def reset(self):
+        with self._lock:
+            self.endpoints.clear()
+            self.last_latency = None
+            self.last_endpoint = None
+
+    # --- EXPORTERS ---
+
+    def to_json(self):
+        """Returns a JSON-serializable summary: one entry per endpoint, latencies in milliseconds."""
+        with self._lock:
+            items = sorted(self.endpoints.items())
+            summary = []
+            for (method, endpoint), stats in items:
+                summary.append({
+                    "method": method,
+                    "endpoint": endpoint,
+                    "requests": stats.count,
+                    "retries": stats.retries,
+                    "status_codes": dict(sorted(stats.status_counts.items())),
+                    "latency_ms": {
+                        "mean": round(stats.latency_sum / stats.count * 1000, 2),
+                        "p50": round(stats.percentile(50) * 1000, 2),
+                        "p95": round(stats.percentile(95) * 1000, 2),
+                        "p99": round(stats.percentile(99) * 1000, 2),
+                        "max": round(stats.latency_max * 1000, 2),
+                    },
+                    "bytes_sent": stats.bytes_sent,
+                    "bytes_received": stats.bytes_received,
+                })
+        return { "endpoints": summary }
+
+    def to_prometheus(self):
+        """Returns the metrics in Prometheus text exposition format."""
+        lines = [
+            "# HELP jira_request_duration_seconds Jira request latency (including retries).",
+            "# TYPE jira_request_duration_seconds histogram",
+        ]
+        with self._lock:
+            items = sorted(self.endpoints.items())
+            for (method, endpoint), stats in items:
+                labels = f'method="{method}",endpoint="{endpoint}"'
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS + (float("inf"),), stats.bucket_counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'jira_request_duration_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+                lines.append(f"jira_request_duration_seconds_sum{{{labels}}} {stats.latency_sum:.6f}")
+                lines.append(f"jira_request_duration_seconds_count{{{labels}}} {stats.count}")
+
+            lines += ["# HELP jira_requests_total Jira requests by final status code.", "# TYPE jira_requests_total counter"]
+            for (method, endpoint), stats in items:
+                for status, count in sorted(stats.status_counts.items()):
+                    lines.append(f'jira_requests_total{{method="{method}",endpoint="{endpoint}",status="{status}"}} {count}')
+
+            lines += ["# HELP jira_request_retries_total Retries performed by the transport.", "# TYPE jira_request_retries_total counter"]
+            for (method, endpoint), stats in items:
+                lines.append(f'jira_request_retries_total{{method="{method}",endpoint="{endpoint}"}} {stats.retries}')
+
+            lines += ["# HELP jira_request_bytes_total Request/response payload bytes.", "# TYPE jira_request_bytes_total counter"]
+            for (method, endpoint), stats in items:
+                lines.append(f'jira_request_bytes_total{{method="{method}",endpoint="{endpoint}",direction="sent"}} {stats.bytes_sent}')
+                lines.append(f'jira_request_bytes_total{{method="{method}",endpoint="{endpoint}",direction="received"}} {stats.bytes_received}')
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry used by JiraSession unless another one is passed
+registry = MetricsRegistry()
+
+
+# --- CLI HELPERS ---
+
+def add_metrics_arguments(parser):
+    """Adds --metrics-json / --metrics-prom to a command-line parser."""
+    parser.add_argument("--metrics-json", default=None, metavar="PATH", help="Write a JSON request-metrics summary ('-' for stdout).")
+    parser.add_argument("--metrics-prom", default=None, metavar="PATH", help="Write request metrics in Prometheus text format ('-' for stdout).")
+
+def export_metrics(args, metrics=None):
+    """Writes the exports requested on the command line."""
+    metrics = metrics or registry
+    exports = (
+        (args.metrics_json, lambda: json.dumps(metrics.to_json(), indent=2) + "\n"),
+        (args.metrics_prom, metrics.to_prometheus),
+    )
+    for path, render in exports:
+        if not path:
+            continue
+        if path == "-":
+            sys.stdout.write(render())
+        else:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(render())
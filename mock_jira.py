@@ -0,0 +1,507 @@
+"""
+Local stand-in for the Jira Cloud REST API, for offline testing and benchmarks.
+
+Implements /myself, /issue/createmeta (expanded, and paginated per project / issue
+type with ETag / If-None-Match), /field, /project/{key}/components and /versions,
+/issue, /issue/bulk, /issue/{key}/attachments (streamed, single-file multipart) and
+/search/jql with an in-memory issue store, plus configurable latency, 5xx error
+injection and 429 rate limiting (random injection and/or a token-bucket limit with
+Retry-After and X-RateLimit-* headers).
+
+Usage:
+    python mock_jira.py --port 8765 --latency-ms 40 --error-rate 0.01 --rate-limit 50
+    # then point the app at it: JIRA_URL="http://127.0.0.1:8765"
+"""
+import argparse, hashlib, json, random, re, threading, time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# --- MOCK DATA ---
+DEFAULT_PROJECTS = ("AUT",)
+ISSUE_TYPES = [
+    { "id": "10001", "name": "Task", "subtask": False },
+    { "id": "10002", "name": "Incident", "subtask": False },
+    { "id": "10003", "name": "Service request", "subtask": False },
+    { "id": "10004", "name": "Subtarea", "subtask": True },
+]
+PRIORITIES = [
+    { "id": "1", "name": "Highest" }, { "id": "2", "name": "High" }, { "id": "3", "name": "Medium" },
+    { "id": "4", "name": "Low" }, { "id": "5", "name": "Lowest" },
+]
+COMPONENTS = [ { "id": str(10000 + i), "name": name } for i, name in enumerate((
+    "API", "Active Directory", "Almacenamiento", "Aplicaciones", "App Service", "Backend", "Base de Datos",
+    "Bases de datos", "Cloud", "Exchange Server", "Frontend", "Hardware Office", "Helpdesk", "Infraestructura",
+    "Integraciones", "Redes", "Seguridad", "Soporte HW", "Soporte SW", "Workstations",
+)) ]
+VERSIONS = [ { "id": str(10100 + i), "name": name } for i, name in enumerate((
+    "2025-Q3", "Infra-redes-2025.07", "Patch-July-2025", "Sprint1", "db-maintenance-2025.07",
+    "hotfix-erp-sync-07", "release-1.5", "release-2025.08", "soporte-aug25", "v1.2.0",
+)) ]
+SITE_FIELDS = [
+    { "id": "customfield_10016", "name": "Story point estimate", "custom": True },
+    { "id": "customfield_10020", "name": "Sprint", "custom": True },
+]
+MAX_SEARCH_RESULTS = 5000   # Page size cap of /search/jql
+# ----------------------------------------
+
+
+def field_schemas(issue_type):
+    """createmeta 'fields' object for one issue type."""
+    fields = {
+        "summary": { "required": True, "name": "Summary", "key": "summary", "schema": { "type": "string", "system": "summary" } },
+        "issuetype": { "required": True, "name": "Issue Type", "key": "issuetype", "schema": { "type": "issuetype", "system": "issuetype" } },
+        "project": { "required": True, "name": "Project", "key": "project", "schema": { "type": "project", "system": "project" } },
+        "description": { "required": False, "name": "Description", "key": "description", "schema": { "type": "string", "system": "description" } },
+        "priority": { "required": False, "name": "Priority", "key": "priority", "schema": { "type": "priority", "system": "priority" }, "allowedValues": PRIORITIES },
+        "labels": { "required": False, "name": "Labels", "key": "labels", "schema": { "type": "array", "items": "string", "system": "labels" } },
+        "assignee": { "required": False, "name": "Assignee", "key": "assignee", "schema": { "type": "user", "system": "assignee" } },
+        "duedate": { "required": False, "name": "Due date", "key": "duedate", "schema": { "type": "date", "system": "duedate" } },
+        "components": { "required": False, "name": "Components", "key": "components", "schema": { "type": "array", "items": "component", "system": "components" }, "allowedValues": COMPONENTS },
+        "fixVersions": { "required": False, "name": "Fix versions", "key": "fixVersions", "schema": { "type": "array", "items": "version", "system": "fixVersions" }, "allowedValues": VERSIONS },
+        "environment": { "required": False, "name": "Environment", "key": "environment", "schema": { "type": "string", "system": "environment" } },
+        "customfield_10016": { "required": False, "name": "Story point estimate", "key": "customfield_10016", "schema": { "type": "number", "custom": "com.atlassian.jira.plugin.system.customfieldtypes:float", "customId": 10016 } },
+    }
+    if issue_type["subtask"]:
+        fields["parent"] = { "required": True, "name": "Parent", "key": "parent", "schema": { "type": "issuelink", "system": "parent" } }
+    return fields
+
+
+class MockJiraState:
+    """Thread-safe in-memory Jira: projects, created issues and fault-injection settings."""
+
+    def __init__(self, projects=DEFAULT_PROJECTS, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0,
+                 throttle_rate=0.0, rate_limit=None, retry_after=1, seed=None):
+        self.projects = { key.upper() for key in projects }
+        self.latency_ms = latency_ms       # Base latency added to every response
+        self.jitter_ms = jitter_ms         # Uniform extra latency in [0, jitter_ms]
+        self.error_rate = error_rate       # Probability of answering 500
+        self.throttle_rate = throttle_rate # Probability of answering 429
+        self.rate_limit = rate_limit       # Requests/second allowed by the token bucket (None = unlimited)
+        self.retry_after = retry_after     # Seconds advertised in Retry-After on 429
+        self.rng = random.Random(seed)
+
+        self.issues = {}                   # Issue key -> {"id", "key", "fields"}
+        self.counters = {}                 # Project key -> last issue number
+        self.attachment_count = 0          # Attachments uploaded so far (for their IDs)
+        self.request_count = 0
+        self._tokens = float(rate_limit or 0)
+        self._refilled_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    # --- FAULT INJECTION ---
+
+    def admit(self):
+        """
+        Decides how to treat an incoming request: returns None to serve it, or
+        (status, headers) for an injected 429/500. Also applies the configured latency.
+        """
+        with self._lock:
+            self.request_count += 1
+            delay = (self.latency_ms + self.rng.uniform(0, self.jitter_ms)) / 1000
+            roll = self.rng.random()
+            limited, headers = self._take_token()
+        if delay:
+            time.sleep(delay)
+
+        if limited:
+            return 429, headers
+        if roll < self.throttle_rate:
+            return 429, { "Retry-After": str(self.retry_after), **headers }
+        if roll < self.throttle_rate + self.error_rate:
+            return 500, headers
+        return None
+
+    def _take_token(self):
+        """Token-bucket rate limit (call with the lock held). Returns (limited, rate-limit headers)."""
+        if not self.rate_limit:
+            return False, {}
+        now = time.monotonic()
+        self._tokens = min(self.rate_limit, self._tokens + (now - self._refilled_at) * self.rate_limit)
+        self._refilled_at = now
+
+        reset_at = datetime.now(timezone.utc) + timedelta(seconds=1)
+        headers = {
+            "X-RateLimit-Limit": str(int(self.rate_limit)),
+            "X-RateLimit-FillRate": str(int(self.rate_limit)),
+            "X-RateLimit-Interval-Seconds": "1",
+            "X-RateLimit-Reset": reset_at.isoformat().replace("+00:00", "Z"),
+        }
+        if self._tokens < 1:
+            headers["X-RateLimit-Remaining"] = "0"
+            headers["Retry-After"] = str(self.retry_after)
+            return True, headers
+        self._tokens -= 1
+        headers["X-RateLimit-Remaining"] = str(int(self._tokens))
+        if self._tokens < self.rate_limit * 0.2:
+            headers["X-RateLimit-NearLimit"] = "true"
+        return False, headers
+
+    # --- ISSUE STORE ---
+
+    def validate(self, fields):
+        """Returns Jira-style field errors for a create request ({} if valid)."""
+        errors = {}
+        project_key = (fields.get("project") or {}).get("key", "").upper()
+        if project_key not in self.projects:
+            errors["project"] = "Specify a valid project ID or key"
+        type_id = (fields.get("issuetype") or {}).get("id")
+        issue_type = next((it for it in ISSUE_TYPES if it["id"] == type_id), None)
+        if issue_type is None:
+            errors["issuetype"] = "Specify a valid issue type"
+        elif issue_type["subtask"] and not (fields.get("parent") or {}).get("key"):
+            errors["parent"] = "Given parent work item does not belong to appropriate hierarchy."
+        parent_key = (fields.get("parent") or {}).get("key")
+        if parent_key and parent_key.upper() not in self.issues:
+            errors["parent"] = f"Parent issue '{parent_key}' does not exist."
+        if not str(fields.get("summary", "")).strip():
+            errors["summary"] = "You must specify a summary of the issue."
+        duedate = fields.get("duedate")
+        if duedate and not re.fullmatch(r"\d{4}-\d{2}-\d{2}", str(duedate)):
+            errors["duedate"] = "Error parsing date string: " + str(duedate)
+        if any(" " in str(label) for label in fields.get("labels", [])):
+            errors["labels"] = "The label contains spaces which is invalid."
+        for field_id, allowed in (("components", COMPONENTS), ("fixVersions", VERSIONS)):
+            for value in fields.get(field_id, []):
+                if not any(value.get("id") == v["id"] or value.get("name") == v["name"] for v in allowed):
+                    errors[field_id] = f"'{value.get('name', value.get('id'))}' is not a valid value."
+        if issue_type is not None:
+            screen = field_schemas(issue_type)
+            for field_id in fields:
+                if field_id not in screen:
+                    errors[field_id] = f"Field '{field_id}' cannot be set. It is not on the appropriate screen, or unknown."
+        priority = fields.get("priority")
+        if priority and not any(priority.get("id") == p["id"] or priority.get("name") == p["name"] for p in PRIORITIES):
+            errors["priority"] = "Specify the Priority (id or name) in the string format"
+        return errors
+
+    def create(self, fields):
+        """Stores a valid issue and returns its Jira create response."""
+        project_key = fields["project"]["key"].upper()
+        with self._lock:
+            number = self.counters.get(project_key, 0) + 1
+            self.counters[project_key] = number
+            issue_id = str(10000 + len(self.issues) + 1)
+            key = f"{project_key}-{number}"
+            self.issues[key] = { "id": issue_id, "key": key, "fields": fields }
+        return { "id": issue_id, "key": key, "self": f"/rest/api/3/issue/{issue_id}" }
+
+    def attach(self, issue_key, upload):
+        """Records an uploaded file's metadata on an issue; None if the issue does not exist."""
+        with self._lock:
+            issue = self.issues.get(issue_key.upper())
+            if issue is None:
+                return None
+            self.attachment_count += 1
+            attachment = { "id": str(20000 + self.attachment_count), "filename": upload["filename"], "size": upload["size"] }
+            issue.setdefault("attachments", []).append(attachment)
+        return attachment
+
+    def search(self, jql, fields, max_results, start_at):
+        """
+        Evaluates the small JQL subset used by the loader: key/labels in (...), labels = X, project = X (AND-ed).
+        Raises ValueError (a list of messages) for keys that do not exist.
+        """
+        with self._lock:
+            issues = list(self.issues.values())
+
+        for clause in re.split(r"\s+AND\s+", jql.strip(), flags=re.IGNORECASE) if jql.strip() else []:
+            keys = re.match(r"^key\s+in\s*\((.*)\)$", clause, re.IGNORECASE)
+            labels = re.match(r"^labels\s+in\s*\((.*)\)$", clause, re.IGNORECASE)
+            label = re.match(r'^labels\s*=\s*"?([^"]+)"?$', clause, re.IGNORECASE)
+            project = re.match(r'^project\s*=\s*"?([^"]+)"?$', clause, re.IGNORECASE)
+            if keys:
+                wanted = { k.strip().strip('"').upper() for k in keys.group(1).split(",") }
+                missing = wanted.difference(i["key"] for i in issues)
+                if missing:
+                    # Like Jira, an unknown key makes the whole query invalid
+                    raise ValueError([ f"An issue with key '{key}' does not exist for field 'key'." for key in sorted(missing) ])
+                issues = [ i for i in issues if i["key"] in wanted ]
+            elif labels:
+                wanted = { l.strip().strip('"') for l in labels.group(1).split(",") }
+                issues = [ i for i in issues if wanted.intersection(i["fields"].get("labels", [])) ]
+            elif label:
+                issues = [ i for i in issues if label.group(1) in i["fields"].get("labels", []) ]
+            elif project:
+                issues = [ i for i in issues if i["key"].startswith(project.group(1).upper() + "-") ]
+
+        page = issues[start_at:start_at + max_results]
+        result = {
+            "issues": [
+                { "id": i["id"], "key": i["key"],
+                  "fields": { f: i["fields"].get(f) for f in fields } if fields else {} }
+                for i in page
+            ],
+        }
+        if start_at + max_results < len(issues):
+            result["nextPageToken"] = str(start_at + max_results)
+        return result
+
+
+class MockJiraHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1" # Keep-alive, like Jira Cloud
+    disable_nagle_algorithm = True # Headers and body are separate writes: avoid delayed-ACK stalls
+    state = None                  # MockJiraState, set by make_server()
+
+    def log_message(self, format, *args):
+        pass # Keep benchmark output clean
+
+    # --- RESPONSE HELPERS ---
+
+    def send_json(self, status, body=None, headers=None):
+        data = json.dumps(body).encode("utf-8") if body is not None else b""
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if data:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def read_json(self):
+        length = int(self.headers.get("Content-Length", 0))
+        raw = self.rfile.read(length) if length else b""
+        return json.loads(raw) if raw else {}
+
+    def read_multipart(self):
+        """
+        Consumes a single-file multipart/form-data body in 64 KiB reads (never held in memory).
+        Returns { "filename", "size" } of the uploaded file.
+        """
+        boundary = self.headers.get("Content-Type", "").split("boundary=")[-1].strip('"')
+        remaining = int(self.headers.get("Content-Length", 0))
+        head = b""
+        while b"\r\n\r\n" not in head and remaining:
+            chunk = self.rfile.read(min(remaining, 1024))
+            remaining -= len(chunk)
+            head += chunk
+        part_headers, _, first = head.partition(b"\r\n\r\n")
+        filename = re.search(rb'filename="([^"]*)"', part_headers)
+        size = len(first)
+        while remaining:
+            chunk = self.rfile.read(min(remaining, 65536))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            size += len(chunk)
+        size -= len(f"\r\n--{boundary}--\r\n") # Closing delimiter
+        return { "filename": filename.group(1).decode("utf-8") if filename else "file", "size": max(0, size) }
+
+    def handle_request(self, method):
+        url = urlparse(self.path)
+        query = { k: v[-1] for k, v in parse_qs(url.query).items() }
+        if method == "POST" and self.headers.get("Content-Type", "").startswith("multipart/form-data"):
+            body = self.read_multipart()
+        else:
+            body = self.read_json() if method == "POST" else None
+
+        injected = self.state.admit()
+        if injected:
+            status, headers = injected
+            message = "Rate limit exceeded." if status == 429 else "Injected server error."
+            return self.send_json(status, { "errorMessages": [message] }, headers)
+
+        route, params = ROUTES.get((method, url.path)), ()
+        if route is None:
+            for route_method, pattern, handler in PATTERN_ROUTES:
+                match = pattern.fullmatch(url.path) if route_method == method else None
+                if match:
+                    route, params = handler, match.groups()
+                    break
+        if route is None:
+            return self.send_json(404, { "errorMessages": [f"No mock for {method} {url.path}"] })
+        route(self, query, body, *params)
+
+    def do_GET(self):
+        self.handle_request("GET")
+
+    def do_POST(self):
+        self.handle_request("POST")
+
+    # --- ENDPOINTS ---
+
+    def myself(self, query, body):
+        self.send_json(200, { "accountId": "mock-account", "emailAddress": "mock@example.com", "displayName": "Mock User", "active": True })
+
+    def createmeta(self, query, body):
+        keys = [ k.strip().upper() for k in query.get("projectKeys", "").split(",") if k.strip() ]
+        with_fields = "fields" in query.get("expand", "")
+        projects = []
+        for key in keys:
+            if key not in self.state.projects:
+                continue
+            issue_types = []
+            for it in ISSUE_TYPES:
+                entry = dict(it)
+                if with_fields:
+                    entry["fields"] = field_schemas(it)
+                issue_types.append(entry)
+            projects.append({ "key": key, "name": f"Project {key}", "issuetypes": issue_types })
+        self.send_json(200, { "projects": projects })
+
+    def send_page(self, query, items_key, items):
+        """Answers with one startAt/maxResults page of 'items', or 304 if If-None-Match matches its ETag."""
+        start_at = int(query.get("startAt", 0))
+        max_results = min(int(query.get("maxResults", 50)), 200)
+        page = {
+            items_key: items[start_at:start_at + max_results],
+            "startAt": start_at, "maxResults": max_results, "total": len(items),
+        }
+        etag = '"' + hashlib.sha1(json.dumps(page, sort_keys=True).encode("utf-8")).hexdigest()[:16] + '"'
+        if self.headers.get("If-None-Match") == etag:
+            return self.send_json(304, headers={ "ETag": etag })
+        self.send_json(200, page, { "ETag": etag })
+
+    def createmeta_issuetypes(self, query, body, project_key):
+        if project_key.upper() not in self.state.projects:
+            return self.send_json(404, { "errorMessages": [f"Project '{project_key}' not found."] })
+        self.send_page(query, "issueTypes", ISSUE_TYPES)
+
+    def createmeta_fields(self, query, body, project_key, issue_type_id):
+        issue_type = next((it for it in ISSUE_TYPES if it["id"] == issue_type_id), None)
+        if project_key.upper() not in self.state.projects or issue_type is None:
+            return self.send_json(404, { "errorMessages": ["Issue type not found for this project."] })
+        fields = [ dict(field, fieldId=field_id) for field_id, field in field_schemas(issue_type).items() ]
+        self.send_page(query, "fields", fields)
+
+    def project_resource(self, query, body, project_key, resource):
+        if project_key.upper() not in self.state.projects:
+            return self.send_json(404, { "errorMessages": [f"No project could be found with key '{project_key}'."] })
+        self.send_json(200, COMPONENTS if resource == "components" else VERSIONS)
+
+    def site_fields(self, query, body):
+        system = [
+            { "id": field_id, "name": field["name"], "custom": False }
+            for field_id, field in field_schemas(ISSUE_TYPES[-1]).items() if not field_id.startswith("customfield_")
+        ]
+        self.send_json(200, system + SITE_FIELDS)
+
+    def add_attachment(self, query, body, issue_key):
+        if self.headers.get("X-Atlassian-Token") != "no-check":
+            return self.send_json(403, { "errorMessages": ["XSRF check failed"] })
+        attachment = self.state.attach(issue_key, body)
+        if attachment is None:
+            return self.send_json(404, { "errorMessages": ["Issue does not exist or you do not have permission to see it."] })
+        self.send_json(200, [attachment])
+
+    def create_issue(self, query, body):
+        fields = (body or {}).get("fields", {})
+        errors = self.state.validate(fields)
+        if errors:
+            return self.send_json(400, { "errorMessages": [], "errors": errors })
+        self.send_json(201, self.state.create(fields))
+
+    def bulk_create(self, query, body):
+        updates = (body or {}).get("issueUpdates", [])
+        if len(updates) > 50:
+            return self.send_json(400, { "errorMessages": ["Bulk create accepts at most 50 issues."] })
+        issues, errors = [], []
+        for index, update in enumerate(updates):
+            fields = update.get("fields", {})
+            field_errors = self.state.validate(fields)
+            if field_errors:
+                errors.append({ "status": 400, "elementErrors": { "errorMessages": [], "errors": field_errors }, "failedElementNumber": index })
+            else:
+                issues.append(self.state.create(fields))
+        self.send_json(201 if issues else 400, { "issues": issues, "errors": errors })
+
+    def search_jql(self, query, body):
+        params = dict(query)
+        if body:
+            params.update(body)
+        fields = params.get("fields", [])
+        if isinstance(fields, str):
+            fields = [ f for f in fields.split(",") if f ]
+        max_results = min(int(params.get("maxResults", 50)), MAX_SEARCH_RESULTS)
+        start_at = int(params.get("nextPageToken") or 0)
+        try:
+            result = self.state.search(params.get("jql", ""), fields, max_results, start_at)
+        except ValueError as e:
+            return self.send_json(400, { "errorMessages": e.args[0], "warningMessages": [] })
+        self.send_json(200, result)
+
+
+ROUTES = {
+    ("GET", "/rest/api/3/myself"): MockJiraHandler.myself,
+    ("GET", "/rest/api/3/field"): MockJiraHandler.site_fields,
+    ("GET", "/rest/api/3/issue/createmeta"): MockJiraHandler.createmeta,
+    ("POST", "/rest/api/3/issue"): MockJiraHandler.create_issue,
+    ("POST", "/rest/api/3/issue/bulk"): MockJiraHandler.bulk_create,
+    ("GET", "/rest/api/3/search/jql"): MockJiraHandler.search_jql,
+    ("POST", "/rest/api/3/search/jql"): MockJiraHandler.search_jql,
+}
+
+PATTERN_ROUTES = [
+    ("GET", re.compile(r"/rest/api/3/issue/createmeta/([^/]+)/issuetypes"), MockJiraHandler.createmeta_issuetypes),
+    ("GET", re.compile(r"/rest/api/3/issue/createmeta/([^/]+)/issuetypes/([^/]+)"), MockJiraHandler.createmeta_fields),
+    ("GET", re.compile(r"/rest/api/3/project/([^/]+)/(components|versions)"), MockJiraHandler.project_resource),
+    ("POST", re.compile(r"/rest/api/3/issue/([^/]+)/attachments"), MockJiraHandler.add_attachment),
+]
+
+
+class MockJiraServer:
+    """Runs a mock Jira on a background thread; usable as a context manager from benchmarks."""
+
+    def __init__(self, host="127.0.0.1", port=0, **state_options):
+        self.state = MockJiraState(**state_options)
+        handler = type("BoundMockJiraHandler", (MockJiraHandler,), { "state": self.state })
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="mock-jira", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def add_fault_arguments(parser):
+    """Adds the latency/fault-injection options shared by the server CLI and the benchmark."""
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Base latency added to every response.")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Extra uniform latency in [0, N] ms.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probability of an injected 500.")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Probability of an injected 429.")
+    parser.add_argument("--rate-limit", type=float, default=None, help="Token-bucket limit in requests/second (429 when exceeded).")
+    parser.add_argument("--retry-after", type=int, default=1, help="Seconds advertised in Retry-After on 429.")
+    parser.add_argument("--projects", default=",".join(DEFAULT_PROJECTS), help="Comma-separated project keys to expose.")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for the fault-injection RNG.")
+
+def fault_options(args):
+    """Maps parsed fault arguments to MockJiraState keyword arguments."""
+    return {
+        "projects": [ k.strip() for k in args.projects.split(",") if k.strip() ],
+        "latency_ms": args.latency_ms, "jitter_ms": args.jitter_ms,
+        "error_rate": args.error_rate, "throttle_rate": args.throttle_rate,
+        "rate_limit": args.rate_limit, "retry_after": args.retry_after, "seed": args.seed,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a local mock Jira Cloud REST API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_fault_arguments(parser)
+    args = parser.parse_args()
+
+    server = MockJiraServer(args.host, args.port, **fault_options(args))
+    print(f"Mock Jira listening on {server.url} (Ctrl+C to stop)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.httpd.server_close()
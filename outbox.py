@@ -0,0 +1,323 @@
+"""
+Durable outbox for issue submissions.
+
+Every issue is written to a local SQLite database before it is sent and marked done
+once Jira returns its key, so nothing typed in the GUI is lost to a failed request,
+an outage or a restart. Pending entries are replayed in bulk when Jira is reachable.
+
+Each entry carries an idempotency label (autoissue-<hash>) inside its fields. Before
+an entry that was already attempted is sent again, Jira is searched for that label:
+if a timed-out request actually created the issue, the existing key is recorded
+instead of creating a duplicate.
+
+Usage:
+    python outbox.py status
+    python outbox.py replay
+"""
+import argparse, hashlib, json, sqlite3, threading, time, uuid
+
+import jira_api
+
+# --- OUTBOX SETTINGS ---
+OUTBOX_FILE = "outbox.db"        # SQLite database next to templates.json / .env
+LABEL_PREFIX = "autoissue-"      # Prefix of the idempotency label added to every issue
+STALE_SENDING = 600              # Seconds after which a 'sending' entry is considered abandoned
+# ----------------------------------------
+
+# --- ENTRY STATUSES ---
+PENDING = "pending"
+SENDING = "sending"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+# ----------------------------------------
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    idempotency_key TEXT NOT NULL UNIQUE,
+    fields TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    issue_key TEXT,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS outbox_status ON outbox (status, id);
+"""
+
+
+def idempotency_key(fields):
+    """
+    Label identifying one submission: a hash of its canonical fields plus a random nonce,
+    so two deliberate submissions of the same template still create two issues.
+    """
+    canonical = json.dumps(fields, sort_keys=True, separators=(",", ":"))
+    digest = hashlib.sha256(f"{canonical}\n{uuid.uuid4()}".encode("utf-8")).hexdigest()
+    return LABEL_PREFIX + digest[:16]
+
+def error_status(result):
+    """HTTP status of a failed create result ('N/A' when Jira could not be reached), or None."""
+    error = result.get("error", "")
+    if not error.startswith("API Error:"):
+        return None
+    return error.split(":", 1)[1].strip()
+
+def is_retryable(result):
+    """True for failures that may succeed later: no connection, throttling or a Jira 5xx."""
+    status = error_status(result)
+    return status is not None and (status in ("N/A", "429") or status.startswith("5"))
+
+
+class Outbox:
+    """
+    SQLite-backed queue of issue payloads. Safe to share between threads (one connection
+    guarded by a lock); WAL journaling keeps enqueue() cheap while workers are sending.
+    """
+
+    def __init__(self, path=OUTBOX_FILE):
+        self.path = path
+        self.offline = False # Set after a connection failure; send() then defers to replay()
+        self._reserved = set() # Entries a live SubmissionQueue will send(); replay() leaves them alone
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL") # Durable across app crashes; fsync per checkpoint
+        self._conn.executescript(SCHEMA)
+
+    # --- QUEUE OPERATIONS ---
+
+    def enqueue(self, fields, reserve=False):
+        """
+        Records a payload (adding its idempotency label) and returns the entry ID.
+        reserve=True keeps replay() from claiming it until send() or discard() is called for it
+        (the entry is owned by a SubmissionQueue, which may still cancel it).
+        """
+        key = idempotency_key(fields)
+        fields = dict(fields, labels=list(fields.get("labels", [])) + [key])
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO outbox (idempotency_key, fields, status, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (key, json.dumps(fields), PENDING, now, now)
+            )
+            if reserve:
+                self._reserved.add(cursor.lastrowid)
+        return cursor.lastrowid
+
+    def send(self, entry_id):
+        """
+        Sends one pending entry with a single POST /issue (SubmissionQueue worker function).
+        Returns the create_issue result; failures that replay() may still fix are marked
+        {"deferred": True} and stay pending.
+        """
+        try:
+            return self._send(entry_id)
+        finally:
+            with self._lock:
+                self._reserved.discard(entry_id) # Whatever is left pending now belongs to replay()
+
+    def _send(self, entry_id):
+        if self.offline:
+            # Jira is unreachable: don't wait for another timeout, leave it for replay()
+            return {"success": False, "deferred": True, "error": "Offline: saved to outbox", "details": "Jira could not be reached; the issue will be sent when the connection returns."}
+
+        claimed = self._claim("id = ?", (entry_id,), limit=1)
+        if not claimed:
+            return {"success": False, "deferred": True, "error": "Outbox: not pending", "details": f"Outbox entry {entry_id} was cancelled or picked up by a replay."}
+
+        entry = claimed[0]
+        if entry["attempts"] > 1:
+            # Only possible for a reclaimed stale entry: go through the deduplicating replay path
+            self._release([entry["id"]], "Reclaimed after an interrupted send.")
+            return {"success": False, "deferred": True, "error": "Outbox: queued for replay", "details": "A previous attempt was interrupted."}
+
+        result = jira_api.create_issue(entry["fields"])
+        return self._record(entry["id"], result)
+
+    def replay(self, batch_size=jira_api.BULK_CHUNK_SIZE):
+        """
+        Sends every pending entry in POST /issue/bulk batches, oldest first. Entries that
+        were attempted before are first looked up by idempotency label (one search per
+        batch) so a request that reached Jira is never created twice.
+        Stops at the first batch that could not be delivered. Returns [(entry_id, result), ...].
+        """
+        import requests
+        replayed = []
+        while True:
+            with self._lock:
+                reserved = tuple(self._reserved)
+            # Pending entries plus abandoned 'sending' ones (e.g. the app crashed mid-send; see _claim)
+            condition = f"id NOT IN ({', '.join('?' * len(reserved))})" if reserved else "1"
+            batch = self._claim(condition, reserved, limit=batch_size)
+            if not batch:
+                return replayed
+
+            # 1. Deduplicate entries that may already exist in Jira
+            retried = [ entry["key"] for entry in batch if entry["attempts"] > 1 ]
+            try:
+                existing = self._find_existing(retried) if retried else {}
+            except requests.exceptions.RequestException as e:
+                self.offline = e.response is None
+                self._release([ entry["id"] for entry in batch ], str(e))
+                return replayed
+
+            to_create = []
+            for entry in batch:
+                if entry["key"] in existing:
+                    replayed.append((entry["id"], self._record(entry["id"], {"success": True, "key": existing[entry["key"]]})))
+                else:
+                    to_create.append(entry)
+
+            # 2. Create the rest in one bulk request
+            if to_create:
+                results = jira_api.bulk_create_issues([ entry["fields"] for entry in to_create ])
+                replayed.extend(
+                    (entry["id"], self._record(entry["id"], result))
+                    for entry, result in zip(to_create, results)
+                )
+                if any(is_retryable(result) for result in results):
+                    return replayed # Jira is down or throttling: try again on the next replay
+
+    def discard(self, entry_id):
+        """Cancels an entry that has not been sent yet. Returns False if it is already sending or finished."""
+        with self._lock:
+            self._reserved.discard(entry_id)
+            cursor = self._conn.execute(
+                "UPDATE outbox SET status = ?, updated_at = ? WHERE id = ? AND status = ?",
+                (CANCELLED, time.time(), entry_id, PENDING)
+            )
+        return cursor.rowcount == 1
+
+    def pending_count(self):
+        """Number of entries waiting to be sent (including abandoned 'sending' ones)."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM outbox WHERE status IN (?, ?)", (PENDING, SENDING)
+            ).fetchone()[0]
+
+    def counts(self):
+        """Entry count per status."""
+        with self._lock:
+            return dict(self._conn.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall())
+
+    def entry_count(self):
+        """Number of entries in every status (the length of the history view)."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+
+    def history(self, offset, limit):
+        """One page of (entry ID, summary, status, issue key, last error), newest entry first."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT id, json_extract(fields, '$.summary'), status, issue_key, last_error FROM outbox "
+                "ORDER BY id DESC LIMIT ? OFFSET ?", (limit, offset)
+            ).fetchall()
+
+    def created_entries(self):
+        """(entry ID, issue key, fields) of every entry Jira accepted, oldest first (for reconcile.py)."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, issue_key, fields FROM outbox WHERE status = ? AND issue_key IS NOT NULL ORDER BY id", (DONE,)
+            ).fetchall()
+        return [ (entry_id, issue_key, json.loads(fields)) for entry_id, issue_key, fields in rows ]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # --- INTERNAL HELPERS ---
+
+    def _claim(self, condition, params, limit):
+        """
+        Atomically moves pending entries (plus 'sending' ones abandoned for STALE_SENDING seconds)
+        matching an SQL condition with bound 'params' to 'sending' and returns them as dicts.
+        The transaction makes a claim exclusive across threads and processes.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute(
+                    f"SELECT id, idempotency_key, fields, attempts FROM outbox "
+                    f"WHERE ({condition}) AND status IN (?, ?) AND (status = ? OR updated_at < ?) "
+                    f"ORDER BY id LIMIT ?",
+                    (*params, PENDING, SENDING, PENDING, now - STALE_SENDING, limit)
+                ).fetchall()
+                self._conn.executemany(
+                    "UPDATE outbox SET status = ?, attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                    [ (SENDING, now, row[0]) for row in rows ]
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return [
+            { "id": row[0], "key": row[1], "fields": json.loads(row[2]), "attempts": row[3] + 1 }
+            for row in rows
+        ]
+
+    def _release(self, entry_ids, error):
+        """Puts claimed entries back to 'pending'."""
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE outbox SET status = ?, last_error = ?, updated_at = ? WHERE id = ?",
+                [ (PENDING, error, now, entry_id) for entry_id in entry_ids ]
+            )
+
+    def _record(self, entry_id, result):
+        """Stores the outcome of a send and returns the result (flagged 'deferred' if it stays pending)."""
+        if result["success"]:
+            status, error = DONE, None
+            self.offline = False
+        elif is_retryable(result):
+            status, error = PENDING, result["error"]
+            self.offline = error_status(result) == "N/A"
+            result = dict(result, deferred=True)
+        else:
+            status, error = FAILED, f"{result['error']}: {result.get('details', '')}"
+            self.offline = False
+
+        with self._lock:
+            self._conn.execute(
+                "UPDATE outbox SET status = ?, issue_key = ?, last_error = ?, updated_at = ? WHERE id = ?",
+                (status, result.get("key"), error, time.time(), entry_id)
+            )
+        return result
+
+    def _find_existing(self, keys):
+        """Maps idempotency labels to the keys of issues that already carry them."""
+        issues = jira_api.search_issues(f"labels in ({jira_api.jql_list(keys)})", fields=["labels"])
+        wanted = set(keys)
+        return {
+            label: issue["key"]
+            for issue in issues
+            for label in issue["fields"].get("labels") or []
+            if label in wanted
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect or replay the offline issue outbox.")
+    parser.add_argument("command", choices=("status", "replay"), help="'status' prints entry counts; 'replay' sends pending entries.")
+    parser.add_argument("--outbox", default=OUTBOX_FILE, help="Outbox database file.")
+    args = parser.parse_args(argv)
+
+    outbox = Outbox(args.outbox)
+    if args.command == "replay":
+        jira_api.load_config()
+        if not jira_api.JIRA_URL or not jira_api.JIRA_API_TOKEN:
+            parser.error("Jira credentials (URL/API_TOKEN) are not configured in the .env.")
+        for entry_id, result in outbox.replay():
+            outcome = result["key"] if result["success"] else f"{result['error']} ({'kept' if result.get('deferred') else 'failed'})"
+            print(f"#{entry_id}: {outcome}")
+
+    for status, count in sorted(outbox.counts().items()):
+        print(f"{status:<10} {count}")
+    outbox.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Precompiled create-issue payloads for bulk generation.
+
+A PayloadSkeleton serializes everything that is fixed for a template and target
+(project, issue type ID, priority, labels, assignee, parent, resolved components,
+versions and other template fields, the description's ADF)
+once. render() then splices only the per-issue values (summary, an edited
+description, extra labels) into the pre-encoded bytes, producing the same
+b'{"fields": {...}}' body as jira_api.issue_update_json() without rebuilding the
+dict, converting the ADF or re-serializing the static fields.
+"""
+import json
+
+import jira_api
+from adf import markdown_to_adf
+
+VARIABLE_FIELDS = ("summary", "description", "labels") # Serialized per issue, in this order
+
+
+def _encode(value):
+    return json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+
+class PayloadSkeleton:
+    """Reusable, pre-serialized request body for one (template, project, issue type) combination."""
+
+    def __init__(self, tpl, project_key, issue_type_id, priority_id=None, parent_key=None, extra_fields=None):
+        fields = jira_api.build_issue_fields(
+            tpl, project_key, issue_type_id, priority_id=priority_id, parent_key=parent_key,
+            extra_fields=extra_fields
+        )
+        self.fields = fields # Kept for local validation (field_validation) of the compiled body
+        static = { name: value for name, value in fields.items() if name not in VARIABLE_FIELDS }
+        # '{"fields":{<static fields>,' -- the variable fields follow, then '}}'
+        self.prefix = b'{"fields":' + _encode(static)[:-1] + (b"," if static else b"")
+        self.summary = fields["summary"]
+        self.description_json = _encode(fields["description"])
+        self.labels = list(fields["labels"])
+        self.labels_json = _encode(self.labels)
+        self._default = None # Fully rendered body when nothing is overridden
+        self.dropped = {} # Template key -> why the resolver left it out (set by SkeletonCache)
+
+    def render(self, summary=None, description=None, extra_labels=()):
+        """
+        Returns the serialized body for one issue. 'summary' and 'description'
+        (Markdown, converted through the memoized ADF converter) default to the template's.
+        """
+        if summary is None and description is None and not extra_labels:
+            if self._default is None:
+                self._default = self._join(_encode(self.summary), self.description_json, self.labels_json)
+            return self._default
+
+        return self._join(
+            _encode(summary if summary is not None else self.summary),
+            _encode(markdown_to_adf(description)) if description is not None else self.description_json,
+            _encode(self.labels + list(extra_labels)) if extra_labels else self.labels_json,
+        )
+
+    def _join(self, summary_json, description_json, labels_json):
+        return b"".join((
+            self.prefix,
+            b'"summary":', summary_json,
+            b',"description":', description_json,
+            b',"labels":', labels_json,
+            b"}}",
+        ))
+
+
+class SkeletonCache:
+    """
+    Compiles each (template number, project, issue type, priority, parent) skeleton once.
+    With a FieldResolver, the template's extra fields are resolved at compile time too
+    (the fields it leaves out are kept in the skeleton's 'dropped').
+    """
+
+    def __init__(self, resolver=None):
+        self.skeletons = {}
+        self.resolver = resolver
+
+    def get(self, template_number, tpl, project_key, issue_type_id, priority_id=None, parent_key=None):
+        key = (template_number, project_key, issue_type_id, priority_id, parent_key)
+        skeleton = self.skeletons.get(key)
+        if skeleton is None:
+            extra_fields, dropped = self.resolver.resolve(tpl, issue_type_id) if self.resolver else (None, {})
+            skeleton = self.skeletons[key] = PayloadSkeleton(
+                tpl, project_key, issue_type_id, priority_id, parent_key, extra_fields
+            )
+            skeleton.dropped = dropped
+        return skeleton
+
+    def __len__(self):
+        return len(self.skeletons)
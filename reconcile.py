@@ -0,0 +1,257 @@
+"""
+Post-load reconciliation: checks that the issues a load reports as created exist in
+Jira and still match what was sent.
+
+Expected issues come from a bulk_loader result manifest or from the outbox (entries
+Jira accepted). They are fetched with batched POST /search/jql queries
+('key in (...)', large pages, only the compared fields) on a few concurrent workers
+instead of one GET per issue, then reported as:
+
+- missing: the key no longer exists (deleted, or never created);
+- moved:   the key now resolves to another key (issue moved to another project);
+- drifted: summary, issue type, priority, project or labels differ from what was sent.
+
+Usage:
+    python reconcile.py --manifest bulk_results.json
+    python reconcile.py --outbox outbox.db --report reconcile.json
+"""
+import argparse, json, os, re, sys
+from concurrent.futures import ThreadPoolExecutor
+
+import jira_api, metrics
+from outbox import Outbox, OUTBOX_FILE
+
+# --- RECONCILE SETTINGS ---
+KEYS_PER_QUERY = 500           # Keys per 'key in (...)' clause (keeps the JQL well below Jira's length limit)
+PAGE_SIZE = 5000               # maxResults per search page (Jira lowers it when more fields are requested)
+SEARCH_WORKERS = 4             # Concurrent search queries
+COMPARED_FIELDS = ("summary", "issuetype", "priority", "project", "labels")
+# ----------------------------------------
+
+MISSING_KEY_RE = re.compile(r"key '([^']+)'")
+
+
+# --- EXPECTED ISSUES ---
+
+def expected_from_fields(key, fields, source):
+    """Expectation for an issue created from a full 'fields' payload (outbox entries)."""
+    expected = {
+        "key": key,
+        "source": source,
+        "summary": fields.get("summary"),
+        "project": (fields.get("project") or {}).get("key"),
+        "issuetype": fields.get("issuetype"),
+        "priority": fields.get("priority"),
+        "labels": list(fields.get("labels", [])),
+    }
+    return { name: value for name, value in expected.items() if value is not None }
+
+def expectations_from_manifest(path):
+    """Expectations for the created items of a bulk_loader manifest (summary, project, issue type)."""
+    with open(path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    expectations = []
+    for item in manifest["items"]:
+        if item.get("status") != "created" or not item.get("key"):
+            continue
+        project = item.get("project") or item["key"].rsplit("-", 1)[0]
+        expected = { "key": item["key"], "source": f"item {item['index']}", "summary": item["summary"], "project": project }
+        if item.get("id"):
+            expected["id"] = item["id"]
+        if item.get("issuetype"):
+            # The manifest stores the type name; compare IDs when the project's metadata is cached
+            entry = jira_api.cached_project_metadata(project) or {}
+            type_id = entry.get("issue_types_map", {}).get(item["issuetype"])
+            expected["issuetype"] = { "id": type_id } if type_id else { "name": item["issuetype"] }
+        expectations.append(expected)
+    return expectations
+
+def expectations_from_outbox(path):
+    """Expectations for every outbox entry Jira accepted (the full payload is compared)."""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Outbox not found: {path}")
+    outbox = Outbox(path)
+    try:
+        return [ expected_from_fields(key, fields, f"outbox #{entry_id}") for entry_id, key, fields in outbox.created_entries() ]
+    finally:
+        outbox.close()
+
+
+# --- BATCHED SEARCH ---
+
+def search_keys(keys):
+    """
+    Fetches the compared fields of the given issue keys with one 'key in (...)' query (plus pages).
+    Jira rejects the whole query when a key does not exist: those keys are parsed from
+    the error, dropped and the query retried; if they cannot be identified the batch is split.
+    Returns (issues, missing keys).
+    """
+    import requests
+    keys = list(keys)
+    missing = []
+    while keys:
+        try:
+            issues = jira_api.search_issues(f"key in ({jira_api.jql_list(keys)})", fields=COMPARED_FIELDS, page_size=PAGE_SIZE)
+            return issues, missing
+        except requests.exceptions.HTTPError as e:
+            if e.response is None or e.response.status_code != 400:
+                raise
+            try:
+                messages = e.response.json().get("errorMessages", [])
+            except ValueError:
+                messages = []
+            unknown = { match.upper() for message in messages for match in MISSING_KEY_RE.findall(message) }
+            unknown &= { key.upper() for key in keys }
+            if unknown:
+                missing += [ key for key in keys if key.upper() in unknown ]
+                keys = [ key for key in keys if key.upper() not in unknown ]
+            elif len(keys) == 1:
+                return [], missing + keys
+            else:
+                middle = len(keys) // 2
+                first, first_missing = search_keys(keys[:middle])
+                second, second_missing = search_keys(keys[middle:])
+                return first + second, missing + first_missing + second_missing
+    return [], missing
+
+def fetch_issues(keys, workers=SEARCH_WORKERS, batch_size=KEYS_PER_QUERY):
+    """Runs search_keys() over batches of keys concurrently. Returns (issues, missing keys)."""
+    batches = [ keys[start:start + batch_size] for start in range(0, len(keys), batch_size) ]
+    issues, missing = [], []
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="reconcile") as pool:
+        for batch_issues, batch_missing in pool.map(search_keys, batches):
+            issues += batch_issues
+            missing += batch_missing
+    return issues, missing
+
+def fetch_moved(keys, workers=SEARCH_WORKERS):
+    """
+    Looks up each key with its own query: {key: issue} for the keys Jira still resolves.
+    Tells which issue a moved key became when a batched search answered with new keys.
+    """
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="reconcile") as pool:
+        found = dict(zip(keys, pool.map(lambda key: search_keys([key])[0], keys)))
+    return { key.upper(): issues[0] for key, issues in found.items() if issues }
+
+
+# --- COMPARISON ---
+
+def same_reference(expected, actual):
+    """Compares {"id"/"name"/"key"} references, e.g. {"id": "2"} with Jira's full priority object."""
+    actual = actual or {}
+    for attribute in ("id", "key", "name"):
+        if expected.get(attribute) is not None and actual.get(attribute) is not None:
+            return str(expected[attribute]) == str(actual[attribute])
+    return False
+
+def compare(expected, issue):
+    """Returns {field: {"expected": ..., "actual": ...}} for every compared field that differs."""
+    fields = issue.get("fields", {})
+    drift = {}
+    if "summary" in expected and fields.get("summary") != expected["summary"]:
+        drift["summary"] = fields.get("summary")
+    if "project" in expected:
+        actual_project = (fields.get("project") or {}).get("key") or issue["key"].rsplit("-", 1)[0]
+        if actual_project.upper() != expected["project"].upper():
+            drift["project"] = actual_project
+    for name in ("issuetype", "priority"):
+        if name in expected and not same_reference(expected[name], fields.get(name)):
+            drift[name] = fields.get(name)
+    if "labels" in expected:
+        missing_labels = sorted(set(expected["labels"]) - set(fields.get("labels") or []))
+        if missing_labels:
+            drift["labels"] = fields.get("labels") or []
+    return { name: { "expected": expected[name], "actual": actual } for name, actual in drift.items() }
+
+def reconcile(expectations, workers=SEARCH_WORKERS, batch_size=KEYS_PER_QUERY):
+    """
+    Checks every expectation against Jira. Returns a report:
+    {"checked", "ok", "missing": [...], "moved": [...], "drifted": [...]}.
+    """
+    keys = list(dict.fromkeys(expected["key"] for expected in expectations))
+    issues, _ = fetch_issues(keys, workers, batch_size) # Unknown keys are simply not returned
+    by_key = { issue["key"].upper(): issue for issue in issues }
+    by_id = { str(issue.get("id")): issue for issue in issues }
+    moved = {}
+    requested = { key.upper() for key in keys }
+    if any(key not in requested for key in by_key):
+        # Some issue answered with a new key: when only the old key is known (outbox entries
+        # have no issue ID), query the unmatched keys one by one to pair them up
+        unmatched = [
+            expected["key"] for expected in expectations
+            if expected["key"].upper() not in by_key and str(expected.get("id")) not in by_id
+        ]
+        moved = fetch_moved(list(dict.fromkeys(unmatched)), workers)
+
+    report = { "checked": len(expectations), "ok": 0, "missing": [], "moved": [], "drifted": [] }
+    for expected in expectations:
+        key = expected["key"].upper()
+        issue = by_key.get(key) or by_id.get(str(expected.get("id"))) or moved.get(key)
+        if issue is None:
+            report["missing"].append({ "key": expected["key"], "source": expected["source"] })
+            continue
+        if issue["key"].upper() != key:
+            # A moved issue is still found by its old key but answers with its new one
+            report["moved"].append({ "key": expected["key"], "source": expected["source"], "new_key": issue["key"] })
+        drift = compare(expected, issue)
+        if drift:
+            report["drifted"].append({ "key": issue["key"], "source": expected["source"], "fields": drift })
+        elif issue["key"].upper() == key:
+            report["ok"] += 1
+    return report
+
+
+def print_report(report, limit=50):
+    print(f"Checked {report['checked']}: {report['ok']} ok, {len(report['missing'])} missing, "
+          f"{len(report['moved'])} moved, {len(report['drifted'])} drifted.")
+    for entry in report["missing"][:limit]:
+        print(f"  MISSING {entry['key']} ({entry['source']})")
+    for entry in report["moved"][:limit]:
+        print(f"  MOVED   {entry['key']} -> {entry['new_key']} ({entry['source']})")
+    for entry in report["drifted"][:limit]:
+        changes = ", ".join(f"{name}: {change['expected']!r} -> {change['actual']!r}" for name, change in entry["fields"].items())
+        print(f"  DRIFTED {entry['key']} ({entry['source']}): {changes}")
+
+def main(argv=None):
+    import requests
+
+    parser = argparse.ArgumentParser(description="Check that created issues exist in Jira and match what was sent.")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--manifest", default=None, help="bulk_loader result manifest to check.")
+    source.add_argument("--outbox", default=None, nargs="?", const=OUTBOX_FILE, help=f"Outbox database to check (default: {OUTBOX_FILE}).")
+    parser.add_argument("--batch-size", type=int, default=KEYS_PER_QUERY, help="Issue keys per search query.")
+    parser.add_argument("--workers", type=int, default=SEARCH_WORKERS, help="Concurrent search queries.")
+    parser.add_argument("--report", default=None, help="Write the full JSON report to this path.")
+    metrics.add_metrics_arguments(parser)
+    args = parser.parse_args(argv)
+
+    jira_api.load_config()
+    if not jira_api.JIRA_URL or not jira_api.JIRA_API_TOKEN:
+        print("Configuration error: Jira credentials (URL/API_TOKEN) are not configured in the .env.", file=sys.stderr)
+        return 2
+
+    try:
+        if args.outbox:
+            expectations = expectations_from_outbox(args.outbox)
+        else:
+            expectations = expectations_from_manifest(args.manifest or "bulk_results.json")
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Could not read the issues to check: {e}", file=sys.stderr)
+        return 2
+
+    try:
+        report = reconcile(expectations, workers=args.workers, batch_size=args.batch_size)
+    except requests.exceptions.RequestException as e:
+        # Jira unreachable or a search rejected (after retries): nothing can be concluded
+        print(f"Could not search Jira for the created issues: {e}", file=sys.stderr)
+        return 2
+    print_report(report)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    metrics.export_metrics(args)
+    return 0 if not (report["missing"] or report["moved"] or report["drifted"]) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
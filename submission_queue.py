@@ -0,0 +1,87 @@
+import itertools, queue, threading
+from concurrent.futures import ThreadPoolExecutor
+
+# --- SUBMISSION STATUSES ---
+QUEUED = "queued"
+SENDING = "sending"
+CREATED = "created"
+FAILED = "failed"
+DEFERRED = "deferred"   # Not sent now; kept in the outbox for a later replay
+CANCELLED = "cancelled"
+# ----------------------------------------
+
+
+class SubmissionQueue:
+    """
+    Runs issue submissions on a background thread pool so the Tk mainloop never blocks on HTTP.
+
+    Worker threads never touch Tk widgets: every status change is pushed as a
+    (submission_id, status, result) event onto a thread-safe queue that the UI
+    drains from the main thread with poll() (scheduled through master.after()).
+    """
+
+    def __init__(self, submit_fn, max_workers=4):
+        self.submit_fn = submit_fn # Thread-safe callable: payload -> result dict
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="jira-submit")
+        self.events = queue.Queue()
+        self.futures = {} # Maps submission ID -> Future while it is queued or running
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def submit(self, payload):
+        """Queues one payload for submission and returns its submission ID."""
+        submission_id = next(self._ids)
+        # Report QUEUED first so a fast worker can never emit SENDING before it
+        self.events.put((submission_id, QUEUED, None))
+        with self._lock:
+            self.futures[submission_id] = self.executor.submit(self._run, submission_id, payload)
+        return submission_id
+
+    def cancel(self, submission_id):
+        """
+        Cancels a submission that has not started yet.
+        Returns False if it is already being sent (the HTTP call cannot be safely aborted) or finished.
+        """
+        with self._lock:
+            future = self.futures.get(submission_id)
+            if future is None or not future.cancel():
+                return False
+            del self.futures[submission_id]
+        self.events.put((submission_id, CANCELLED, None))
+        return True
+
+    @property
+    def in_flight(self):
+        """Number of submissions queued or currently being sent."""
+        with self._lock:
+            return len(self.futures)
+
+    def poll(self):
+        """Returns all pending status events without blocking (call from the UI thread)."""
+        events = []
+        while True:
+            try:
+                events.append(self.events.get_nowait())
+            except queue.Empty:
+                return events
+
+    def shutdown(self):
+        """Drops queued submissions and lets running ones finish in the background."""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, submission_id, payload):
+        self.events.put((submission_id, SENDING, None))
+        try:
+            result = self.submit_fn(payload)
+        except Exception as e:
+            # Never let a worker die silently: report unexpected errors as failures
+            result = {"success": False, "error": f"Unknown Error: {str(e)}", "details": str(e)}
+        finally:
+            with self._lock:
+                self.futures.pop(submission_id, None)
+        if result["success"]:
+            status = CREATED
+        else:
+            status = DEFERRED if result.get("deferred") else FAILED
+        self.events.put((submission_id, status, result))
+        return result
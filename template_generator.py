@@ -0,0 +1,245 @@
+"""
+Synthetic template generator for load testing.
+
+Builds realistic IT incident templates (same schema as templates.json: summary,
+description, priority, labels, components, duedate, environment, assignee,
+fixVersions) by combining themed fragments, and streams them to a JSON array or a
+JSONL file without holding the corpus in memory. Records are generated in chunks on
+a pool of processes; every chunk has its own RNG derived from the seed, so the output
+is byte-for-byte identical for a given seed whatever the number of workers.
+
+Usage:
+    python template_generator.py templates_1m.jsonl --count 1000000 --seed 42
+    python template_generator.py templates_big.json --count 50000 --workers 1
+"""
+import argparse, json, os, random, sys, time
+from datetime import date, timedelta
+from itertools import combinations
+from multiprocessing import Pool
+
+# --- GENERATOR SETTINGS ---
+RECORDS_PER_CHUNK = 10000      # Records generated (and written) per worker task
+DEFAULT_SEED = 42
+BASE_DUE_DATE = date(2025, 7, 28) # Due dates fall within DUE_DATE_SPAN days of this date
+DUE_DATE_SPAN = 90
+# ----------------------------------------
+
+# Each theme keeps summaries, components, labels and assignees coherent with each other.
+# Component and version names exist in the mock server (mock_jira.py), so generated
+# templates pass local validation and are accepted by it.
+THEMES = [
+    {
+        "subjects": ("Impresora de facturas", "Impresora de almacén", "Multifunción de RRHH", "Plotter de ingeniería"),
+        "symptoms": ("no toma papel de la bandeja auxiliar", "imprime páginas en blanco", "muestra error de fusor", "queda en cola sin imprimir"),
+        "details": ("Error PCL 01 mostrado en pantalla.", "El contador de páginas no avanza.", "Se reinstaló el driver sin éxito."),
+        "components": ("Hardware Office", "Soporte HW"),
+        "labels": ("impresora", "hardware", "periféricos"),
+        "environments": ("Oficina Central", "Depósito Norte", "Windows Server 2019, cola de impresión PRN-01"),
+        "assignees": ({ "name": "soporte.ti" }, { "name": "soporte.hw" }),
+    },
+    {
+        "subjects": ("Servidor SQL", "Base de datos de inventario", "Réplica de reporting", "Instancia SQL-Prod01"),
+        "symptoms": ("con CPU al 100%", "genera timeouts en las consultas", "no completa el backup diario", "con bloqueos entre transacciones"),
+        "details": ("El servidor `SQL-DB-01` no responde a las consultas de inventario.", "El job de mantenimiento quedó colgado.", "El log de transacciones creció un 300%."),
+        "components": ("Base de Datos", "Bases de datos", "Infraestructura"),
+        "labels": ("sql", "servidor", "producción", "performance"),
+        "environments": ("VM SQL-Prod01 en Azure, Disco P10 (128 GiB)", "Data Center", "Cluster SQL 2019 Always On"),
+        "assignees": ({ "name": "dbadmin" },),
+    },
+    {
+        "subjects": ("Usuarios de Finanzas", "Cuentas de contratistas", "Usuarios de la sucursal sur", "Cuenta de servicio de backups"),
+        "symptoms": ("bloqueados tras el parche mensual", "no pueden iniciar sesión", "sin acceso a carpetas compartidas", "con contraseña expirada por GPO"),
+        "details": ("Reciben el mensaje \"Your account has been disabled\".", "El controlador de dominio DC-02 rechaza la autenticación.", "La replicación entre sitios presenta errores."),
+        "components": ("Active Directory", "Seguridad"),
+        "labels": ("AD", "login", "seguridad"),
+        "environments": ("Dominio Corporativo", "Windows Server 2022, DC-01/DC-02"),
+        "assignees": ({ "name": "ad.team" },),
+    },
+    {
+        "subjects": ("Correo saliente", "Buzón compartido de ventas", "Conector SMTP", "Calendario de salas"),
+        "symptoms": ("retenido en cola de Exchange", "no sincroniza en Outlook", "rechazado por el filtro antispam", "con demoras de más de una hora"),
+        "details": ("La cola de envío supera los 5.000 mensajes.", "El certificado del conector vence esta semana.", "Los usuarios reciben NDR 5.7.1."),
+        "components": ("Exchange Server", "Cloud"),
+        "labels": ("correo", "Exchange", "SMTP", "office365"),
+        "environments": ("Servidores Email", "Office 365 - Tenant Contoso.onmicrosoft.com"),
+        "assignees": ({ "name": "exchange.admin" },),
+    },
+    {
+        "subjects": ("Aplicación web de clientes", "API de pedidos", "Portal de proveedores", "Servicio de facturación"),
+        "symptoms": ("arroja error 500 intermitente", "devuelve 500 al crear usuario", "responde con latencias de 10 segundos", "pierde la sesión al navegar"),
+        "details": ("El error aparece en el endpoint `/api/v1/orders`.", "Los logs muestran `NullReferenceException`.", "El pool de conexiones se agota en horario pico."),
+        "components": ("Backend", "API", "Frontend", "App Service", "Aplicaciones"),
+        "labels": ("web", "backend", "api", "bug", "error-500"),
+        "environments": ("Docker container con .NET 6 en Kubernetes AKS", "QA", "Azure App Service - plan P1v3"),
+        "assignees": ({ "name": "dev.team" },),
+    },
+    {
+        "subjects": ("VPN site-to-site", "Enlace MPLS de la sucursal", "Switch de piso 3", "Wi-Fi de la sala de reuniones"),
+        "symptoms": ("caído entre sucursal y CPD", "con pérdida de paquetes", "sin conectividad desde anoche", "con cortes intermitentes"),
+        "details": ("El túnel IPsec renegocia cada pocos minutos.", "Se detectaron errores CRC en el puerto 24.", "El proveedor confirma una falla en la última milla."),
+        "components": ("Redes", "Infraestructura"),
+        "labels": ("vpn", "network", "cableado", "wifi"),
+        "environments": ("Azure Central US - VPN Gateway 'vgw-prod-01'", "CPD Principal, Rack 12 Unidad 3-8", "Red interna segmento 192.168.10.0/24"),
+        "assignees": ({ "name": "redes.team" }, {}),
+    },
+    {
+        "subjects": ("Laptop HP EliteBook", "Workstation Dell", "Estación de trabajo de diseño", "Notebook del gerente comercial"),
+        "symptoms": ("se reinicia al abrir Excel", "sin señal de vídeo tras cambiar la GPU", "no empareja con el headset Bluetooth", "tarda 10 minutos en iniciar"),
+        "details": ("El visor de eventos registra el error 41 de Kernel-Power.", "Se actualizó el BIOS sin cambios.", "El problema persiste con otro usuario."),
+        "components": ("Workstations", "Soporte SW", "Helpdesk"),
+        "labels": ("windows", "hardware", "driver", "soporte-móvil"),
+        "environments": ("Windows 10 Pro v1909, Intel UHD Graphics 620", "Windows 11", "Taller Diseño"),
+        "assignees": ({ "name": "soporte.movil" }, { "name": "soporte.hw" }),
+    },
+    {
+        "subjects": ("Backup de NAS", "Sincronización ERP/e-commerce", "Almacenamiento de archivos", "Job de integración nocturno"),
+        "symptoms": ("falla por espacio insuficiente", "deja el stock desincronizado", "supera la ventana de mantenimiento", "termina con errores de permisos"),
+        "details": ("El volumen `/backup` está al 98%.", "El producto XYZ figura con stock distinto en ambos sistemas.", "El job se ejecuta con una cuenta sin permisos de escritura."),
+        "components": ("Almacenamiento", "Integraciones", "Cloud"),
+        "labels": ("backup", "NAS", "erp", "ecommerce", "storage"),
+        "environments": ("Data Center", "SAP ECC 6.0 + Magento 2 (PHP 7.4)"),
+        "assignees": ({ "name": "backup.team" }, { "accountId": "712020:91da5742-b4cf-4e5c-976c-11f2b84230e6" }),
+    },
+]
+
+OPENINGS = (
+    "Usuario informa que", "Se reporta que", "Desde el monitoreo se detecta que", "La mesa de ayuda recibe varios llamados:",
+)
+IMPACTS = (
+    "Afecta a todo el equipo.", "Impacta en la facturación del día.", "Hay un workaround manual disponible.",
+    "No hay impacto en clientes por el momento.", "Varios usuarios están detenidos.",
+)
+LOCATIONS = ("", "", " (Sucursal Sur)", " (CPD)", " (Planta 2)", " (home office)")
+PRIORITIES = ("1", "2", "2", "3", "3", "3", "4", "5") # Weighted towards Medium, like real incident queues
+VERSIONS = (
+    "2025-Q3", "Infra-redes-2025.07", "Patch-July-2025", "Sprint1", "db-maintenance-2025.07",
+    "hotfix-erp-sync-07", "release-1.5", "release-2025.08", "soporte-aug25", "v1.2.0",
+)
+
+_encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+
+def _subsets(values, max_size):
+    """Every non-empty combination of up to max_size values (picked from instead of calling sample())."""
+    return [ list(combo) for size in range(1, max_size + 1) for combo in combinations(values, size) ]
+
+# Fragment tables precomputed once per process: generating a record is then only table lookups
+_THEMES = [
+    (
+        [ (subject, subject.lower()) for subject in theme["subjects"] ], theme["symptoms"], theme["details"],
+        _subsets(theme["labels"], 3), _subsets(theme["components"], 2), theme["environments"], theme["assignees"],
+    )
+    for theme in THEMES
+]
+_DUE_DATES = [ (BASE_DUE_DATE + timedelta(days=offset)).isoformat() for offset in range(DUE_DATE_SPAN) ]
+
+
+def generate_template(rng):
+    """Builds one template from the fragment tables using the given random.Random."""
+    # seq[int(random() * len(seq))] is a uniform pick several times cheaper than rng.choice()
+    random = rng.random
+    subjects, symptoms, details, label_sets, component_sets, environments, assignees = _THEMES[int(random() * len(_THEMES))]
+    subject, subject_lower = subjects[int(random() * len(subjects))]
+    symptom = symptoms[int(random() * len(symptoms))]
+    description = f"{OPENINGS[int(random() * len(OPENINGS))]} {subject_lower} {symptom}. {details[int(random() * len(details))]}"
+    if random() < 0.5:
+        description += f"\n\n{IMPACTS[int(random() * len(IMPACTS))]}"
+
+    tpl = {
+        "summary": f"{subject} {symptom}{LOCATIONS[int(random() * len(LOCATIONS))]}",
+        "description": description,
+        "priority": PRIORITIES[int(random() * len(PRIORITIES))],
+        "labels": label_sets[int(random() * len(label_sets))][:],
+        "components": component_sets[int(random() * len(component_sets))][:],
+        "duedate": _DUE_DATES[int(random() * DUE_DATE_SPAN)],
+    }
+    if random() < 0.9:
+        tpl["environment"] = environments[int(random() * len(environments))]
+    tpl["assignee"] = dict(assignees[int(random() * len(assignees))])
+    if random() < 0.8:
+        tpl["fixVersions"] = [VERSIONS[int(random() * len(VERSIONS))]]
+    return tpl
+
+def chunk_rng(seed, chunk_number):
+    """Independent, reproducible RNG of one chunk (string seeds are hashed by random.Random)."""
+    return random.Random(f"{seed}:{chunk_number}")
+
+def generate_chunk(task):
+    """
+    Worker task: (seed, chunk number, count, separator) -> the chunk's records encoded
+    as one string, joined by the separator ("\\n" for JSONL, ",\\n" for a JSON array).
+    """
+    seed, chunk_number, count, separator = task
+    rng = chunk_rng(seed, chunk_number)
+    return separator.join([ _encode(generate_template(rng)) for _ in range(count) ])
+
+def iter_templates(count, seed=DEFAULT_SEED, chunk_size=RECORDS_PER_CHUNK):
+    """Yields the same templates write_templates() would write, in order (single process)."""
+    for chunk_number, start in enumerate(range(0, count, chunk_size)):
+        rng = chunk_rng(seed, chunk_number)
+        for _ in range(min(chunk_size, count - start)):
+            yield generate_template(rng)
+
+def write_templates(path, count, seed=DEFAULT_SEED, workers=None, fmt=None, chunk_size=RECORDS_PER_CHUNK):
+    """
+    Streams 'count' templates to 'path' as JSONL (fmt "jsonl", default for '.jsonl' files)
+    or as a JSON array. Chunks are generated on 'workers' processes (default: CPU count;
+    1 generates in-process) and written in order as they complete.
+    Returns the number of templates written.
+    """
+    fmt = fmt or ("jsonl" if path.endswith(".jsonl") else "json")
+    separator = "\n" if fmt == "jsonl" else ",\n"
+    tasks = [
+        (seed, chunk_number, min(chunk_size, count - start), separator)
+        for chunk_number, start in enumerate(range(0, count, chunk_size))
+    ]
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as out:
+        out.write("" if fmt == "jsonl" else "[\n")
+        if workers == 1 or len(tasks) <= 1:
+            chunks = map(generate_chunk, tasks)
+            pool = None
+        else:
+            pool = Pool(processes=workers)
+            chunks = pool.imap(generate_chunk, tasks) # Ordered: output does not depend on worker timing
+        try:
+            for number, chunk in enumerate(chunks):
+                if number:
+                    out.write(separator)
+                out.write(chunk)
+        finally:
+            if pool is not None:
+                pool.terminate()
+        if fmt == "json":
+            out.write("\n]\n")
+        elif count:
+            out.write("\n")
+    os.replace(tmp_path, path) # Readers never see a half-written corpus
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic issue templates for load testing.")
+    parser.add_argument("output", help="Output file ('.jsonl' writes JSON Lines, anything else a JSON array).")
+    parser.add_argument("--count", type=int, default=100000, help="Number of templates to generate.")
+    parser.add_argument("--seed", default=DEFAULT_SEED, help="Random seed (same seed, same corpus).")
+    parser.add_argument("--workers", type=int, default=None, help="Generator processes (default: CPU count).")
+    parser.add_argument("--format", choices=("json", "jsonl"), default=None, help="Override the format implied by the extension.")
+    parser.add_argument("--chunk-size", type=int, default=RECORDS_PER_CHUNK, help="Templates per worker task.")
+    args = parser.parse_args(argv)
+
+    if args.count < 0:
+        parser.error("--count must not be negative.")
+    if args.chunk_size < 1 or (args.workers is not None and args.workers < 1):
+        parser.error("--chunk-size and --workers must be at least 1.")
+
+    started = time.perf_counter()
+    written = write_templates(args.output, args.count, args.seed, args.workers, args.format, args.chunk_size)
+    elapsed = time.perf_counter() - started
+    print(f"Wrote {written:,} templates to {args.output} in {elapsed:.2f}s ({written / max(elapsed, 1e-9):,.0f} templates/s).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
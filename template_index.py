@@ -0,0 +1,206 @@
+"""
+In-memory inverted index over issue templates for the template browser.
+
+Summary, description, labels and components are tokenized (lower-cased, accents
+removed) into posting lists of template numbers. Queries match every typed word as
+a prefix, so results narrow as the user types; label and priority filters are
+posting lists too. Weighted random sampling (by priority by default) bisects a
+cumulative-weight table instead of scanning the templates.
+
+The index only stores integers, so it works unchanged over a list or a
+JsonlTemplateStore: templates are decoded only when a result is displayed.
+"""
+import bisect, heapq, itertools, random, re, unicodedata
+from array import array
+
+# --- INDEX SETTINGS ---
+PRIORITY_WEIGHTS = { "Highest": 5.0, "High": 4.0, "Medium": 3.0, "Low": 2.0, "Lowest": 1.0 }
+SEARCH_LIMIT = 200             # Results returned per query
+# ----------------------------------------
+
+WORD_RE = re.compile(r"\w+")
+COMBINING_RE = re.compile(r"[\u0300-\u036f]+")
+
+
+def normalize(text):
+    """Lower-cases text and strips accents ('Aplicación' -> 'aplicacion')."""
+    text = text.lower()
+    return text if text.isascii() else COMBINING_RE.sub("", unicodedata.normalize("NFKD", text))
+
+def tokenize(text):
+    """Splits text into normalized word tokens."""
+    return WORD_RE.findall(normalize(text))
+
+def template_priority(tpl, names=None):
+    """
+    Priority of a template as shown to the user: 'priority_name', else its 'priority' ID
+    mapped through 'names' (ID -> name, from the project's createmeta), else the bare ID.
+    """
+    if tpl.get("priority_name"):
+        return tpl["priority_name"]
+    priority = str(tpl.get("priority", ""))
+    return (names or {}).get(priority, priority)
+
+def priority_weight(tpl, names=None):
+    """Default sampling weight: higher priorities are drawn more often."""
+    return PRIORITY_WEIGHTS.get(template_priority(tpl, names), 1.0)
+
+
+class TemplateIndex:
+    """
+    Inverted index over a template sequence (list or JsonlTemplateStore).
+
+    search() returns template numbers (positions in the sequence) in corpus order;
+    sample() draws one template number using precomputed cumulative weights.
+    """
+
+    def __init__(self, templates, weight=None, priority_names=None):
+        self.templates = templates
+        self.priority_names = dict(priority_names or {}) # Priority ID -> name of the project (createmeta order)
+        self.postings = {}           # Token -> array of template numbers (ascending)
+        self.label_postings = {}     # Label -> array of template numbers
+        self.priority_postings = {}  # Priority (name, or ID without a known name) -> array of template numbers
+        self.cumulative = array("d") # Running total of the sampling weights, one per template
+        self._last_query = None      # (tokens, filters) of the previous search
+        self._last_matches = None    # Its full match set, refined by the next keystroke
+        self._sample_cache = (None, None) # (ids, cumulative weights) of the last filtered sample
+
+        postings, label_postings, priority_postings = {}, {}, {}
+        body_tokens = {} # Description + labels + components -> tokens (large corpora repeat them a lot)
+        total = 0.0
+        for number, tpl in enumerate(templates):
+            labels = tpl.get("labels", [])
+            body = " ".join([ tpl.get("description", ""), *labels, *tpl.get("components", []) ])
+            tokens = body_tokens.get(body)
+            if tokens is None:
+                tokens = body_tokens[body] = frozenset(tokenize(body))
+            for token in tokens.union(tokenize(tpl.get("summary", ""))):
+                posting = postings.get(token)
+                if posting is None:
+                    postings[token] = [number]
+                else:
+                    posting.append(number)
+            for label in set(labels):
+                label_postings.setdefault(label, []).append(number)
+            priority = template_priority(tpl, self.priority_names)
+            priority_postings.setdefault(priority, []).append(number)
+
+            total += max(0.0, weight(tpl) if weight else PRIORITY_WEIGHTS.get(priority, 1.0))
+            self.cumulative.append(total)
+
+        # Compact int arrays use a fraction of the memory of lists on large corpora
+        self.postings = { token: array("I", ids) for token, ids in postings.items() }
+        self.label_postings = { label: array("I", ids) for label, ids in label_postings.items() }
+        self.priority_postings = { name: array("I", ids) for name, ids in priority_postings.items() }
+        self.vocabulary = sorted(self.postings) # Sorted tokens, for prefix lookups with bisect
+
+    def __len__(self):
+        return len(self.cumulative)
+
+    @property
+    def labels(self):
+        return sorted(self.label_postings)
+
+    @property
+    def priorities(self):
+        """Priorities present in the corpus: the project's order (highest first), then unknown ones."""
+        known = [ name for name in dict.fromkeys([ *self.priority_names.values(), *PRIORITY_WEIGHTS ]) if name in self.priority_postings ]
+        return known + sorted(set(self.priority_postings).difference(known))
+
+    # --- SEARCH ---
+
+    def prefix_matches(self, prefix):
+        """Set of template numbers containing a token that starts with 'prefix'."""
+        start = bisect.bisect_left(self.vocabulary, prefix)
+        matches = set()
+        for token in itertools.islice(self.vocabulary, start, None):
+            if not token.startswith(prefix):
+                break
+            matches.update(self.postings[token])
+        return matches
+
+    def search(self, query="", labels=None, priority=None, limit=SEARCH_LIMIT):
+        """
+        Returns up to 'limit' template numbers whose words start with every word of the query,
+        restricted to templates carrying any of 'labels' and/or the given priority (one of 'priorities').
+
+        When the query extends the previous one (the user kept typing), only the previous
+        matches are re-checked instead of the whole index.
+        """
+        return self.first(self.match_set(query, labels, priority), limit)
+
+    def first(self, matches, limit=SEARCH_LIMIT):
+        """The 'limit' lowest template numbers of a match set (None = whole corpus), in corpus order."""
+        if matches is None:
+            return list(range(min(limit, len(self))))
+        return heapq.nsmallest(limit, matches)
+
+    def match_set(self, query="", labels=None, priority=None):
+        """Full set of matching template numbers, or None when nothing restricts the corpus."""
+        tokens = tokenize(query)
+        filters = (tuple(sorted(labels or ())), priority or None)
+        if not tokens and filters == ((), None):
+            return None
+
+        last = self._last_query
+        refine = (
+            last is not None and last[1] == filters and self._last_matches is not None
+            and len(tokens) >= len(last[0]) and len(last[0]) > 0
+            and all(token.startswith(old) for token, old in zip(tokens, last[0]))
+        )
+        if refine:
+            # Typing more characters only narrows the result: start from the previous matches
+            # and only check the words that changed
+            matches = set(self._last_matches)
+            pending = [ token for i, token in enumerate(tokens) if i >= len(last[0]) or token != last[0][i] ]
+        else:
+            matches = self._filter_set(*filters)
+            pending = tokens
+        for token in pending:
+            token_matches = self.prefix_matches(token)
+            matches = token_matches if matches is None else matches & token_matches
+            if not matches:
+                break
+
+        self._last_query = (tokens, filters)
+        self._last_matches = matches
+        return matches
+
+    def _filter_set(self, labels, priority):
+        """Templates passing the label/priority filters, or None when there is no filter."""
+        matches = None
+        if labels:
+            matches = set()
+            for label in labels:
+                matches.update(self.label_postings.get(label, ()))
+        if priority:
+            by_priority = set(self.priority_postings.get(priority, ()))
+            matches = by_priority if matches is None else matches & by_priority
+        return matches
+
+    # --- WEIGHTED SAMPLING ---
+
+    def sample(self, ids=None, rng=random):
+        """
+        Draws one template number with probability proportional to its weight, over the
+        whole corpus or only the given template numbers (e.g. the current search results).
+        Returns None if there is nothing to draw from.
+        """
+        if ids is None:
+            cumulative = self.cumulative
+            if not cumulative or cumulative[-1] <= 0:
+                return rng.randrange(len(self)) if len(self) else None
+            return min(bisect.bisect_right(cumulative, rng.random() * cumulative[-1]), len(self) - 1)
+
+        ids = sorted(ids)
+        if not ids:
+            return None
+        cached_ids, cumulative = self._sample_cache
+        if cached_ids != ids:
+            # Per-template weights are the deltas of the precomputed table: no template is decoded
+            weights = ( self.cumulative[i] - (self.cumulative[i - 1] if i else 0.0) for i in ids )
+            cumulative = array("d", itertools.accumulate(weights))
+            self._sample_cache = (ids, cumulative)
+        if cumulative[-1] <= 0:
+            return rng.choice(ids)
+        return ids[min(bisect.bisect_right(cumulative, rng.random() * cumulative[-1]), len(ids) - 1)]
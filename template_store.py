@@ -0,0 +1,199 @@
+"""
+Streaming, indexed template storage for very large template corpora.
+
+Templates can be kept as JSON Lines (one template object per line). A compact binary
+offset index ('<file>.idx') is built once by streaming the file and is rebuilt when
+the source changes; the JSONL file itself is memory-mapped, so random selection and
+lookup by index decode a single record instead of the whole corpus.
+
+Usage (convert a legacy JSON array without loading it fully into memory):
+    python template_store.py templates.json templates.jsonl
+"""
+import json, mmap, os, random, struct, sys, tempfile
+from array import array
+
+# --- INDEX FILE LAYOUT ---
+INDEX_MAGIC = b"TPLIDX1\0"
+INDEX_HEADER = struct.Struct("=8sQQQ")     # magic, source size, source mtime (ns), record count
+STREAM_CHUNK_SIZE = 1 << 16                # Bytes read per step when streaming a JSON array
+# ----------------------------------------
+
+
+def iter_json_array(path, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Yields the objects of a top-level JSON array one at a time, decoding the file
+    incrementally (memory use is bounded by the largest single template).
+    """
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buffer = ""
+        pos = 0
+        started = False
+        eof = False
+
+        while True:
+            # Skip whitespace and separators between elements
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if not started and pos < len(buffer):
+                if buffer[pos] != "[":
+                    raise ValueError(f"{path}: expected a JSON array of templates.")
+                started = True
+                pos += 1
+                continue
+            if started and pos < len(buffer) and buffer[pos] == "]":
+                return
+
+            try:
+                obj, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # Element incomplete: read more (or fail at end of file)
+                if eof:
+                    raise
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buffer = buffer[pos:] + chunk
+                pos = 0
+                continue
+
+            yield obj
+            pos = end
+
+
+class JsonlTemplateStore:
+    """
+    Read-only, random-access view over a JSONL template file.
+
+    Supports len(), store[i] (decodes one record from the memory map), iteration
+    (streams line by line) and random_template(). Safe to read from several threads.
+    """
+
+    def __init__(self, path, index_path=None):
+        self.path = path
+        self.index_path = index_path or f"{path}.idx"
+        self._file = open(path, "rb")
+        stat = os.fstat(self._file.fileno())
+        self._source_key = (stat.st_size, stat.st_mtime_ns)
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if stat.st_size else None
+        self._index_mm = None
+        self._offsets = self._load_index()
+        if self._offsets is None:
+            self._offsets = self._build_index()
+
+    # --- OFFSET INDEX ---
+
+    def _load_index(self):
+        """Maps an up-to-date index file, or returns None if it is missing or stale."""
+        try:
+            with open(self.index_path, "rb") as f:
+                index_mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+        if len(index_mm) < INDEX_HEADER.size:
+            index_mm.close()
+            return None
+        magic, size, mtime_ns, count = INDEX_HEADER.unpack_from(index_mm)
+        expected_length = INDEX_HEADER.size + count * 8
+        if magic != INDEX_MAGIC or (size, mtime_ns) != self._source_key or len(index_mm) != expected_length:
+            index_mm.close()
+            return None
+
+        self._index_mm = index_mm
+        return memoryview(index_mm)[INDEX_HEADER.size:].cast("Q")
+
+    def _build_index(self):
+        """Streams the JSONL file once, recording the byte offset of every non-blank line."""
+        offsets = array("Q")
+        offset = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                if line.strip():
+                    offsets.append(offset)
+                offset += len(line)
+
+        # Persist the index next to the source (atomic rename); a read-only folder only costs a rebuild next time
+        try:
+            directory = os.path.dirname(os.path.abspath(self.index_path))
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(INDEX_HEADER.pack(INDEX_MAGIC, *self._source_key, len(offsets)))
+                offsets.tofile(f)
+            os.replace(tmp_path, self.index_path)
+        except OSError:
+            pass
+        return offsets
+
+    # --- RECORD ACCESS ---
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self._offsets)
+        if not 0 <= index < len(self._offsets):
+            raise IndexError("template index out of range")
+        start = self._offsets[index]
+        end = self._mm.find(b"\n", start)
+        return json.loads(self._mm[start:end if end != -1 else len(self._mm)])
+
+    def __iter__(self):
+        with open(self.path, "rb") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def random_template(self, rng=random):
+        """Returns one uniformly chosen template, decoding only that record."""
+        return self[rng.randrange(len(self))]
+
+    def close(self):
+        if isinstance(self._offsets, memoryview):
+            self._offsets.release()
+        if self._index_mm is not None:
+            self._index_mm.close()
+        if self._mm is not None:
+            self._mm.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_template_store(path):
+    """
+    Opens a template source: '.jsonl' files get an indexed JsonlTemplateStore,
+    anything else is read as a legacy JSON array (list of dicts).
+    Raises FileNotFoundError if the file is missing.
+    """
+    if path.endswith(".jsonl"):
+        return JsonlTemplateStore(path)
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def random_template(templates, rng=random):
+    """Picks a random template from a list or a JsonlTemplateStore without materializing the store."""
+    return templates[rng.randrange(len(templates))]
+
+def convert_json_to_jsonl(src, dst):
+    """Streams a JSON array of templates into a JSONL file; returns the number of templates written."""
+    count = 0
+    with open(dst, "w", encoding="utf-8") as out:
+        for tpl in iter_json_array(src):
+            out.write(json.dumps(tpl, ensure_ascii=False))
+            out.write("\n")
+            count += 1
+    return count
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python template_store.py <templates.json> <templates.jsonl>", file=sys.stderr)
+        sys.exit(2)
+    written = convert_json_to_jsonl(sys.argv[1], sys.argv[2])
+    with JsonlTemplateStore(sys.argv[2]) as store:
+        print(f"Wrote {written} templates to {sys.argv[2]} (index: {store.index_path}).")
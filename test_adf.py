@@ -0,0 +1,95 @@
+"""
+Markdown to ADF conversion (adf.py).
+"""
+from adf import convert, markdown_to_adf
+
+
+def blocks(text):
+    return convert(text)["content"]
+
+def inline(text):
+    """Text nodes of a one-paragraph document."""
+    content = blocks(text)
+    assert [ node["type"] for node in content ] == ["paragraph"]
+    return content[0]["content"]
+
+def link(href):
+    return { "type": "link", "attrs": { "href": href } }
+
+def text_nodes(node):
+    if node.get("type") == "text":
+        yield node
+    for child in node.get("content", []):
+        yield from text_nodes(child)
+
+
+def test_empty_input_is_an_empty_document():
+    for text in ("", None, "\n\n  \n"):
+        assert convert(text) == { "type": "doc", "version": 1, "content": [] }
+
+def test_plain_lines_become_one_paragraph_with_hard_breaks():
+    assert blocks("first line\nsecond line\n\nnext paragraph") == [
+        { "type": "paragraph", "content": [
+            { "type": "text", "text": "first line" }, { "type": "hardBreak" }, { "type": "text", "text": "second line" },
+        ] },
+        { "type": "paragraph", "content": [{ "type": "text", "text": "next paragraph" }] },
+    ]
+
+def test_links_and_bare_urls():
+    assert inline("See [the runbook](https://wiki.example.com/rb) or https://status.example.com.") == [
+        { "type": "text", "text": "See " },
+        { "type": "text", "text": "the runbook", "marks": [link("https://wiki.example.com/rb")] },
+        { "type": "text", "text": " or " },
+        { "type": "text", "text": "https://status.example.com", "marks": [link("https://status.example.com")] },
+        { "type": "text", "text": "." },
+    ]
+
+def test_url_as_link_text_gets_a_single_link_mark():
+    nodes = inline("[http://a.com](http://a.com)")
+    assert nodes == [{ "type": "text", "text": "http://a.com", "marks": [link("http://a.com")] }]
+
+def test_code_span_inside_a_link_keeps_the_link():
+    assert inline("[`kubectl` guide](http://k8s.example.com)") == [
+        { "type": "text", "text": "kubectl", "marks": [link("http://k8s.example.com"), { "type": "code" }] },
+        { "type": "text", "text": " guide", "marks": [link("http://k8s.example.com")] },
+    ]
+
+def test_nested_marks():
+    assert inline("**bold *both* and `code`** _em_") == [
+        { "type": "text", "text": "bold ", "marks": [{ "type": "strong" }] },
+        { "type": "text", "text": "both", "marks": [{ "type": "strong" }, { "type": "em" }] },
+        { "type": "text", "text": " and ", "marks": [{ "type": "strong" }] },
+        { "type": "text", "text": "code", "marks": [{ "type": "code" }] }, # ADF: code only combines with links
+        { "type": "text", "text": " " },
+        { "type": "text", "text": "em", "marks": [{ "type": "em" }] },
+    ]
+
+def test_no_node_repeats_a_mark_type():
+    doc = convert("**[https://a.com](https://a.com)** *see https://b.com* [**https://c.com**](https://c.com)")
+    for node in text_nodes(doc):
+        types = [ mark["type"] for mark in node.get("marks", []) ]
+        assert len(types) == len(set(types)), node
+
+def test_nested_and_ordered_lists():
+    content = blocks("- parent\n  - child one\n  - child two\n- second\n\n3. third\n4. fourth")
+    bullet, ordered = content
+    assert bullet["type"] == "bulletList"
+    first, second = bullet["content"]
+    assert first["content"][0] == { "type": "paragraph", "content": [{ "type": "text", "text": "parent" }] }
+    assert first["content"][1]["type"] == "bulletList"
+    assert [ item["content"][0]["content"][0]["text"] for item in first["content"][1]["content"] ] == ["child one", "child two"]
+    assert second["content"][0]["content"][0]["text"] == "second"
+    assert ordered["type"] == "orderedList" and ordered["attrs"] == { "order": 3 }
+    assert len(ordered["content"]) == 2
+
+def test_headings_code_blocks_quotes_and_rules():
+    content = blocks("## Impact\n```sql\nSELECT 1;\n```\n> quoted\n---")
+    assert content == [
+        { "type": "heading", "attrs": { "level": 2 }, "content": [{ "type": "text", "text": "Impact" }] },
+        { "type": "codeBlock", "attrs": { "language": "sql" }, "content": [{ "type": "text", "text": "SELECT 1;" }] },
+        { "type": "blockquote", "content": [{ "type": "paragraph", "content": [{ "type": "text", "text": "quoted" }] }] },
+        { "type": "rule" },
+    ]
+
+def test_conversions_are_memoized():
+    assert markdown_to_adf("*cached*") is markdown_to_adf("*cached*")
@@ -0,0 +1,74 @@
+"""
+Streaming attachment uploads against a local mock_jira server.
+"""
+import pytest
+
+import jira_api
+from attachments import AttachmentUploader, MultipartFileStream, PROGRESS_STEP, upload_attachment
+from mock_jira import MockJiraServer
+
+ISSUE = { "project": { "key": "AUT" }, "issuetype": { "id": "10001" }, "summary": "With files" }
+
+
+@pytest.fixture
+def server():
+    with MockJiraServer() as srv:
+        jira_api.configure(srv.url, "user@example.com", "token")
+        srv.state.create(ISSUE) # AUT-1
+        yield srv
+    jira_api.configure(None, None, None)
+
+def write_file(tmp_path, name, size):
+    path = tmp_path / name
+    path.write_bytes(b"x" * size)
+    return str(path)
+
+
+def test_stream_length_matches_the_body(tmp_path):
+    stream = MultipartFileStream(write_file(tmp_path, "log.txt", 3000))
+
+    body = stream.read()
+
+    assert len(body) == len(stream)
+    assert body.startswith(f"--{stream.boundary}\r\n".encode())
+    assert body.endswith(f"\r\n--{stream.boundary}--\r\n".encode())
+    assert stream.read() == b"" # Fully consumed
+    stream.seek(0)
+    assert stream.read() == body
+    stream.close()
+
+def test_upload_reports_progress_and_size(server, tmp_path):
+    path = write_file(tmp_path, "dump.bin", PROGRESS_STEP * 2 + 10)
+    progress = []
+
+    result = upload_attachment("AUT-1", path, progress=lambda sent, total: progress.append(sent))
+
+    assert result["success"] and result["size"] == PROGRESS_STEP * 2 + 10
+    assert progress[-1] == PROGRESS_STEP * 2 + 10
+    assert progress == sorted(progress)
+    assert server.state.issues["AUT-1"]["attachments"][0]["filename"] == "dump.bin"
+
+def test_throttled_upload_is_rewound_and_resent(server, tmp_path):
+    path = write_file(tmp_path, "log.txt", 5000)
+    answers = [(429, { "Retry-After": "0" })]
+    admit = server.state.admit
+    server.state.admit = lambda: answers.pop() if answers else admit()
+
+    result = upload_attachment("AUT-1", path)
+
+    assert not answers # The first attempt was throttled
+    assert result["success"] and result["size"] == 5000 # The retry sent the whole file again
+
+def test_missing_file_and_issue_are_reported(server, tmp_path):
+    assert upload_attachment("AUT-1", str(tmp_path / "missing.txt"))["error"] == "File Error"
+    assert upload_attachment("AUT-99", write_file(tmp_path, "a.txt", 10))["error"] == "API Error: 404"
+
+def test_uploader_returns_results_in_job_order(server, tmp_path):
+    jobs = [ ("AUT-1", write_file(tmp_path, f"{n}.txt", 100 * (n + 1))) for n in range(5) ]
+    uploader = AttachmentUploader(max_workers=3)
+
+    results = uploader.upload_all(jobs)
+
+    uploader.shutdown()
+    assert [ result["size"] for result in results ] == [100, 200, 300, 400, 500]
+    assert uploader.pending == 0
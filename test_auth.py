@@ -1,14 +1,17 @@
-import os, requests
-from dotenv import load_dotenv
-
-load_dotenv()  # lee .env en la carpeta del script
-
-JIRA_URL   = os.getenv("JIRA_URL")           # direccion del proyecto Jira
-JIRA_EMAIL = os.getenv("JIRA_EMAIL")         # tu correo Atlassian
-JIRA_TOKEN = os.getenv("JIRA_API_TOKEN")     # token nuevo
-
-r = requests.get(f"{JIRA_URL}/rest/api/3/myself",
-                 auth=(JIRA_EMAIL, JIRA_TOKEN),
-                 headers={"Accept":"application/json"})
-print("Status:", r.status_code)
-print(r.text[:300])
+import os
+from dotenv import load_dotenv
+
+from http_transport import JiraSession
+
+load_dotenv()  # lee .env en la carpeta del script
+
+JIRA_URL   = os.getenv("JIRA_URL")           # direccion del proyecto Jira
+JIRA_EMAIL = os.getenv("JIRA_EMAIL")         # tu correo Atlassian
+JIRA_TOKEN = os.getenv("JIRA_API_TOKEN")     # token nuevo
+
+# sesion con pool de conexiones, timeout y reintentos ante 429/503
+session = JiraSession(JIRA_URL, JIRA_EMAIL, JIRA_TOKEN)
+r = session.get("/rest/api/3/myself")
+print("Status:", r.status_code)
+print(f"Latencia: {session.metrics.last_latency * 1000:.0f} ms")
+print(r.text[:300])
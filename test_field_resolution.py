@@ -0,0 +1,102 @@
+"""
+Template key -> Jira field mapping (field_resolution.py) against a local mock_jira server.
+"""
+import pytest
+
+import field_resolution
+import jira_api
+from bulk_loader import run_bulk_load
+from field_resolution import resolver_for, site_field_value
+from metadata_cache import MetadataCache
+from mock_jira import MockJiraServer
+
+TEMPLATE = {
+    "summary": "Migrar base de datos", "priority": "2", "labels": ["db"],
+    "components": ["Base de Datos", "Componente nuevo"], "fixVersions": ["release-1.5"],
+    "duedate": "2025-09-15", "environment": "Producción, *cluster B*",
+    "Story point estimate": 5, "Sprint": 3, "notas_internas": "solo para el equipo",
+}
+TEXTAREA = { "schema": { "type": "string", "custom": "com.atlassian.jira.plugin.system.customfieldtypes:textarea" } }
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    monkeypatch.setattr(jira_api, "metadata_cache", MetadataCache(str(tmp_path)))
+    with MockJiraServer() as srv:
+        jira_api.configure(srv.url, "user@example.com", "token") # Also clears the resolver caches
+        jira_api.get_project_metadata("AUT")
+        yield srv
+    jira_api.configure(None, None, None)
+
+
+def test_template_keys_become_jira_fields(server):
+    resolver = resolver_for("AUT").prepare([TEMPLATE])
+
+    fields, dropped = resolver.resolve(TEMPLATE, "10001")
+
+    assert fields["components"] == [ { "id": "10006" }, { "name": "Componente nuevo" } ] # Unknown names go as-is
+    assert fields["fixVersions"] == [ { "id": "10106" } ]
+    assert fields["duedate"] == "2025-09-15"
+    assert fields["environment"]["type"] == "doc"
+    assert fields["customfield_10016"] == 5 # Found by name, type-checked as a number
+    assert "notas_internas" not in fields and "notas_internas" not in dropped # Not a Jira field
+    assert dropped == { "Sprint": "Not on the create screen of this issue type." }
+
+def test_site_field_of_the_wrong_type_is_dropped(server):
+    resolver = resolver_for("AUT").prepare([TEMPLATE])
+
+    fields, dropped = resolver.resolve(dict(TEMPLATE, **{ "Story point estimate": "cinco" }), "10001")
+
+    assert "customfield_10016" not in fields
+    assert dropped["Story point estimate"] == "Must be a number."
+
+def test_site_fields_need_a_known_schema(server):
+    resolver = resolver_for("AUT").prepare([TEMPLATE])
+
+    fields, dropped = resolver.resolve(TEMPLATE) # No issue type: no createmeta to check against
+
+    assert "customfield_10016" not in fields and fields["duedate"] == "2025-09-15"
+    assert set(dropped) == { "Story point estimate", "Sprint" }
+    assert dropped["Sprint"].startswith("Its type is unknown")
+
+def test_lookups_cost_one_request_per_resource_type(server):
+    requests_before = server.state.request_count
+
+    resolver = resolver_for("AUT").prepare([TEMPLATE] * 20)
+    assert server.state.request_count - requests_before == 3 # Components, versions, site fields
+
+    for _ in range(20):
+        resolver.resolve(TEMPLATE, "10001", fetch=False)
+    assert server.state.request_count - requests_before == 3
+
+def test_site_field_values_are_checked_against_their_schema():
+    assert site_field_value("customfield_1", TEXTAREA, "Pasos:\n- uno")[0]["type"] == "doc" # ADF in API v3
+    assert site_field_value("customfield_1", TEXTAREA, 7) == (None, "Must be a string.")
+    strings = { "schema": { "type": "array", "items": "string" } }
+    assert site_field_value("customfield_2", strings, ["a", "b"]) == (["a", "b"], None)
+    assert site_field_value("customfield_2", strings, ["a", 1]) == (None, "Must be a list of strings.")
+    option = { "schema": { "type": "option" }, "allowedValues": [ { "id": "1", "name": "Sí" } ] }
+    assert site_field_value("customfield_3", option, "Sí") == (None, "Fields of type 'option' cannot be set from a template.")
+    assert site_field_value("customfield_4", { "schema": { "type": "date" } }, "15/09/2025")[1].startswith("Error parsing date")
+
+def test_bulk_load_warns_about_dropped_fields(server):
+    messages = []
+    tpl = dict(TEMPLATE, components=["Base de Datos"]) # Only known components pass local validation
+    resolver = resolver_for("AUT").prepare([tpl])
+
+    items = run_bulk_load([(4, tpl)], "AUT", { "Task": "10001" }, "Task", progress=messages.append, resolver=resolver)
+
+    assert items[0]["status"] == "created"
+    created = server.state.issues[items[0]["key"]]["fields"]
+    assert created["customfield_10016"] == 5 and "customfield_10020" not in created
+    assert "  ⚠️ template 4: 'Sprint' was not sent: Not on the create screen of this issue type." in messages
+
+def test_caches_are_dropped_when_the_site_changes(server):
+    resolver = resolver_for("AUT").prepare([TEMPLATE])
+    assert field_resolution.site_fields(fetch=False) is not None
+
+    jira_api.configure(server.url, "other@example.com", "token")
+
+    assert resolver_for("AUT") is not resolver
+    assert resolver.table("components", fetch=False) is None
+    assert field_resolution.site_fields(fetch=False) is None
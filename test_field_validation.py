@@ -0,0 +1,75 @@
+"""
+Local payload validation against createmeta field schemas (field_validation.py).
+"""
+import pytest
+
+import jira_api
+import mock_jira
+from field_validation import compile_validator, format_errors, validation_result, validator_for
+from metadata_cache import MetadataCache
+from mock_jira import MockJiraServer
+
+TASK = { "id": "10001", "name": "Task", "subtask": False }
+
+
+@pytest.fixture
+def validator():
+    schemas = { field_id: jira_api.compact_field_schema(field) for field_id, field in mock_jira.field_schemas(TASK).items() }
+    return compile_validator(schemas)
+
+def fields(**changes):
+    base = jira_api.build_issue_fields({ "summary": "Revisar backups", "priority": "3", "labels": ["backup"] }, "AUT", "10001")
+    base.update(changes)
+    return { key: value for key, value in base.items() if value is not None }
+
+
+def test_valid_payload_has_no_errors(validator):
+    assert validator.validate(fields(duedate="2025-08-31", components=[ { "id": "10000" }, { "name": "Redes" } ])) == {}
+
+def test_required_fields(validator):
+    assert validator.validate(fields(summary="   ")) == { "summary": "Summary is required." }
+
+def test_allowed_values(validator):
+    errors = validator.validate(fields(priority={ "id": "9" }, components=[ { "name": "Redes" }, { "name": "Cocina" } ]))
+
+    assert errors["priority"].startswith("'9' is not an allowed value (allowed: High, Highest, Low, Lowest, Medium")
+    assert errors["components"].startswith("'Cocina' is not an allowed value")
+
+def test_dates_labels_and_summary_length(validator):
+    errors = validator.validate(fields(duedate="31/08/2025", labels=["con espacio"], summary="x" * 300))
+
+    assert errors == {
+        "duedate": "Error parsing date string. Use the format yyyy-MM-dd.",
+        "labels": "The label 'con espacio' contains spaces which is invalid.",
+        "summary": "Summary must be less than 255 characters.",
+    }
+    assert validator.validate(fields(duedate="2025-02-30")) == { "duedate": "'2025-02-30' is not a valid date." }
+
+def test_fields_off_the_screen_and_bad_references(validator):
+    errors = validator.validate(fields(customfield_10020=5, assignee={ "displayName": "Ana" }))
+
+    assert errors == {
+        "customfield_10020": "Field 'customfield_10020' cannot be set. It is not on the appropriate screen, or unknown.",
+        "assignee": "Must be an object with an 'id', 'key' or 'name'.",
+    }
+
+def test_errors_read_like_a_jira_400():
+    errors = { "summary": "Summary is required.", "duedate": "Bad date." }
+
+    assert format_errors(errors) == "summary: Summary is required.; duedate: Bad date."
+    assert validation_result(errors) == { "success": False, "error": "Validation Error", "details": format_errors(errors) }
+
+def test_validator_is_compiled_from_cached_metadata(tmp_path, monkeypatch):
+    monkeypatch.setattr(jira_api, "metadata_cache", MetadataCache(str(tmp_path)))
+    with MockJiraServer() as srv:
+        jira_api.configure(srv.url, "user@example.com", "token")
+        try:
+            assert validator_for("AUT", "Task") is None # Nothing cached: validation is skipped
+            jira_api.get_project_metadata("AUT")
+
+            task = validator_for("AUT", "Task")
+            assert task is validator_for("AUT", "Task") # Compiled once
+            assert validator_for("AUT", "Subtarea").validate(fields(issuetype={ "id": "10004" })) == { "parent": "Parent is required." }
+            assert task.validate(fields()) == {}
+        finally:
+            jira_api.configure(None, None, None)
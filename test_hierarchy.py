@@ -0,0 +1,155 @@
+"""
+Parent/child hierarchies (hierarchy.py): DAG construction, default child types and scheduling.
+"""
+import json, threading
+
+import pytest
+
+import jira_api
+from hierarchy import CANCELLED, CREATED, FAILED, HierarchyScheduler, build_hierarchy, count_nodes
+from metadata_cache import MetadataCache
+
+ISSUE_TYPES = { "Epic": "10000", "Story": "10001", "Task": "10002", "Subtarea": "10004" }
+
+TREE = {
+    "summary": "Migración de correo", "issuetype": "Epic",
+    "children": [
+        { "summary": "Buzones", "children": [ { "summary": "Inventario" }, { "summary": "Exportar PST" } ] },
+        { "summary": "Conectores", "children": [ { "summary": "Configurar MX" } ] },
+    ],
+}
+
+
+@pytest.fixture(autouse=True)
+def no_cached_metadata(tmp_path, monkeypatch):
+    # Field validation is covered elsewhere: no createmeta is known here
+    monkeypatch.setattr(jira_api, "metadata_cache", MetadataCache(str(tmp_path)))
+
+class FakeJira:
+    """Bulk-create function recording every batch and the parent key of each issue."""
+
+    def __init__(self, fail=()):
+        self.fail = set(fail) # Summaries to reject
+        self.batches = []
+        self.created = {} # Key -> fields
+        self._lock = threading.Lock()
+
+    def __call__(self, payloads):
+        results = []
+        with self._lock:
+            self.batches.append(payloads)
+            for payload in payloads:
+                fields = json.loads(payload)["fields"]
+                if fields["summary"] in self.fail:
+                    results.append({ "success": False, "error": "API Error: 400", "details": "rejected" })
+                    continue
+                key = f"HIER-{len(self.created) + 1}"
+                self.created[key] = fields
+                results.append({ "success": True, "key": key })
+        return results
+
+def scheduler(fake, default_issue_type="Story", **options):
+    return HierarchyScheduler("HIER", ISSUE_TYPES, default_issue_type, create_fn=fake, **options)
+
+def issue_number(key):
+    return int(key.split("-")[1])
+
+def by_summary(nodes):
+    return { node.template["summary"]: node for node in nodes }
+
+
+def test_build_hierarchy_orders_parents_before_children():
+    nodes = build_hierarchy([(7, TREE)])
+
+    assert [ node.template["summary"] for node in nodes ] == [
+        "Migración de correo", "Buzones", "Inventario", "Exportar PST", "Conectores", "Configurar MX",
+    ]
+    assert [ node.depth for node in nodes ] == [0, 1, 2, 2, 1, 2]
+    assert all(node.parent is None or node.parent.number < node.number for node in nodes)
+    assert all("children" not in node.template and node.template_index == 7 for node in nodes)
+    assert count_nodes(TREE) == len(nodes) == 6
+
+def test_children_default_to_the_type_below_their_parent():
+    nodes = by_summary(build_hierarchy([(0, TREE)]))
+    sched = scheduler(FakeJira())
+
+    assert sched.issue_type_for(nodes["Migración de correo"]) == "Epic"
+    assert sched.issue_type_for(nodes["Buzones"]) == "Story" # Standard type under an epic
+    assert sched.issue_type_for(nodes["Inventario"]) == "Subtarea" # Subtask under a standard issue
+    assert sched.validate(list(nodes.values())) == {}
+
+def test_three_level_tree_is_created_top_down_with_parent_keys():
+    fake = FakeJira()
+    nodes = build_hierarchy([(0, TREE)])
+    sched = scheduler(fake, max_workers=2)
+
+    sched.run(nodes)
+
+    assert [ node.status for node in nodes ] == [CREATED] * 6
+    for node in nodes:
+        fields = fake.created[node.key]
+        assert fields["issuetype"] == { "id": ISSUE_TYPES[sched.issue_type_for(node)] }
+        if node.parent:
+            assert fields["parent"] == { "key": node.parent.key }
+            assert issue_number(node.parent.key) < issue_number(node.key) # Sent once the parent existed
+    assert [ len(batch) for batch in fake.batches ] == [1, 2, 3] # One bulk call per level here
+
+def test_failed_parent_cancels_only_its_descendants():
+    fake = FakeJira(fail={"Buzones"})
+    nodes = by_summary(build_hierarchy([(0, TREE)]))
+
+    scheduler(fake).run(list(nodes.values()))
+
+    assert nodes["Buzones"].status == FAILED
+    assert nodes["Inventario"].status == nodes["Exportar PST"].status == CANCELLED
+    assert nodes["Conectores"].status == nodes["Configurar MX"].status == CREATED
+    assert len(fake.created) == 3
+
+def test_child_under_a_subtask_rejects_the_whole_template_before_sending():
+    tree = { "summary": "Root", "issuetype": "Task", "children": [
+        { "summary": "Sub", "children": [ { "summary": "Too deep" } ] },
+    ] }
+    other = { "summary": "Independent", "issuetype": "Task" }
+    fake = FakeJira()
+    sched = scheduler(fake)
+    nodes = by_summary(build_hierarchy([(0, tree), (1, other)]))
+
+    invalid = sched.validate(list(nodes.values()))
+    assert list(invalid) == [nodes["Too deep"]]
+    assert "subtask" in invalid[nodes["Too deep"]]["issuetype"]
+
+    sched.run(list(nodes.values()))
+
+    assert nodes["Too deep"].status == FAILED
+    assert nodes["Root"].status == nodes["Sub"].status == CANCELLED
+    assert nodes["Independent"].status == CREATED
+    assert [ fields["summary"] for fields in fake.created.values() ] == ["Independent"]
+
+def test_explicit_type_at_the_wrong_level_is_rejected():
+    tree = { "summary": "Epic", "issuetype": "Epic", "children": [ { "summary": "Direct subtask", "issuetype": "Subtarea" } ] }
+    nodes = build_hierarchy([(0, tree)])
+
+    invalid = scheduler(FakeJira()).validate(nodes)
+
+    assert invalid[nodes[1]] == { "issuetype": "A 'Subtarea' cannot be created under a 'Epic'." }
+
+def test_standard_children_need_a_subtask_type():
+    tree = { "summary": "Task", "issuetype": "Task", "children": [ { "summary": "Child" } ] }
+    nodes = build_hierarchy([(0, tree)])
+    sched = HierarchyScheduler("HIER", { "Epic": "10000", "Task": "10002" }, "Task", create_fn=FakeJira())
+
+    assert sched.validate(nodes)[nodes[1]] == { "issuetype": "The project has no issue type that can be created at this level." }
+
+def test_lookup_failure_is_returned_not_printed(capsys):
+    class BrokenResolver:
+        def prepare(self, templates):
+            list(templates)
+            raise OSError("lookups down")
+        def resolve(self, tpl, issue_type_id=None, fetch=True):
+            return {}, {}
+    sched = scheduler(FakeJira(), resolver=BrokenResolver())
+
+    sched.run(build_hierarchy([(0, { "summary": "Solo", "issuetype": "Task" })]))
+
+    assert isinstance(sched.lookup_error, OSError)
+    assert capsys.readouterr().out == ""
@@ -0,0 +1,104 @@
+"""
+JiraSession retry behaviour against a local mock_jira server.
+
+Each test scripts the answers of MockJiraState.admit(): a (status, headers) tuple is an
+injected error, None lets the mock serve the request normally.
+"""
+import threading, time
+
+import pytest
+import requests
+
+import http_transport
+from http_transport import JiraSession
+from metrics import MetricsRegistry
+from mock_jira import MockJiraServer
+
+ISSUE = { "fields": { "project": { "key": "AUT" }, "issuetype": { "id": "10001" }, "summary": "Retry test" } }
+
+
+@pytest.fixture
+def server():
+    with MockJiraServer() as srv:
+        yield srv
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    # Exponential backoff would only slow the tests down; Retry-After waits are kept
+    monkeypatch.setattr(http_transport, "backoff_delay", lambda attempt: 0)
+
+def script(srv, *answers):
+    """Makes the mock answer the next requests with 'answers' (then normally)."""
+    answers, admit = iter(answers), srv.state.admit
+
+    def scripted():
+        answer = next(answers, None)
+        if answer is None:
+            return admit()
+        srv.state.request_count += 1
+        return answer
+    srv.state.admit = scripted
+
+def new_session(srv, **options):
+    return JiraSession(srv.url, "user@example.com", "token", metrics_registry=MetricsRegistry(), **options)
+
+
+def test_throttled_post_is_retried_after_retry_after(server):
+    # 429 and 503 mean Jira did not process the request: even a POST is sent again
+    script(server, (429, { "Retry-After": "0.3" }), (503, { "Retry-After": "0.3" }))
+    session = new_session(server)
+
+    started = time.monotonic()
+    resp = session.post("/rest/api/3/issue", json=ISSUE)
+
+    assert resp.status_code == 201
+    assert time.monotonic() - started >= 0.6 # Both Retry-After pauses were honoured
+    assert len(server.state.issues) == 1
+    assert session.metrics.to_json()["endpoints"][0]["retries"] == 2
+
+def test_retry_after_pauses_other_senders(server):
+    script(server, (429, { "Retry-After": "0.5" }))
+    session = new_session(server)
+    session.throttle.update = lambda resp: None # Only Retry-After may delay requests here
+    first = threading.Thread(target=session.get, args=("/rest/api/3/myself",))
+    first.start()
+    while not session.throttle.blocked_until:
+        time.sleep(0.01) # Until the 429 has been received: every sender is now paused
+
+    started = time.monotonic()
+    assert session.get("/rest/api/3/myself").status_code == 200
+    first.join()
+    assert time.monotonic() - started >= 0.3
+
+def test_gateway_error_is_retried_for_get_only(server):
+    script(server, (502, {}))
+    session = new_session(server)
+    assert session.get("/rest/api/3/myself").status_code == 200
+    assert server.state.request_count == 2
+
+    # The POST may have been processed behind the gateway: it is returned, never resent
+    script(server, (502, {}))
+    assert session.post("/rest/api/3/issue", json=ISSUE).status_code == 502
+    assert server.state.request_count == 3
+    assert not server.state.issues
+
+def test_gives_up_after_max_retries(server):
+    script(server, *[(429, { "Retry-After": "0" })] * 10)
+    session = new_session(server, max_retries=2)
+
+    resp = session.post("/rest/api/3/issue", json=ISSUE)
+
+    assert resp.status_code == 429
+    assert server.state.request_count == 3
+    assert not server.state.issues
+
+def test_timed_out_post_is_not_retried(server):
+    server.state.latency_ms = 500
+    session = new_session(server, timeout=(1, 0.2))
+
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        session.post("/rest/api/3/issue", json=ISSUE)
+
+    time.sleep(0.5)
+    assert server.state.request_count == 1
+    assert len(server.state.issues) == 1 # Jira did create it: a blind retry would duplicate it
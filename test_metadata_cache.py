@@ -0,0 +1,106 @@
+"""
+createmeta disk cache and its conditional revalidation against a local mock_jira server.
+"""
+import pytest
+
+import jira_api
+import mock_jira
+from metadata_cache import MetadataCache
+from mock_jira import MockJiraServer
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    monkeypatch.setattr(jira_api, "metadata_cache", MetadataCache(str(tmp_path)))
+    with MockJiraServer() as srv:
+        jira_api.configure(srv.url, "user@example.com", "token")
+        yield srv
+    jira_api.configure(None, None, None)
+
+def stale(entry):
+    return dict(entry, fetched_at=0)
+
+
+def test_fresh_entry_is_served_without_requests(server):
+    jira_api.get_project_metadata("AUT")
+    jira_api.project_metadata.clear() # Only the disk copy is left
+    requests_before = server.state.request_count
+
+    entry = jira_api.get_project_metadata("AUT")
+
+    assert server.state.request_count == requests_before
+    assert entry["issue_types_map"]["Task"] == "10001"
+
+def test_unchanged_metadata_is_revalidated_with_304(server):
+    entry = jira_api.get_project_metadata("AUT")
+    assert len(entry["etags"]) == len(entry["issue_types_map"]) + 1
+    requests_before = server.state.request_count
+    updates = []
+
+    jira_api.revalidate_project_metadata("AUT", stale(entry), on_update=updates.append)
+
+    assert server.state.request_count - requests_before == len(entry["etags"]) # Conditional GETs only
+    assert not updates
+    refreshed = jira_api.cached_project_metadata("AUT")
+    assert jira_api.metadata_cache.is_fresh(refreshed)
+    assert refreshed["field_schemas"] == entry["field_schemas"]
+
+def test_changed_metadata_is_fetched_again(server, monkeypatch):
+    entry = jira_api.get_project_metadata("AUT")
+    monkeypatch.setattr(mock_jira, "PRIORITIES", mock_jira.PRIORITIES + [ { "id": "6", "name": "Blocker" } ])
+    updates = []
+
+    jira_api.revalidate_project_metadata("AUT", stale(entry), on_update=updates.append)
+
+    priorities = updates[0]["field_schemas"]["Task"]["priority"]["allowedValues"]
+    assert { "id": "6", "name": "Blocker" } in priorities
+    assert jira_api.cached_project_metadata("AUT") is updates[0]
+
+def test_entry_without_etags_is_fetched_again(server):
+    entry = jira_api.get_project_metadata("AUT")
+    requests_before = server.state.request_count
+
+    jira_api.revalidate_project_metadata("AUT", dict(stale(entry), etags={}))
+
+    assert server.state.request_count - requests_before == len(entry["issue_types_map"]) + 1
+    assert jira_api.metadata_cache.is_fresh(jira_api.cached_project_metadata("AUT"))
+
+def test_entries_are_kept_per_account(tmp_path):
+    cache = MetadataCache(str(tmp_path))
+    metadata = { "issue_types_map": { "Task": "10001" }, "field_schemas": {} }
+
+    cache.store("https://example.atlassian.net/", "alice@example.com", "aut", metadata)
+
+    assert cache.load("https://EXAMPLE.atlassian.net", "Alice@example.com", "AUT")["issue_types_map"] == { "Task": "10001" }
+    assert cache.load("https://example.atlassian.net", "bob@example.com", "AUT") is None
+
+def test_unknown_project_is_reported_as_project_not_found(server):
+    results = jira_api.prefetch_project_metadata(["AUT", "NOPE"])
+
+    assert isinstance(results["NOPE"], jira_api.ProjectNotFound)
+    assert results["AUT"]["issue_types_map"]["Task"] == "10001"
+    with pytest.raises(jira_api.ProjectNotFound):
+        jira_api.fetch_project_metadata("NOPE")
+
+class PagedSession:
+    """Session answering a startAt/maxResults endpoint from a list, without 'total' or 'isLast'."""
+
+    def __init__(self, items, server_max=None):
+        self.items = items
+        self.server_max = server_max # Page size cap applied by the "server"
+        self.starts = []
+
+    def get(self, path, params):
+        start, size = params["startAt"], min(params["maxResults"], self.server_max or params["maxResults"])
+        self.starts.append(start)
+        page = { "values": self.items[start:start + size], "startAt": start, "maxResults": size }
+        return type("Response", (), { "headers": {}, "raise_for_status": lambda self: None, "json": lambda self: page })()
+
+def test_pages_without_total_are_followed_to_the_end(monkeypatch):
+    items = list(range(25))
+    for session, starts in ((PagedSession(items), [0, 10, 20]), (PagedSession(items[:20]), [0, 10, 20]),
+                            (PagedSession(items, server_max=4), [0, 4, 8, 12, 16, 20, 24])):
+        monkeypatch.setattr(jira_api, "get_session", lambda: session)
+
+        assert list(jira_api.iter_pages("/paged", "issueTypes", page_size=10)) == session.items
+        assert session.starts == starts # Stopped at the short (or empty) page
@@ -0,0 +1,59 @@
+"""
+Precompiled create-issue bodies (payload_skeleton.py) against the dict + json path.
+"""
+import json
+
+import jira_api
+from payload_skeleton import PayloadSkeleton, SkeletonCache
+
+TEMPLATE = {
+    "summary": "Actualizar certificados TLS", "description": "Renovar **antes** del vencimiento.\n- web\n- api",
+    "priority": "2", "labels": ["seguridad", "tls"], "assignee": { "accountId": "abc123" },
+}
+
+
+def reference(tpl, **changes):
+    """Body built the plain way: build_issue_fields + issue_update_json."""
+    return json.loads(jira_api.issue_update_json(jira_api.build_issue_fields(tpl, "AUT", "10001", **changes)))
+
+class CountingResolver:
+    def __init__(self):
+        self.calls = 0
+    def resolve(self, tpl, issue_type_id=None, fetch=True):
+        self.calls += 1
+        return { "components": [ { "id": "10000" } ], "duedate": "2025-08-01" }, { "Sprint": "Not on the create screen of this issue type." }
+
+
+def test_default_body_matches_the_reference_path():
+    skeleton = PayloadSkeleton(TEMPLATE, "AUT", "10001")
+
+    assert json.loads(skeleton.render()) == reference(TEMPLATE)
+    assert skeleton.render() is skeleton.render() # Encoded once
+
+def test_overrides_are_spliced_in():
+    skeleton = PayloadSkeleton(TEMPLATE, "AUT", "10001", priority_id="4", parent_key="AUT-7")
+
+    body = json.loads(skeleton.render(summary="Otro título", description="_editada_", extra_labels=["lote-3"]))
+
+    expected = reference(TEMPLATE, summary="Otro título", description="_editada_", priority_id="4", parent_key="AUT-7")
+    expected["fields"]["labels"].append("lote-3")
+    assert body == expected
+    assert json.loads(skeleton.render()) == reference(TEMPLATE, priority_id="4", parent_key="AUT-7") # Unchanged
+
+def test_template_without_optional_fields():
+    tpl = { "summary": "Mínima" }
+
+    assert json.loads(PayloadSkeleton(tpl, "AUT", "10001").render()) == reference(tpl)
+
+def test_cache_compiles_each_combination_once():
+    resolver = CountingResolver()
+    cache = SkeletonCache(resolver)
+
+    first = cache.get(0, TEMPLATE, "AUT", "10001")
+    assert cache.get(0, TEMPLATE, "AUT", "10001") is first
+    assert cache.get(0, TEMPLATE, "AUT", "10002") is not first
+    assert len(cache) == 2 and resolver.calls == 2
+
+    fields = json.loads(first.render())["fields"]
+    assert fields["components"] == [ { "id": "10000" } ] and fields["duedate"] == "2025-08-01"
+    assert first.dropped == { "Sprint": "Not on the create screen of this issue type." }
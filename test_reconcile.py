@@ -0,0 +1,114 @@
+"""
+Post-load reconciliation (reconcile.py) against a local mock_jira server.
+"""
+import json
+
+import pytest
+import requests
+
+import jira_api
+import reconcile
+from metadata_cache import MetadataCache
+from mock_jira import MockJiraServer
+from reconcile import expectations_from_manifest, expected_from_fields
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    monkeypatch.setattr(jira_api, "metadata_cache", MetadataCache(str(tmp_path)))
+    monkeypatch.setattr(jira_api, "load_config", lambda override=False: None) # Keep the mock server configured
+    with MockJiraServer() as srv:
+        jira_api.configure(srv.url, "user@example.com", "token")
+        yield srv
+    jira_api.configure(None, None, None)
+
+def create(srv, count):
+    """Creates 'count' issues; returns their expectations (as the outbox would record them)."""
+    expectations = []
+    for n in range(count):
+        fields = jira_api.build_issue_fields({ "summary": f"Issue {n}", "priority": "3", "labels": ["lote"] }, "AUT", "10001")
+        key = srv.state.create(fields)["key"]
+        expectations.append(expected_from_fields(key, fields, f"outbox #{n + 1}"))
+    return expectations
+
+
+def test_matching_issues_are_ok(server):
+    report = reconcile.reconcile(create(server, 30), batch_size=7)
+
+    assert report == { "checked": 30, "ok": 30, "missing": [], "moved": [], "drifted": [] }
+
+def test_deleted_issues_are_missing(server):
+    expectations = create(server, 12)
+    for key in ("AUT-3", "AUT-10"):
+        del server.state.issues[key]
+
+    report = reconcile.reconcile(expectations, batch_size=5)
+
+    assert sorted(entry["key"] for entry in report["missing"]) == ["AUT-10", "AUT-3"]
+    assert { "key": "AUT-3", "source": "outbox #3" } in report["missing"]
+    assert report["ok"] == 10
+
+def test_edited_issues_are_reported_as_drifted(server):
+    expectations = create(server, 3)
+    fields = server.state.issues["AUT-2"]["fields"]
+    fields.update(summary="Renamed", priority={ "id": "1" }, labels=[])
+
+    report = reconcile.reconcile(expectations)
+
+    assert report["ok"] == 2
+    assert report["drifted"] == [{ "key": "AUT-2", "source": "outbox #2", "fields": {
+        "summary": { "expected": "Issue 1", "actual": "Renamed" },
+        "priority": { "expected": { "id": "3" }, "actual": { "id": "1" } },
+        "labels": { "expected": ["lote"], "actual": [] },
+    } }]
+
+def test_moved_issue_is_paired_with_its_old_key(server, monkeypatch):
+    expectations = create(server, 3) # Outbox expectations: keys only, no issue IDs
+    search = jira_api.search_issues
+
+    def search_after_move(jql, fields=(), page_size=None):
+        # Jira still resolves the old key AUT-2 but answers with the issue's new key
+        return [
+            dict(issue, key="OPS-7", fields=dict(issue["fields"], project={ "key": "OPS" })) if issue["key"] == "AUT-2" else issue
+            for issue in search(jql, fields, page_size)
+        ]
+    monkeypatch.setattr(jira_api, "search_issues", search_after_move)
+
+    report = reconcile.reconcile(expectations)
+
+    assert report["moved"] == [{ "key": "AUT-2", "source": "outbox #2", "new_key": "OPS-7" }]
+    assert report["drifted"][0]["fields"] == { "project": { "expected": "AUT", "actual": "OPS" } }
+    assert report["ok"] == 2 and report["missing"] == []
+
+def test_manifest_items_compare_issue_type_ids(server, tmp_path):
+    jira_api.get_project_metadata("AUT")
+    create(server, 2)
+    manifest = tmp_path / "bulk_results.json"
+    manifest.write_text(json.dumps({ "items": [
+        { "index": 0, "project": "AUT", "summary": "Issue 0", "issuetype": "Task", "status": "created", "key": "AUT-1" },
+        { "index": 1, "project": "AUT", "summary": "Issue 1", "issuetype": "Incident", "status": "created", "key": "AUT-2" },
+        { "index": 2, "project": "AUT", "summary": "Rejected", "status": "failed" },
+    ] }), encoding="utf-8")
+
+    expectations = expectations_from_manifest(str(manifest))
+    report = reconcile.reconcile(expectations)
+
+    assert [ expected["issuetype"] for expected in expectations ] == [{ "id": "10001" }, { "id": "10002" }]
+    assert report["ok"] == 1
+    assert report["drifted"][0]["fields"]["issuetype"]["actual"] == { "id": "10001" }
+
+def test_exit_codes(server, tmp_path, monkeypatch, capsys):
+    create(server, 1)
+    manifest = tmp_path / "bulk_results.json"
+    items = [{ "index": 0, "project": "AUT", "summary": "Issue 0", "status": "created", "key": "AUT-1" }]
+    manifest.write_text(json.dumps({ "items": items }), encoding="utf-8")
+    assert reconcile.main(["--manifest", str(manifest)]) == 0
+
+    manifest.write_text(json.dumps({ "items": [dict(items[0], key="AUT-99")] }), encoding="utf-8")
+    assert reconcile.main(["--manifest", str(manifest)]) == 1
+
+    def unreachable(*args, **kwargs):
+        raise requests.exceptions.ConnectionError("connection refused")
+    monkeypatch.setattr(jira_api, "search_issues", unreachable)
+    assert reconcile.main(["--manifest", str(manifest)]) == 2
+    assert "connection refused" in capsys.readouterr().err
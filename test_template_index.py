@@ -0,0 +1,79 @@
+"""
+Template browser index (template_index.py): prefix search, filters and weighted sampling.
+"""
+import random
+from collections import Counter
+
+from template_index import TemplateIndex, normalize, template_priority
+
+TEMPLATES = [
+    { "summary": "Reinicio de aplicación ERP", "description": "La aplicación no responde", "priority": "1", "labels": ["erp", "urgente"] },
+    { "summary": "Alta de usuario en Active Directory", "priority": "3", "labels": ["ad"], "components": ["Active Directory"] },
+    { "summary": "Cambio de contraseña", "priority": "5", "labels": ["ad"] },
+    { "summary": "Aplicar parche de seguridad", "priority": "2", "labels": ["seguridad"] },
+    { "summary": "Caída de la red del edificio B", "priority_name": "Urgente", "labels": ["redes", "urgente"] },
+]
+NAMES = { "1": "Highest", "2": "High", "3": "Medium", "4": "Low", "5": "Lowest" }
+
+
+def test_text_is_normalized():
+    assert normalize("Aplicación ÉPICA") == "aplicacion epica"
+
+def test_every_query_word_is_a_prefix():
+    index = TemplateIndex(TEMPLATES)
+
+    assert index.search("apli") == [0, 3] # 'aplicación' and 'aplicar'
+    assert index.search("APLICACION erp") == [0]
+    assert index.search("active dir") == [1]
+    assert index.search("inexistente") == []
+    assert index.search("") == [0, 1, 2, 3, 4]
+
+def test_typing_more_narrows_the_previous_matches():
+    index = TemplateIndex(TEMPLATES)
+
+    assert index.search("a") == [0, 1, 2, 3]
+    assert index.search("ap") == [0, 3]
+    assert index.search("apl par") == [3]
+    assert index.search("ap") == [0, 3] # Deleting characters searches again
+
+def test_label_and_priority_filters():
+    index = TemplateIndex(TEMPLATES, priority_names=NAMES)
+
+    assert index.search(labels=["ad"]) == [1, 2]
+    assert index.search(labels=["erp", "redes"]) == [0, 4] # Any of the labels
+    assert index.search("cambio", labels=["ad"]) == [2]
+    assert index.search(priority="Highest") == [0]
+    assert index.search(priority="Urgente", labels=["urgente"]) == [4]
+    assert index.search(limit=2) == [0, 1]
+
+def test_priorities_are_named_from_the_project_scheme():
+    assert template_priority(TEMPLATES[0], NAMES) == "Highest"
+    assert template_priority(TEMPLATES[0]) == "1" # No createmeta: the bare ID
+    assert template_priority(TEMPLATES[4], NAMES) == "Urgente"
+
+    assert TemplateIndex(TEMPLATES, priority_names=NAMES).priorities == ["Highest", "High", "Medium", "Lowest", "Urgente"]
+    assert TemplateIndex(TEMPLATES).priorities == ["1", "2", "3", "5", "Urgente"]
+
+def test_sampling_follows_the_weights():
+    index = TemplateIndex(TEMPLATES, weight=lambda tpl: 3.0 if "ad" in tpl["labels"] else 0.0)
+    rng = random.Random(1)
+
+    draws = Counter(index.sample(rng=rng) for _ in range(2000))
+
+    assert set(draws) == {1, 2}
+    assert 800 < draws[1] < 1200
+    assert index.sample(ids=[0, 2, 3], rng=rng) == 2 # Only template 2 has a weight among these
+    assert index.sample(ids=[], rng=rng) is None
+
+def test_default_weights_favor_higher_priorities():
+    index = TemplateIndex(TEMPLATES, priority_names=NAMES)
+
+    assert list(index.cumulative) == [5.0, 8.0, 9.0, 13.0, 14.0] # Highest 5 ... Lowest 1, unknown 1
+    draws = Counter(index.sample(ids=[0, 2], rng=random.Random(3)) for _ in range(1200))
+    assert draws[0] > 4 * draws[2]
+
+def test_zero_weights_fall_back_to_uniform_draws():
+    index = TemplateIndex(TEMPLATES, weight=lambda tpl: 0.0)
+
+    assert { index.sample(rng=random.Random(seed)) for seed in range(50) } <= set(range(5))
+    assert index.sample(ids=[3], rng=random.Random(0)) == 3
@@ -0,0 +1,91 @@
+"""
+JSONL template storage with a persistent offset index (template_store.py).
+"""
+import json, os, random
+
+import pytest
+
+from template_store import (
+    INDEX_HEADER, JsonlTemplateStore, convert_json_to_jsonl, iter_json_array, open_template_store, random_template,
+)
+
+TEMPLATES = [
+    { "summary": f"Reinicio del servidor {n}", "priority": str(n % 5 + 1), "labels": ["infra", f"srv-{n}"] }
+    for n in range(50)
+]
+
+
+def write_jsonl(path, templates, blank_lines=False):
+    with open(path, "w", encoding="utf-8") as f:
+        for tpl in templates:
+            f.write(json.dumps(tpl, ensure_ascii=False) + "\n")
+            if blank_lines:
+                f.write("\n")
+    return str(path)
+
+@pytest.fixture
+def jsonl(tmp_path):
+    return write_jsonl(tmp_path / "templates.jsonl", TEMPLATES)
+
+
+def test_records_are_read_by_index(jsonl):
+    with JsonlTemplateStore(jsonl) as store:
+        assert len(store) == 50
+        assert store[0] == TEMPLATES[0]
+        assert store[37] == TEMPLATES[37]
+        assert store[-1] == TEMPLATES[-1]
+        assert list(store) == TEMPLATES
+        with pytest.raises(IndexError):
+            store[50]
+
+def test_blank_lines_and_a_missing_final_newline_are_ignored(tmp_path):
+    path = write_jsonl(tmp_path / "gaps.jsonl", TEMPLATES[:3], blank_lines=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps({ "summary": "Última" }, ensure_ascii=False)) # No trailing newline
+
+    with JsonlTemplateStore(path) as store:
+        assert len(store) == 4
+        assert store[2] == TEMPLATES[2]
+        assert store[3] == { "summary": "Última" }
+
+def test_index_is_persisted_and_reused(jsonl, monkeypatch):
+    with JsonlTemplateStore(jsonl) as store:
+        index_path = store.index_path
+    assert os.path.getsize(index_path) == INDEX_HEADER.size + 50 * 8
+
+    monkeypatch.setattr(JsonlTemplateStore, "_build_index", lambda self: pytest.fail("index rebuilt"))
+    with JsonlTemplateStore(jsonl) as store:
+        assert store[49] == TEMPLATES[49]
+
+def test_stale_index_is_rebuilt(jsonl):
+    JsonlTemplateStore(jsonl).close()
+    write_jsonl(jsonl, TEMPLATES[:5] + [{ "summary": "Nueva plantilla" }])
+
+    with JsonlTemplateStore(jsonl) as store:
+        assert len(store) == 6
+        assert store[5] == { "summary": "Nueva plantilla" }
+
+def test_random_selection_decodes_one_record(jsonl):
+    rng = random.Random(7)
+    expected = TEMPLATES[random.Random(7).randrange(50)]
+
+    with JsonlTemplateStore(jsonl) as store:
+        assert store.random_template(rng) == expected
+        assert random_template(store, random.Random(7)) == expected
+
+def test_json_array_is_streamed_into_jsonl(tmp_path):
+    src = tmp_path / "templates.json"
+    src.write_text(json.dumps(TEMPLATES, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    assert list(iter_json_array(str(src), chunk_size=64)) == TEMPLATES # Elements split across chunks
+    assert convert_json_to_jsonl(str(src), str(tmp_path / "out.jsonl")) == 50
+    with open_template_store(str(tmp_path / "out.jsonl")) as store:
+        assert list(store) == TEMPLATES
+    assert open_template_store(str(src)) == TEMPLATES # Legacy arrays load as a list
+
+def test_non_array_json_is_rejected(tmp_path):
+    src = tmp_path / "object.json"
+    src.write_text('{ "summary": "not a list" }', encoding="utf-8")
+
+    with pytest.raises(ValueError):
+        list(iter_json_array(str(src)))
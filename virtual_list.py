@@ -0,0 +1,317 @@
+"""
+Virtualized list views for large datasets (templates, submissions, outbox history).
+
+A plain ttk.Treeview creates one Tcl item per row: inserting tens of thousands of
+rows takes seconds and every later update walks that item list. VirtualTreeview only
+owns as many items as fit on screen ("slots"), draws its own scrollbar and asks a
+row source for the rows currently visible:
+
+    source.__len__()            -> number of rows
+    source.rows(start, count)   -> [(row ID, values tuple), ...]
+
+Row sources read lazily from where the data already lives: TemplateRows decodes only
+the visible records of a template list or JsonlTemplateStore, OutboxRows pages the
+SQLite outbox, SubmissionRows holds the rows of the current session. Changes are
+batched: invalidate() schedules at most one redraw per frame, however many rows
+background workers updated in between.
+"""
+import tkinter as tk
+from tkinter import ttk
+from collections import OrderedDict
+
+from template_index import template_priority
+
+# --- VIRTUAL LIST SETTINGS ---
+FRAME_MS = 16                  # Coalesce redraw requests into one per frame (~60 fps)
+WHEEL_ROWS = 3                 # Rows scrolled per mouse wheel notch
+ROW_CACHE_SIZE = 2000          # Decoded rows kept by TemplateRows / OutboxRows
+OUTBOX_PAGE_SIZE = 100         # Outbox history rows read per query
+DEFAULT_ROW_HEIGHT = 20        # Used when the theme does not define a Treeview row height
+# ----------------------------------------
+
+
+# --- ROW SOURCES ---
+
+class TemplateRows:
+    """
+    Rows (summary, priority, labels) of a template corpus: a list or a JsonlTemplateStore.
+    'numbers' (sorted template numbers, e.g. search matches) restricts the rows; row IDs are template numbers.
+    'priority_names' (ID -> name, from createmeta) names the templates' priority IDs.
+    """
+
+    def __init__(self, templates, numbers=None, priority_names=None):
+        self.templates = templates
+        self.numbers = numbers
+        self.priority_names = priority_names
+        self._cache = OrderedDict() # Template number -> values (most recently shown last)
+
+    def __len__(self):
+        return len(self.templates) if self.numbers is None else len(self.numbers)
+
+    def rows(self, start, count):
+        end = min(start + count, len(self))
+        numbers = range(start, end) if self.numbers is None else self.numbers[start:end]
+        return [ (number, self.values(number)) for number in numbers ]
+
+    def values(self, number):
+        values = self._cache.get(number)
+        if values is not None:
+            self._cache.move_to_end(number)
+            return values
+        tpl = self.templates[number] # Decodes a single record from a JsonlTemplateStore
+        values = self._cache[number] = (tpl.get("summary", ""), template_priority(tpl, self.priority_names), ", ".join(tpl.get("labels", [])))
+        if len(self._cache) > ROW_CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return values
+
+
+class SubmissionRows:
+    """Submission rows (#, summary, status, result) of the current session, oldest first; row IDs are submission IDs."""
+
+    COLUMNS = ("id", "summary", "status", "result")
+
+    def __init__(self):
+        self.order = [] # Submission IDs in display order
+        self.data = {} # Submission ID -> {column: value}
+
+    def __len__(self):
+        return len(self.order)
+
+    def __contains__(self, submission_id):
+        return submission_id in self.data
+
+    def add(self, submission_id, summary, status="queued", result=""):
+        self.order.append(submission_id)
+        self.data[submission_id] = { "id": submission_id, "summary": summary, "status": status, "result": result }
+
+    def get(self, submission_id, column):
+        return self.data[submission_id][column]
+
+    def update(self, submission_id, **values):
+        self.data[submission_id].update(values)
+
+    def rows(self, start, count):
+        return [
+            (submission_id, tuple(self.data[submission_id][column] for column in self.COLUMNS))
+            for submission_id in self.order[start:start + count]
+        ]
+
+
+class OutboxRows:
+    """
+    Outbox history rows (#, summary, status, key, error), newest first, read from SQLite
+    one page at a time. reload() picks up entries written since; row IDs are entry IDs.
+    """
+
+    def __init__(self, outbox, page_size=OUTBOX_PAGE_SIZE):
+        self.outbox = outbox
+        self.page_size = page_size
+        self.reload()
+
+    def reload(self):
+        self.count = self.outbox.entry_count()
+        self._pages = OrderedDict() # Page number -> rows
+
+    def __len__(self):
+        return self.count
+
+    def rows(self, start, count):
+        end = min(start + count, self.count)
+        rows = []
+        for page_number in range(start // self.page_size, (end - 1) // self.page_size + 1 if end > start else 0):
+            page_start = page_number * self.page_size
+            rows += self.page(page_number)[max(start - page_start, 0):end - page_start]
+        return rows
+
+    def page(self, page_number):
+        page = self._pages.get(page_number)
+        if page is None:
+            page = self._pages[page_number] = [
+                (entry_id, (entry_id, summary or "", status, issue_key or "", last_error or ""))
+                for entry_id, summary, status, issue_key, last_error in self.outbox.history(page_number * self.page_size, self.page_size)
+            ]
+            if len(self._pages) * self.page_size > ROW_CACHE_SIZE:
+                self._pages.popitem(last=False)
+        else:
+            self._pages.move_to_end(page_number)
+        return page
+
+
+# --- VIEW ---
+
+class VirtualTreeview(ttk.Frame):
+    """
+    Treeview that renders only the visible rows of a row source.
+    Selection and focus are tracked by row ID, so they survive scrolling and redraws.
+    'columns' is a list of (column, heading, width); on_activate(row ID) runs on double-click/Return.
+    With follow=True the view keeps showing the last row while rows are appended (log-style).
+    """
+
+    def __init__(self, master, columns, source=None, height=10, on_activate=None, follow=False, selectmode="extended"):
+        super().__init__(master)
+        self.source = source
+        self.on_activate = on_activate
+        self.follow = follow
+        self.top = 0           # Index of the first visible row
+        self.visible = height  # Rows that fit in the widget
+        self.cursor = None     # Index of the focused row
+        self.selected = set()  # Selected row IDs (visible or not)
+        self.slots = []        # (row ID, values) drawn in each slot item
+        self.total = 0         # Source length at the last redraw
+        self.pending = None    # after() ID of the scheduled redraw
+
+        self.tree = ttk.Treeview(self, columns=[ column for column, _, _ in columns ], show="headings", height=height, selectmode=selectmode)
+        for column, heading, width in columns:
+            self.tree.heading(column, text=heading)
+            self.tree.column(column, width=width, anchor="w")
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.yview)
+        self.tree.pack(side=tk.LEFT, fill="both", expand=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill="y")
+
+        self.tree.bind("<<TreeviewSelect>>", self.on_select)
+        self.tree.bind("<Button-1>", self.on_click)
+        for sequence in ("<Control-Button-1>", "<Shift-Button-1>"):
+            self.tree.bind(sequence, lambda event: None) # Extend the selection: keep hidden selected rows
+        self.tree.bind("<Double-1>", lambda event: self.activate())
+        self.tree.bind("<Return>", lambda event: self.activate())
+        self.tree.bind("<Configure>", self.on_resize)
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.tree.bind(sequence, self.on_wheel)
+        for sequence, step in (("<Up>", -1), ("<Down>", 1), ("<Prior>", "-page"), ("<Next>", "page"), ("<Home>", "home"), ("<End>", "end")):
+            self.tree.bind(sequence, lambda event, step=step: self.move_cursor(step))
+
+    # --- DATA ---
+
+    def set_source(self, source, keep_position=False):
+        """Shows another row source (e.g. new search results); selection is cleared unless keep_position."""
+        self.source = source
+        if not keep_position:
+            self.top = 0
+            self.cursor = None
+            self.selected.clear()
+        self.render()
+
+    def invalidate(self):
+        """Requests a redraw; repeated calls before the next frame are merged into one."""
+        if self.pending is None:
+            self.pending = self.after(FRAME_MS, self.render)
+
+    def render(self):
+        """Draws the visible rows into the slot items (only slots whose row changed are updated)."""
+        if self.pending is not None:
+            self.after_cancel(self.pending)
+            self.pending = None
+        total = len(self.source) if self.source is not None else 0
+        if self.follow and self.top + self.visible >= self.total:
+            self.top = total # Was showing the end: keep following appended rows
+        self.top = max(0, min(self.top, total - self.visible))
+        self.total = total
+        rows = self.source.rows(self.top, self.visible) if total else []
+
+        while len(self.slots) < len(rows):
+            self.tree.insert("", tk.END, iid=str(len(self.slots)))
+            self.slots.append(None)
+        while len(self.slots) > len(rows):
+            self.slots.pop()
+            self.tree.delete(str(len(self.slots)))
+
+        selection = []
+        for slot, row in enumerate(rows):
+            if self.slots[slot] != row:
+                self.tree.item(str(slot), values=row[1])
+                self.slots[slot] = row
+            if row[0] in self.selected:
+                selection.append(str(slot))
+        self.tree.selection_set(selection)
+        if self.cursor is not None and 0 <= self.cursor - self.top < len(rows):
+            self.tree.focus(str(self.cursor - self.top))
+
+        if total:
+            self.scrollbar.set(self.top / total, (self.top + len(rows)) / total)
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    # --- SELECTION ---
+
+    def row_id(self, index):
+        """Row ID at a row index (visible or not), or None."""
+        if self.top <= index < self.top + len(self.slots):
+            return self.slots[index - self.top][0]
+        rows = self.source.rows(index, 1) if self.source is not None and 0 <= index < len(self.source) else []
+        return rows[0][0] if rows else None
+
+    def selection(self):
+        """Selected row IDs."""
+        return list(self.selected)
+
+    def focus_id(self):
+        """Row ID of the focused row, or None."""
+        return self.row_id(self.cursor) if self.cursor is not None else None
+
+    def on_click(self, event):
+        # A plain click on a row replaces the selection, including rows scrolled out of view
+        if self.tree.identify_row(event.y):
+            self.selected.clear()
+
+    def on_select(self, event=None):
+        shown = { row[0] for row in self.slots }
+        chosen = { self.slots[int(item)][0] for item in self.tree.selection() if int(item) < len(self.slots) }
+        self.selected = (self.selected - shown) | chosen
+        focus = self.tree.focus()
+        if focus and int(focus) < len(self.slots):
+            self.cursor = self.top + int(focus)
+
+    def activate(self):
+        row_id = self.focus_id()
+        if row_id is not None and self.on_activate is not None:
+            self.on_activate(row_id)
+        return "break"
+
+    # --- SCROLLING ---
+
+    def scroll_to(self, index):
+        """Scrolls the minimum needed for the row at 'index' to be visible."""
+        if index < self.top:
+            self.top = index
+        elif index >= self.top + self.visible:
+            self.top = index - self.visible + 1
+        self.invalidate()
+
+    def yview(self, *args):
+        """Scrollbar command: ('moveto', fraction) or ('scroll', n, 'units'|'pages')."""
+        total = len(self.source) if self.source is not None else 0
+        if args[0] == "moveto":
+            self.top = int(float(args[1]) * total)
+        elif args[0] == "scroll":
+            self.top += int(args[1]) * (self.visible if args[2] == "pages" else 1)
+        self.invalidate()
+
+    def on_wheel(self, event):
+        if event.num == 4 or getattr(event, "delta", 0) > 0:
+            self.top -= WHEEL_ROWS
+        else:
+            self.top += WHEEL_ROWS
+        self.invalidate()
+        return "break"
+
+    def move_cursor(self, step):
+        """Keyboard navigation: moves the focus (and the selection) and scrolls it into view."""
+        total = len(self.source) if self.source is not None else 0
+        if not total:
+            return "break"
+        cursor = self.cursor if self.cursor is not None else self.top
+        cursor = {
+            "page": cursor + self.visible, "-page": cursor - self.visible, "home": 0, "end": total - 1,
+        }.get(step, cursor + step if isinstance(step, int) else cursor)
+        self.cursor = max(0, min(cursor, total - 1))
+        self.selected = { self.row_id(self.cursor) }
+        self.scroll_to(self.cursor)
+        return "break"
+
+    def on_resize(self, event):
+        style = ttk.Style()
+        row_height = int(style.lookup("Treeview", "rowheight") or DEFAULT_ROW_HEIGHT)
+        visible = max(1, (event.height - row_height - 4) // row_height) # Minus the heading row
+        if visible != self.visible:
+            self.visible = visible
+            self.invalidate()